@@ -0,0 +1,114 @@
+import math
+import statistics
+import time
+
+from django.contrib.auth.tokens import default_token_generator
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+
+BENCHMARK_NAMESPACES = ('posts', 'users', 'about')
+
+
+def collect_routes(namespaces=BENCHMARK_NAMESPACES):
+    """Возвращает [(view_name, имена аргументов)] маршрутов приложений."""
+    routes = []
+    for resolver in get_resolver().url_patterns:
+        if (not isinstance(resolver, URLResolver)
+                or resolver.namespace not in namespaces):
+            continue
+        for pattern in resolver.url_patterns:
+            if isinstance(pattern, URLPattern) and pattern.name:
+                routes.append((
+                    f'{resolver.namespace}:{pattern.name}',
+                    sorted(pattern.pattern.converters),
+                ))
+    return routes
+
+
+def sample_url_kwargs(post):
+    """Значения аргументов маршрутов для заданного поста и его автора."""
+    author = post.author
+    return {
+        'post_id': post.pk,
+        'username': author.username,
+        'slug': post.group.slug if post.group else '',
+        'uidb64': urlsafe_base64_encode(force_bytes(author.pk)),
+        'token': default_token_generator.make_token(author),
+    }
+
+
+def percentile(values, percent):
+    """Перцентиль по методу ближайшего ранга."""
+    ordered = sorted(values)
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def measure(client, url, requests, warmup=0, relogin=None):
+    """Запрашивает url и возвращает задержки в мс и число запросов к БД.
+
+    ``relogin`` вызывается после запроса, разлогинившего клиента,
+    чтобы каждая итерация выполнялась в одинаковых условиях.
+    Для маршрута, который падает с исключением, возвращает его текст
+    вместо статистики.
+    """
+    latencies = []
+    queries = []
+    status = None
+    for iteration in range(warmup + requests):
+        with CaptureQueriesContext(connection) as context:
+            started = time.perf_counter()
+            try:
+                response = client.get(url)
+            except Exception as error:
+                # Тестовый клиент пробрасывает исключения view; упавший
+                # маршрут попадает в отчёт, а не обрывает весь прогон.
+                return {'status': 500, 'error': repr(error)}
+            elapsed = time.perf_counter() - started
+        status = response.status_code
+        if relogin is not None and response.wsgi_request.user.is_anonymous:
+            relogin(client)
+        if iteration >= warmup:
+            latencies.append(elapsed * 1000)
+            queries.append(len(context))
+    return {
+        'status': status,
+        'requests': requests,
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'mean_ms': round(statistics.mean(latencies), 3),
+        'queries': {
+            'min': min(queries),
+            'max': max(queries),
+            'mean': round(statistics.mean(queries), 2),
+        },
+    }
+
+
+def run_url_benchmark(post, requests=50, warmup=5,
+                      roles=('anonymous', 'author')):
+    """Прогоняет все маршруты от имени гостя и автора поста."""
+    url_kwargs = sample_url_kwargs(post)
+    results = []
+    for role in roles:
+        relogin = None
+        if role == 'author':
+            def relogin(client):
+                client.force_login(post.author)
+        for name, arguments in collect_routes():
+            client = Client()
+            if relogin is not None:
+                relogin(client)
+            url = reverse(
+                name, kwargs={key: url_kwargs[key] for key in arguments}
+            )
+            result = measure(client, url, requests, warmup, relogin)
+            results.append({'route': name, 'url': url, 'role': role,
+                            **result})
+    return results
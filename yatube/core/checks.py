@@ -0,0 +1,67 @@
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS
+from django.core.checks import Error, Tags, register
+
+from .warmup import compile_templates
+
+# Кэши, у каждого процесса свои.
+PROCESS_LOCAL_CACHES = {
+    'django.core.cache.backends.dummy.DummyCache',
+    'django.core.cache.backends.locmem.LocMemCache',
+}
+
+
+@register(Tags.templates, deploy=True)
+def check_template_syntax(app_configs, **kwargs):
+    """``manage.py check --deploy`` сообщает о битых шаблонах до выкладки."""
+    _, errors = compile_templates()
+    return [
+        Error(
+            f'Синтаксическая ошибка в шаблоне {name}: {error}',
+            id='core.E001',
+        )
+        for name, error in errors
+    ]
+
+
+@register(Tags.caches)
+def check_session_cache(app_configs, **kwargs):
+    """Сессии core.sessions.cached_db работают только с кэшем, общим
+    для всех воркеров."""
+    if settings.SESSION_ENGINE != 'core.sessions.cached_db':
+        return []
+    backend = settings.CACHES[settings.SESSION_CACHE_ALIAS]['BACKEND']
+    if backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [
+        Error(
+            f'SESSION_ENGINE core.sessions.cached_db требует общего для '
+            f'воркеров кэша, а кэш {settings.SESSION_CACHE_ALIAS!r} — '
+            f'{backend}: выход из системы в одном воркере не дойдёт до '
+            f'остальных.',
+            hint='Используйте Memcached или Redis либо сессии в базе '
+                 '(core.sessions.db).',
+            id='core.E002',
+        )
+    ]
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """Версии карточек, поколения лент и счётчики сбрасываются в кэше
+    того воркера, который изменил данные; остальные видят сброс, только
+    если кэш общий."""
+    backend = settings.CACHES[DEFAULT_CACHE_ALIAS]['BACKEND']
+    if backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [
+        Error(
+            f'Кэш {DEFAULT_CACHE_ALIAS!r} — {backend}, у каждого воркера '
+            f'свой: после правки поста остальные воркеры до '
+            f'POST_CARD_CACHE_TIMEOUT отдают старые карточки и страницы '
+            f'лент.',
+            hint='Укажите в CACHES Memcached или Redis; с одним процессом '
+                 'проверку можно отключить в SILENCED_SYSTEM_CHECKS.',
+            id='core.E003',
+        )
+    ]
@@ -0,0 +1,54 @@
+"""SQLite с настраиваемыми PRAGMA и режимом начала транзакций.
+
+OPTIONS, помимо аргументов sqlite3.connect():
+
+* ``pragmas`` — словарь PRAGMA, применяемых к каждому новому
+  соединению, например ``{'journal_mode': 'wal', 'busy_timeout': 5000}``;
+* ``transaction_mode`` — ``'DEFERRED'``, ``'IMMEDIATE'`` или
+  ``'EXCLUSIVE'``. Транзакция, начатая BEGIN IMMEDIATE, сразу берёт
+  блокировку записи и ждёт её ``busy_timeout``, а не падает с
+  «database is locked» при попытке перейти от чтения к записи.
+"""
+import re
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+PRAGMA_NAME = re.compile(r'^[a-z_]+$')
+PRAGMA_VALUE = re.compile(r'^-?\w+$')
+TRANSACTION_MODES = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        self.pragmas = self._validate_pragmas(params.pop('pragmas', {}))
+        mode = params.pop('transaction_mode', None)
+        if mode is not None and mode.upper() not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(
+                f'transaction_mode должен быть одним из {TRANSACTION_MODES}'
+            )
+        self.transaction_mode = mode and mode.upper()
+        return params
+
+    @staticmethod
+    def _validate_pragmas(pragmas):
+        for name, value in pragmas.items():
+            if not PRAGMA_NAME.match(name) or not PRAGMA_VALUE.match(
+                    str(value)):
+                raise ImproperlyConfigured(
+                    f'Недопустимая PRAGMA {name} = {value!r}'
+                )
+        return dict(pragmas)
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        if self.transaction_mode is None:
+            super()._start_transaction_under_autocommit()
+        else:
+            self.cursor().execute(f'BEGIN {self.transaction_mode}')
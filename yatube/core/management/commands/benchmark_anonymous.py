@@ -0,0 +1,93 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import (override_settings, setup_test_environment,
+                               teardown_test_environment)
+from django.urls import reverse
+
+from core.benchmarks import measure
+
+MODES = (('full', False), ('fast', True))
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает задержку страницы для гостя без cookie с быстрым '
+        'путём ANONYMOUS_FAST_PATH и без него.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default=None,
+                            help='Адрес страницы; по умолчанию posts:index.')
+        parser.add_argument('--requests', type=int, default=200,
+                            help='Замеров в каждом раунде.')
+        parser.add_argument('--rounds', type=int, default=5,
+                            help='Раундов; режимы чередуются, чтобы '
+                                 'фоновый шум делился между ними поровну.')
+        parser.add_argument('--warmup', type=int, default=20)
+        parser.add_argument('--output', help='Файл для JSON-отчёта.')
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1 or options['rounds'] < 1:
+            raise CommandError('--requests и --rounds должны быть больше 0')
+        url = options['url'] or reverse('posts:index')
+        try:
+            setup_test_environment()
+        except RuntimeError:
+            owns_environment = False
+        else:
+            owns_environment = True
+        try:
+            rounds = self.run(url, options)
+        finally:
+            if owns_environment:
+                teardown_test_environment()
+        report = {'url': url, **{
+            name: self.summary(results) for name, results in rounds.items()
+        }}
+        saved = report['full']['mean_ms'] - report['fast']['mean_ms']
+        report['saved_us'] = round(saved * 1000, 1)
+        report['saved_percent'] = round(
+            saved / report['full']['mean_ms'] * 100, 1
+        )
+        for name, _ in MODES:
+            self.stdout.write(
+                f'{name:5} p50={report[name]["p50_ms"]:.3f}ms '
+                f'mean={report[name]["mean_ms"]:.3f}ms '
+                f'queries={report[name]["queries"]}'
+            )
+        self.stdout.write(
+            f'Экономия на запрос: {report["saved_us"]} мкс '
+            f'({report["saved_percent"]}%)'
+        )
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(report, output, indent=2)
+
+    def run(self, url, options):
+        rounds = {name: [] for name, _ in MODES}
+        for _ in range(options['rounds']):
+            for name, enabled in MODES:
+                with override_settings(ANONYMOUS_FAST_PATH=enabled):
+                    result = measure(
+                        Client(), url, options['requests'],
+                        options['warmup'],
+                    )
+                if 'error' in result or result['status'] != 200:
+                    raise CommandError(f'{url}: {result}')
+                rounds[name].append(result)
+        return rounds
+
+    @staticmethod
+    def summary(results):
+        """Медиана раундов: устойчива к раунду, попавшему на сборку
+        мусора или фоновую нагрузку."""
+        def median(key):
+            values = sorted(result[key] for result in results)
+            return values[len(values) // 2]
+        return {
+            'p50_ms': median('p50_ms'),
+            'mean_ms': median('mean_ms'),
+            'queries': max(result['queries']['max'] for result in results),
+        }
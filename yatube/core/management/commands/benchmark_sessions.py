@@ -0,0 +1,207 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from importlib import import_module
+
+from django.contrib.auth import SESSION_KEY
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+
+from core.benchmarks import percentile
+
+ENGINES = (
+    ('db', 'django.contrib.sessions.backends.db'),
+    ('cache', 'core.sessions.cached_db'),
+)
+# Записи постов имитируются вставками в отдельную таблицу той же базы:
+# блокировка записи SQLite у них общая с django_session.
+TABLE = 'benchmark_session_writes'
+
+
+@contextmanager
+def throwaway_database():
+    """Подменяет основную базу пустым временным файлом с теми же
+    настройками, таблицей сессий и таблицей записей.
+
+    Замер не трогает рабочие данные, а прерванный прогон не оставляет
+    в них следов.
+    """
+    directory = tempfile.mkdtemp()
+    original_settings = connections.databases[DEFAULT_DB_ALIAS]
+    original_connection = connections[DEFAULT_DB_ALIAS]
+    settings_dict = dict(
+        original_settings, NAME=os.path.join(directory, 'bench.sqlite3')
+    )
+    connections.databases[DEFAULT_DB_ALIAS] = settings_dict
+    connection = original_connection.__class__(
+        settings_dict, DEFAULT_DB_ALIAS
+    )
+    connections[DEFAULT_DB_ALIAS] = connection
+    try:
+        with connection.schema_editor() as editor:
+            editor.create_model(Session)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE TABLE {TABLE} (id INTEGER PRIMARY KEY, '
+                'author INTEGER, text TEXT)'
+            )
+        yield
+    finally:
+        connection.close()
+        connections[DEFAULT_DB_ALIAS] = original_connection
+        connections.databases[DEFAULT_DB_ALIAS] = original_settings
+        shutil.rmtree(directory)
+
+
+class QueryCounter:
+    """execute_wrapper, считающий запросы к django_session."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        if 'django_session' in sql:
+            self.count += 1
+        return execute(sql, params, many, context)
+
+
+def page_view(store_class, session_key):
+    """Как запрос пользователя при SESSION_SAVE_EVERY_REQUEST: сессия
+    читается для request.user и сохраняется с продлённым сроком."""
+    session = store_class(session_key)
+    session.get(SESSION_KEY)
+    session.save()
+
+
+def write_post(author):
+    connection = connections[DEFAULT_DB_ALIAS]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {TABLE} (author, text) VALUES (%s, %s)',
+            [author, 'x' * 200],
+        )
+
+
+def viewer(store_class, keys, number, deadline, pause, reports):
+    counter = QueryCounter()
+    done = errors = 0
+    connection = connections[DEFAULT_DB_ALIAS]
+    with connection.execute_wrapper(counter):
+        while time.perf_counter() < deadline:
+            key = keys[(number + done + errors) % len(keys)]
+            try:
+                page_view(store_class, key)
+                done += 1
+            except OperationalError:
+                errors += 1
+            time.sleep(pause)
+    connection.close()
+    reports.append(
+        {'views': done, 'queries': counter.count, 'errors': errors}
+    )
+
+
+def writer(number, deadline, reports):
+    latencies = []
+    errors = 0
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            write_post(number)
+        except OperationalError:
+            errors += 1
+            continue
+        latencies.append((time.perf_counter() - started) * 1000)
+    connections[DEFAULT_DB_ALIAS].close()
+    reports.append({'latencies': latencies, 'errors': errors})
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает стандартные сессии в базе и сессии в кэше под '
+        'параллельными просмотрами страниц и записями в ту же базу.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--viewers', type=int, default=8)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--seconds', type=float, default=5.0)
+        parser.add_argument('--pause-ms', type=float, default=2.0,
+                            help='Пауза после просмотра: остальная работа '
+                                 'запроса, отпускающая GIL.')
+        parser.add_argument('--output', help='Файл для JSON-отчёта.')
+
+    def handle(self, *args, **options):
+        results = {}
+        with throwaway_database():
+            for name, engine in ENGINES:
+                store_class = import_module(engine).SessionStore
+                results[name] = self.run_engine(store_class, options)
+                self.stdout.write(
+                    f'{name:5} просмотров: '
+                    f'{results[name]["views_per_s"]:7.0f}/с '
+                    f'запросов к сессиям: '
+                    f'{results[name]["session_queries"]} '
+                    f'записей: {results[name]["writes_per_s"]:6.0f}/с '
+                    f'p99 записи: {results[name]["write_p99_ms"]:.1f}ms '
+                    f'ошибок блокировки: {results[name]["errors"]}'
+                )
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(results, output, indent=2)
+
+    def run_engine(self, store_class, options):
+        keys = []
+        for user_id in range(options['users']):
+            session = store_class()
+            session[SESSION_KEY] = str(user_id)
+            session.save()
+            keys.append(session.session_key)
+        try:
+            return self.run_workers(store_class, keys, options)
+        finally:
+            # Сессии в кэше переживают временную базу.
+            for key in keys:
+                store_class(key).delete()
+
+    def run_workers(self, store_class, keys, options):
+        deadline = time.perf_counter() + options['seconds']
+        pause = options['pause_ms'] / 1000
+        reports = []
+        threads = [
+            threading.Thread(target=viewer, args=(
+                store_class, keys, i, deadline, pause, reports,
+            ))
+            for i in range(options['viewers'])
+        ] + [
+            threading.Thread(target=writer, args=(i, deadline, reports))
+            for i in range(options['writers'])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        latencies = [
+            latency for report in reports
+            for latency in report.get('latencies', ())
+        ]
+        seconds = options['seconds']
+        return {
+            'views_per_s': sum(
+                report.get('views', 0) for report in reports
+            ) / seconds,
+            'session_queries': sum(
+                report.get('queries', 0) for report in reports
+            ),
+            'writes_per_s': len(latencies) / seconds,
+            'write_p99_ms': (
+                round(percentile(latencies, 99), 3) if latencies else None
+            ),
+            'errors': sum(report['errors'] for report in reports),
+        }
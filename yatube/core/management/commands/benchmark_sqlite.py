@@ -0,0 +1,141 @@
+import json
+import os
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections, transaction
+
+SCHEMA = (
+    'CREATE TABLE bench_post (id INTEGER PRIMARY KEY, author INTEGER, '
+    'text TEXT, pub_date REAL)',
+    'CREATE INDEX bench_post_author ON bench_post (author, pub_date)',
+)
+
+# Стандартный backend: без PRAGMA, новое соединение на каждый запрос.
+STOCK_PROFILE = {
+    'ENGINE': 'django.db.backends.sqlite3',
+    'OPTIONS': {},
+    'reuse': False,
+}
+
+
+def tuned_profile():
+    return {
+        'ENGINE': settings.DATABASES['default']['ENGINE'],
+        'OPTIONS': settings.DATABASES['default'].get('OPTIONS', {}),
+        'reuse': True,
+    }
+
+
+def write_post(alias, author):
+    """Как post_create: чтение счётчика автора и вставка в транзакции."""
+    with transaction.atomic(using=alias):
+        with connections[alias].cursor() as cursor:
+            cursor.execute(
+                'SELECT COUNT(*) FROM bench_post WHERE author = %s', [author]
+            )
+            cursor.execute(
+                'INSERT INTO bench_post (author, text, pub_date) '
+                'VALUES (%s, %s, %s)',
+                [author, 'x' * 200, time.time()],
+            )
+
+
+def read_feed(alias, author):
+    """Как страница профиля: последние десять постов автора."""
+    with connections[alias].cursor() as cursor:
+        cursor.execute(
+            'SELECT id, text FROM bench_post WHERE author = %s '
+            'ORDER BY pub_date DESC LIMIT 10', [author]
+        )
+        cursor.fetchall()
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность стандартного и настроенного '
+        'SQLite при параллельных чтениях и записях.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=4)
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--seconds', type=float, default=5.0)
+        parser.add_argument('--output', help='Файл для JSON-отчёта.')
+
+    def handle(self, *args, **options):
+        results = {}
+        for name, profile in (('stock', STOCK_PROFILE),
+                              ('tuned', tuned_profile())):
+            results[name] = self.run_profile(name, profile, options)
+            self.stdout.write(
+                f'{name:6} запись: {results[name]["writes_per_s"]:8.0f}/с '
+                f'чтение: {results[name]["reads_per_s"]:8.0f}/с '
+                f'ошибок: {results[name]["errors"]}'
+            )
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(results, output, indent=2)
+
+    def run_profile(self, name, profile, options):
+        alias = f'benchmark_{name}'
+        directory = tempfile.mkdtemp()
+        connections.databases[alias] = {
+            'ENGINE': profile['ENGINE'],
+            'NAME': os.path.join(directory, 'bench.sqlite3'),
+            'OPTIONS': profile['OPTIONS'],
+        }
+        try:
+            with connections[alias].cursor() as cursor:
+                for statement in SCHEMA:
+                    cursor.execute(statement)
+            connections[alias].close()
+            return self.run_workers(alias, profile['reuse'], options)
+        finally:
+            del connections[alias]
+            del connections.databases[alias]
+            for filename in os.listdir(directory):
+                os.remove(os.path.join(directory, filename))
+            os.rmdir(directory)
+
+    def run_workers(self, alias, reuse, options):
+        counts = {'writes': 0, 'reads': 0, 'errors': 0}
+        lock = threading.Lock()
+        deadline = time.perf_counter() + options['seconds']
+
+        def worker(operation, counter, author):
+            done = errors = 0
+            while time.perf_counter() < deadline:
+                try:
+                    operation(alias, author)
+                    done += 1
+                except OperationalError:
+                    errors += 1
+                if not reuse:
+                    # Как при CONN_MAX_AGE = 0: соединение на запрос.
+                    connections[alias].close()
+            connections[alias].close()
+            with lock:
+                counts[counter] += done
+                counts['errors'] += errors
+
+        threads = [
+            threading.Thread(target=worker, args=(write_post, 'writes', i))
+            for i in range(options['writers'])
+        ] + [
+            threading.Thread(target=worker, args=(read_feed, 'reads', i))
+            for i in range(options['readers'])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        seconds = options['seconds']
+        return {
+            'writes_per_s': counts['writes'] / seconds,
+            'reads_per_s': counts['reads'] / seconds,
+            'errors': counts['errors'],
+        }
@@ -0,0 +1,114 @@
+import json
+import platform
+from datetime import datetime, timezone
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (setup_test_environment,
+                               teardown_test_environment)
+
+from core.benchmarks import run_url_benchmark
+from core.profiling import TemplateProfile, profile_templates
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет задержку (p50/p95/p99) и число запросов к БД для всех '
+        'страниц сайта и сохраняет результат в JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50,
+                            help='Замеров на каждый маршрут.')
+        parser.add_argument('--warmup', type=int, default=5,
+                            help='Прогревочных запросов, не входящих '
+                                 'в статистику.')
+        parser.add_argument('--post', type=int,
+                            help='id поста для страниц с аргументами; '
+                                 'по умолчанию — последний пост с группой.')
+        parser.add_argument('--profile-templates', action='store_true',
+                            help='Добавить в отчёт время отрисовки '
+                                 'шаблонов, include и фильтров.')
+        parser.add_argument('--output', default='-',
+                            help='Файл для JSON; "-" — стандартный вывод.')
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1:
+            raise CommandError('--requests должен быть не меньше 1')
+        post = self.get_post(options['post'])
+        # Тестовое окружение разрешает хост testserver и перехватывает
+        # письма страницы сброса пароля.
+        try:
+            setup_test_environment()
+        except RuntimeError:
+            owns_environment = False
+        else:
+            owns_environment = True
+        profile = TemplateProfile() if options['profile_templates'] else None
+        try:
+            results = self.run(post, options, profile)
+        finally:
+            if owns_environment:
+                teardown_test_environment()
+        report = {
+            'meta': {
+                'created': datetime.now(timezone.utc).isoformat(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'posts': Post.objects.count(),
+                'post_id': post.pk,
+                'requests': options['requests'],
+                'warmup': options['warmup'],
+            },
+            'results': results,
+        }
+        if profile is not None:
+            report['templates'] = profile.report()
+        data = json.dumps(report, ensure_ascii=False, indent=2)
+        if options['output'] == '-':
+            self.stdout.write(data)
+        else:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                output.write(data)
+            for result in results:
+                if 'error' in result:
+                    self.stderr.write(
+                        f'{result["role"]:9} {result["route"]:35} '
+                        f'{result["error"]}'
+                    )
+                    continue
+                self.stderr.write(
+                    f'{result["role"]:9} {result["route"]:35} '
+                    f'p50={result["p50_ms"]:.1f}ms '
+                    f'p99={result["p99_ms"]:.1f}ms '
+                    f'queries={result["queries"]["max"]}'
+                )
+            if profile is not None:
+                self.stderr.write(profile.format_report(limit=20))
+
+    def run(self, post, options, profile):
+        if profile is None:
+            return run_url_benchmark(
+                post, options['requests'], options['warmup']
+            )
+        with profile_templates(profile):
+            return run_url_benchmark(
+                post, options['requests'], options['warmup']
+            )
+
+    def get_post(self, pk):
+        posts = Post.objects.select_related('author', 'group')
+        if pk is not None:
+            try:
+                return posts.get(pk=pk)
+            except Post.DoesNotExist:
+                raise CommandError(f'Пост {pk} не найден')
+        post = posts.filter(group__isnull=False).first()
+        if post is None:
+            raise CommandError(
+                'Нет постов с группой: заполните базу командой seed_data'
+            )
+        return post
@@ -0,0 +1,39 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную SQLite-базу в SQLite-реплики: локальная '
+        'замена репликации для проверки маршрутизации чтения.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'aliases', nargs='*',
+            help='Псевдонимы реплик; по умолчанию DATABASE_REPLICAS.',
+        )
+
+    def handle(self, *args, **options):
+        aliases = options['aliases'] or settings.DATABASE_REPLICAS
+        if not aliases:
+            raise CommandError('Не указано ни одной реплики')
+        primary = connections[DEFAULT_DB_ALIAS]
+        for alias in aliases:
+            if alias not in connections.databases:
+                raise CommandError(f'Нет базы "{alias}"')
+            replica = connections[alias]
+            if primary.vendor != 'sqlite' or replica.vendor != 'sqlite':
+                raise CommandError('Копирование поддерживается только '
+                                   'между базами SQLite')
+            replica.close()
+            primary.ensure_connection()
+            target = sqlite3.connect(replica.settings_dict['NAME'], uri=True)
+            try:
+                primary.connection.backup(target)
+            finally:
+                target.close()
+            self.stdout.write(f'{alias}: скопировано')
@@ -0,0 +1,128 @@
+import bisect
+import threading
+
+# Границы корзин гистограмм, как в клиентах Prometheus.
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+SIZE_BUCKETS = (
+    1024, 4096, 16384, 65536, 262144, 1048576, 4194304,
+)
+
+
+class Histogram:
+    """Гистограмма с фиксированными корзинами для одного набора меток.
+
+    Хранит некумулятивные счётчики корзин, сумму и число наблюдений;
+    наблюдение стоит одного ``bisect`` и пары сложений.
+    """
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """Пары (граница, накопленное число), последняя — '+Inf'."""
+        total = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            total += count
+            yield bound, total
+
+
+class HistogramFamily:
+    """Набор гистограмм одной метрики, по одной на значение метки."""
+
+    def __init__(self, name, documentation, buckets, label='view'):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = buckets
+        self.label = label
+        self.histograms = {}
+
+    def observe(self, label_value, value):
+        histogram = self.histograms.get(label_value)
+        if histogram is None:
+            histogram = Histogram(self.buckets)
+            self.histograms[label_value] = histogram
+        histogram.observe(value)
+
+    def expose(self):
+        yield f'# HELP {self.name} {self.documentation}'
+        yield f'# TYPE {self.name} histogram'
+        for label_value, histogram in sorted(self.histograms.items()):
+            label = f'{self.label}="{escape_label(label_value)}"'
+            for bound, count in histogram.cumulative():
+                yield f'{self.name}_bucket{{{label},le="{bound}"}} {count}'
+            yield f'{self.name}_sum{{{label}}} {histogram.sum}'
+            yield f'{self.name}_count{{{label}}} {histogram.count}'
+
+
+def escape_label(value):
+    return (
+        str(value).replace('\\', r'\\').replace('"', r'\"')
+        .replace('\n', r'\n')
+    )
+
+
+class Registry:
+    """Метрики запросов процесса.
+
+    Каждый процесс WSGI-сервера ведёт свои гистограммы; Prometheus
+    собирает их с каждого процесса и суммирует при запросе.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.duration = HistogramFamily(
+                'yatube_request_duration_seconds',
+                'Wall time of the request by view.', LATENCY_BUCKETS,
+            )
+            self.db_duration = HistogramFamily(
+                'yatube_request_db_duration_seconds',
+                'Time spent in database queries by view.', LATENCY_BUCKETS,
+            )
+            self.queries = HistogramFamily(
+                'yatube_request_queries',
+                'Database queries per request by view.', QUERY_BUCKETS,
+            )
+            self.response_size = HistogramFamily(
+                'yatube_response_size_bytes',
+                'Response body size by view.', SIZE_BUCKETS,
+            )
+
+    @property
+    def families(self):
+        return (self.duration, self.db_duration, self.queries,
+                self.response_size)
+
+    def observe_request(self, view, duration, db_duration, queries,
+                        size=None):
+        with self.lock:
+            self.duration.observe(view, duration)
+            self.db_duration.observe(view, db_duration)
+            self.queries.observe(view, queries)
+            if size is not None:
+                self.response_size.observe(view, size)
+
+    def expose(self):
+        """Текст в формате экспозиции Prometheus 0.0.4."""
+        with self.lock:
+            lines = [
+                line for family in self.families for line in family.expose()
+            ]
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
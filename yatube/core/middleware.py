@@ -0,0 +1,159 @@
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.contrib.auth import middleware as auth_middleware
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.messages import middleware as messages_middleware
+from django.contrib.messages.storage import default_storage
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.functional import SimpleLazyObject, empty
+
+from .metrics import registry
+from .profiling import profile_templates
+
+UNRESOLVED_VIEW = '<unresolved>'
+PROFILE_PARAMETER = 'profile_templates'
+
+
+class QueryTimer:
+    """execute_wrapper, считающий запросы к БД и время на них."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+
+
+def view_name(request):
+    """Имя маршрута вида 'posts:index' для метки метрик.
+
+    Берётся из шаблона URL, а не из пути, поэтому число меток не
+    растёт с числом постов и пользователей.
+    """
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return UNRESOLVED_VIEW
+    return match.view_name or match._func_path
+
+
+class MetricsMiddleware:
+    """Пишет время ответа, время и число запросов к БД и размер ответа
+    в гистограммы по имени view.
+
+    Ставится первым в MIDDLEWARE, чтобы учитывать работу остальных.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timer = QueryTimer()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timer))
+            response = self.get_response(request)
+        duration = time.perf_counter() - started
+        size = None
+        if not response.streaming:
+            size = len(response.content)
+        registry.observe_request(
+            view_name(request), duration, timer.duration, timer.count, size
+        )
+        return response
+
+
+def is_cookieless_get(request):
+    """True для GET/HEAD без cookie сессии и сообщений.
+
+    Такой запрос заведомо от гостя: ему незачем поднимать сессию,
+    чтобы узнать пользователя, и нечего забирать из хранилища
+    сообщений.
+    """
+    return (settings.ANONYMOUS_FAST_PATH
+            and request.method in ('GET', 'HEAD')
+            and settings.SESSION_COOKIE_NAME not in request.COOKIES
+            and CookieStorage.cookie_name not in request.COOKIES)
+
+
+class AuthenticationMiddleware(auth_middleware.AuthenticationMiddleware):
+    """Для запросов без cookie сразу ставит request.user гостем.
+
+    Стандартный middleware определяет пользователя по сессии, и первое
+    же обращение к request.user из шапки страницы читает её и помечает
+    ответ Vary: Cookie. Здесь сессия не трогается; Vary: Cookie
+    ставится явно, ведь ответ гостю всё равно зависит от cookie.
+    """
+
+    def process_request(self, request):
+        request.anonymous_fast_path = is_cookieless_get(request)
+        if request.anonymous_fast_path:
+            request.user = AnonymousUser()
+            return
+        super().process_request(request)
+
+    def process_response(self, request, response):
+        if getattr(request, 'anonymous_fast_path', False):
+            patch_vary_headers(response, ('Cookie',))
+        return response
+
+
+class MessageMiddleware(messages_middleware.MessageMiddleware):
+    """Создаёт хранилище сообщений для запросов без cookie лениво.
+
+    Если view так и не добавил сообщение, хранилище не создаётся и не
+    сохраняется в ответ; добавленное сообщение сохраняется как обычно.
+    """
+
+    def process_request(self, request):
+        if not getattr(request, 'anonymous_fast_path', False):
+            super().process_request(request)
+            return
+        request._messages = SimpleLazyObject(
+            lambda: default_storage(request)
+        )
+
+    def process_response(self, request, response):
+        storage = getattr(request, '_messages', None)
+        if (isinstance(storage, SimpleLazyObject)
+                and storage._wrapped is empty):
+            return response
+        return super().process_response(request, response)
+
+
+class TemplateProfilerMiddleware:
+    """Отдаёт сотрудникам отчёт о времени отрисовки шаблонов страницы.
+
+    Включается настройкой TEMPLATE_PROFILER, а для запроса — параметром
+    ``?profile_templates``: вместо страницы возвращается текстовый
+    отчёт. При выключенной настройке Django не подключает middleware.
+    """
+
+    def __init__(self, get_response):
+        if not settings.TEMPLATE_PROFILER:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if (PROFILE_PARAMETER not in request.GET
+                or not request.user.is_staff):
+            return self.get_response(request)
+        with profile_templates() as profile:
+            response = self.get_response(request)
+        return HttpResponse(
+            f'{request.get_full_path()} -> {response.status_code}\n\n'
+            f'{profile.format_report()}\n',
+            content_type='text/plain; charset=utf-8',
+        )
@@ -0,0 +1,163 @@
+"""Профилировщик отрисовки шаблонов Django.
+
+Время относится к каждому шаблону, каждому ``{% include %}`` и каждому
+вызову фильтра. Для каждого элемента считается полное время и
+собственное (без вложенных шаблонов, include и фильтров), поэтому
+отчёт показывает, где именно тратится CPU. Собственное время include —
+это поиск и загрузка шаблона: без кэширующего загрузчика оно заметно.
+
+Перехватчики ставятся один раз при первом включении и сразу выходят,
+если в текущем потоке профилировщик не активен.
+"""
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+from django.template.base import FilterExpression, Template
+from django.template.loader_tags import IncludeNode
+
+_local = threading.local()
+_install_lock = threading.Lock()
+
+
+class TemplateProfile:
+    """Накопленная статистика: (вид, имя) -> [вызовы, полное, своё]."""
+
+    def __init__(self):
+        self.stats = {}
+        self._stack = []
+
+    def enter(self):
+        self._stack.append([time.perf_counter(), 0.0])
+
+    def exit(self, kind, name):
+        started, children = self._stack.pop()
+        total = time.perf_counter() - started
+        if self._stack:
+            self._stack[-1][1] += total
+        entry = self.stats.setdefault((kind, name), [0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += total
+        entry[2] += total - children
+
+    def report(self, limit=None):
+        """Строки отчёта, отсортированные по собственному времени."""
+        rows = [
+            {
+                'kind': kind,
+                'name': name,
+                'calls': calls,
+                'total_ms': round(total * 1000, 3),
+                'self_ms': round(own * 1000, 3),
+            }
+            for (kind, name), (calls, total, own) in self.stats.items()
+        ]
+        rows.sort(key=lambda row: (-row['self_ms'], row['kind'], row['name']))
+        return rows[:limit]
+
+    def format_report(self, limit=None):
+        lines = [
+            f'{"self, мс":>10} {"всего, мс":>10} {"вызовов":>8}  элемент'
+        ]
+        for row in self.report(limit):
+            lines.append(
+                f'{row["self_ms"]:10.3f} {row["total_ms"]:10.3f} '
+                f'{row["calls"]:8d}  {row["kind"]} {row["name"]}'
+            )
+        return '\n'.join(lines)
+
+
+def _active():
+    return getattr(_local, 'profile', None)
+
+
+def _measure(kind, name, function, *args, **kwargs):
+    profile = _active()
+    if profile is None:
+        return function(*args, **kwargs)
+    profile.enter()
+    try:
+        return function(*args, **kwargs)
+    finally:
+        profile.exit(kind, name)
+
+
+def _profiled_filter(func):
+    if getattr(func, '_profiled', False):
+        return func
+
+    # wraps копирует is_safe, needs_autoescape и expects_localtime,
+    # которые FilterExpression читает с функции фильтра.
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return _measure('filter', func.__name__, func, *args, **kwargs)
+
+    wrapper._profiled = True
+    return wrapper
+
+
+def _patch(owner, attribute, make_wrapper):
+    original = getattr(owner, attribute)
+    if getattr(original, '_profiled', False):
+        return
+    wrapper = make_wrapper(original)
+    wrapper._profiled = True
+    setattr(owner, attribute, wrapper)
+
+
+def _template_render(original):
+    def render(self, context):
+        return _measure(
+            'template', self.name or '<string>', original, self, context
+        )
+    return render
+
+
+def _include_render(original):
+    def render(self, context):
+        name = self.template.token.strip('"\'')
+        return _measure('include', name, original, self, context)
+    return render
+
+
+def _filter_resolve(original):
+    def resolve(self, context, ignore_failures=False):
+        if self.filters and _active() is not None:
+            # Обёртки остаются на разобранном шаблоне: присваивание списка
+            # атомарно, а вне профилирования они ничего не измеряют.
+            self.filters = [
+                (_profiled_filter(func), args) for func, args in self.filters
+            ]
+        return original(self, context, ignore_failures)
+    return resolve
+
+
+def _install():
+    """Ставит перехватчики, если их ещё нет.
+
+    Проверка идёт по каждому атрибуту: setup_test_environment()
+    подменяет и затем восстанавливает ``Template._render``.
+    """
+    with _install_lock:
+        _patch(Template, '_render', _template_render)
+        _patch(IncludeNode, 'render', _include_render)
+        _patch(FilterExpression, 'resolve', _filter_resolve)
+
+
+@contextmanager
+def profile_templates(profile=None):
+    """Профилирует шаблоны, отрисованные в текущем потоке.
+
+    Передайте ``profile``, чтобы накопить статистику за несколько
+    запросов, например за прогон бенчмарка.
+    """
+    _install()
+    if profile is None:
+        profile = TemplateProfile()
+    previous = _active()
+    _local.profile = profile
+    try:
+        yield profile
+    finally:
+        _local.profile = previous
@@ -0,0 +1,98 @@
+"""Маршрутизация чтения между основной базой и репликами.
+
+По умолчанию всё идёт в основную базу. ReplicaRoutingMiddleware
+разрешает читать с реплики только GET/HEAD-запросам к view из
+REPLICA_VIEWS; после первой записи в запросе чтение возвращается к
+основной базе, а ответ получает cookie, которая ещё
+READ_YOUR_WRITES_WINDOW секунд направляет запросы клиента туда же —
+он видит собственные изменения, пока реплика догоняет.
+"""
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+PIN_COOKIE = 'primary_until'
+# Сессии пишутся почти на каждый вход и читаются до разбора URL.
+PRIMARY_ONLY_APPS = {'sessions'}
+
+_state = threading.local()
+
+
+def current_replica():
+    """Псевдоним реплики, с которой читает текущий запрос, или None."""
+    return getattr(_state, 'replica', None)
+
+
+def use_replica(alias):
+    _state.replica = alias
+    _state.wrote = False
+
+
+def reset():
+    wrote = getattr(_state, 'wrote', False)
+    _state.replica = None
+    _state.wrote = False
+    return wrote
+
+
+def replica_may_be_stale(changed_ns):
+    """True, если запрос читает с реплики, а данные изменились так
+    недавно, что реплика могла их ещё не получить."""
+    window = settings.READ_YOUR_WRITES_WINDOW * 10 ** 9
+    return (current_replica() is not None
+            and time.time_ns() - changed_ns < window)
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label in PRIMARY_ONLY_APPS:
+            return DEFAULT_DB_ALIAS
+        return current_replica() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label not in PRIMARY_ONLY_APPS:
+            # Дальше в этом запросе читаем свои же записи.
+            _state.replica = None
+            _state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Все базы хранят одни и те же данные.
+        return True
+
+
+class ReplicaRoutingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        reset()
+        try:
+            response = self.get_response(request)
+        finally:
+            wrote = reset()
+        if wrote:
+            window = settings.READ_YOUR_WRITES_WINDOW
+            response.set_cookie(
+                PIN_COOKIE, str(time.time() + window), max_age=window,
+                httponly=True, samesite='Lax',
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (settings.DATABASE_REPLICAS
+                and request.method in ('GET', 'HEAD')
+                and request.resolver_match.view_name
+                in settings.REPLICA_VIEWS
+                and not self.is_pinned(request)):
+            use_replica(random.choice(settings.DATABASE_REPLICAS))
+
+    @staticmethod
+    def is_pinned(request):
+        try:
+            return float(request.COOKIES.get(PIN_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
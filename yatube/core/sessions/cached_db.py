@@ -0,0 +1,66 @@
+"""Сессии в кэше с записью в базу только при изменении.
+
+Стандартный backend читает django_session на каждый запрос пользователя
+и пишет её при каждом сохранении — под той же блокировкой записи SQLite,
+что и посты. Здесь сессия читается из кэша SESSION_CACHE_ALIAS, а в базу
+пишется, только если изменились её данные или срок действия сдвинулся с
+прошлой записи больше чем на SESSION_DB_WRITE_INTERVAL секунд. Поэтому
+база хранит актуальные данные, и сессия переживает вытеснение из кэша.
+Кэш живёт до срока, записанного в базу: продлеваемая на каждом запросе
+сессия может истечь раньше не больше чем на интервал.
+
+Кэш должен быть общим для всех воркеров (проверка core.E002): иначе
+изменение или удаление сессии в одном воркере не дойдёт до кэшей
+остальных, и после выхода из системы они продолжат пускать
+пользователя до истечения своей записи.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.sessions.backends import cached_db
+
+from .db import BatchedCleanupMixin
+
+KEY_PREFIX = 'core.sessions'
+
+
+class SessionStore(BatchedCleanupMixin, cached_db.SessionStore):
+    cache_key_prefix = KEY_PREFIX
+
+    def __init__(self, session_key=None):
+        # (session_data, expire_date) последней записи в базу.
+        self._synced = None
+        super().__init__(session_key)
+
+    def load(self):
+        try:
+            self._synced = self._cache.get(self.cache_key)
+        except Exception:
+            # Memcached отвергает некорректные ключи: сессия сбрасывается.
+            self._synced = None
+        if self._synced is None:
+            session = self._get_session_from_db()
+            if session is None:
+                return {}
+            self._cache_synced(session.session_data, session.expire_date)
+        return self.decode(self._synced[0])
+
+    def save(self, must_create=False):
+        if self.session_key is None:
+            return self.create()
+        session_data = self.encode(self._get_session(no_load=must_create))
+        expire_date = self.get_expiry_date()
+        if (not must_create and self._synced is not None
+                and session_data == self._synced[0]
+                and expire_date - self._synced[1] < timedelta(
+                    seconds=settings.SESSION_DB_WRITE_INTERVAL)):
+            return
+        super(cached_db.SessionStore, self).save(must_create)
+        self._cache_synced(session_data, expire_date)
+
+    def _cache_synced(self, session_data, expire_date):
+        self._synced = (session_data, expire_date)
+        self._cache.set(
+            self.cache_key, self._synced,
+            self.get_expiry_age(expiry=expire_date),
+        )
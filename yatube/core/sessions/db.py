@@ -0,0 +1,31 @@
+"""Сессии в базе с удалением истёкших пачками."""
+from django.conf import settings
+from django.contrib.sessions.backends import db
+from django.utils import timezone
+
+
+class BatchedCleanupMixin:
+    @classmethod
+    def clear_expired(cls):
+        """Удаляет истёкшие сессии пачками по SESSION_CLEANUP_BATCH_SIZE.
+
+        Каждая пачка — отдельная короткая транзакция, так что записи
+        постов ждут блокировку не дольше одной пачки. Возвращает число
+        удалённых сессий.
+        """
+        batch_size = settings.SESSION_CLEANUP_BATCH_SIZE
+        model = cls.get_model_class()
+        expired = model.objects.filter(
+            expire_date__lt=timezone.now()
+        ).values_list('pk', flat=True)
+        deleted = 0
+        while True:
+            keys = list(expired[:batch_size])
+            if keys:
+                deleted += model.objects.filter(pk__in=keys).delete()[0]
+            if len(keys) < batch_size:
+                return deleted
+
+
+class SessionStore(BatchedCleanupMixin, db.SessionStore):
+    pass
@@ -0,0 +1,14 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import HttpResponse
+
+from .metrics import registry
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+@staff_member_required
+def metrics(request):
+    """Метрики процесса в текстовом формате Prometheus."""
+    return HttpResponse(
+        registry.expose(), content_type=PROMETHEUS_CONTENT_TYPE
+    )
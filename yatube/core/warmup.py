@@ -0,0 +1,48 @@
+import os
+
+from django.template import TemplateSyntaxError, engines
+from django.template.backends.django import DjangoTemplates
+
+
+def iter_template_names(engine):
+    """Имена всех .html-шаблонов из каталогов DIRS движка."""
+    for directory in engine.dirs:
+        for root, _, files in os.walk(directory):
+            for filename in sorted(files):
+                if filename.endswith('.html'):
+                    path = os.path.join(root, filename)
+                    yield os.path.relpath(path, directory).replace(
+                        os.sep, '/'
+                    )
+
+
+def compile_templates():
+    """Загружает и разбирает все шаблоны проекта.
+
+    С кэширующим загрузчиком разобранные шаблоны остаются в памяти
+    процесса, и первые запросы после деплоя не тратят время на разбор.
+    Возвращает (число шаблонов, [(имя, ошибка)]).
+    """
+    count = 0
+    errors = []
+    for backend in engines.all():
+        if not isinstance(backend, DjangoTemplates):
+            continue
+        for name in iter_template_names(backend.engine):
+            try:
+                backend.engine.get_template(name)
+            except TemplateSyntaxError as error:
+                errors.append((name, error))
+            count += 1
+    return count, errors
+
+
+def warm_up_templates():
+    """Компилирует шаблоны при старте воркера, падая на первой же
+    синтаксической ошибке, а не на запросе пользователя."""
+    count, errors = compile_templates()
+    if errors:
+        raise TemplateSyntaxError(
+            '; '.join(f'{name}: {error}' for name, error in errors)
+        )
+    return count
@@ -1,6 +1,8 @@
 from django.contrib import admin
+from django.db.models.expressions import RawSQL
 
 from .models import Post, Group
+from .search import FTS_TABLE, build_match_query, fts_enabled
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -16,6 +18,19 @@ class PostAdmin(admin.ModelAdmin):
     list_filter = ('pub_date',)
     empty_value_display = '-пусто-'
 
+    def get_search_results(self, request, queryset, search_term):
+        """Ищет по индексу FTS5 вместо LIKE '%term%'."""
+        match = build_match_query(search_term)
+        if match is None or not fts_enabled(queryset.db):
+            return super().get_search_results(
+                request, queryset, search_term
+            )
+        ids = RawSQL(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+            [match],
+        )
+        return queryset.filter(pk__in=ids), False
+
 
 class GroupAdmin(admin.ModelAdmin):
     list_display = (
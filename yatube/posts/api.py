@@ -0,0 +1,168 @@
+"""Read-only JSON API постов.
+
+Строки сериализуются прямо из ``values()``: ни Post, ни User не
+создаются, а связанные поля приходят одним JOIN. Списки листаются
+курсором (``?after=``/``?before=``), набор полей задаётся ``?fields=``.
+"""
+from functools import wraps
+
+from django.http import JsonResponse
+
+from .cache import author_feed, cache_feed_page, global_feed, group_feed
+from .conditional import feed_condition
+from .models import Group, Post, User
+from .paginators import CursorPaginator
+from .trending import TRENDING_MAX, WINDOWS, top_authors, top_groups
+from .views import LIM_POST, LIM_TRENDING
+
+# Поле API -> выражение для values().
+API_FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'last_modified': 'last_modified',
+    'author': 'author__username',
+    'group': 'group__slug',
+    'group_title': 'group__title',
+}
+DEFAULT_FIELDS = ('id', 'text', 'pub_date', 'author', 'group')
+# Ключ курсора читается из каждой строки, даже если поле не запрошено.
+CURSOR_FIELDS = ('id', 'pub_date')
+API_MAX_LIMIT = 100
+
+
+class ApiError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def error_response(message, status):
+    return JsonResponse({'detail': message}, status=status)
+
+
+def api_view(view_func):
+    """Превращает ApiError в JSON-ответ с кодом ошибки."""
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return view_func(request, *args, **kwargs)
+        except ApiError as error:
+            return error_response(str(error), error.status)
+    return wrapper
+
+
+def requested_fields(request):
+    fields = request.GET.get('fields')
+    if not fields:
+        return DEFAULT_FIELDS
+    fields = tuple(dict.fromkeys(
+        field.strip() for field in fields.split(',') if field.strip()
+    ))
+    unknown = [field for field in fields if field not in API_FIELDS]
+    if unknown or not fields:
+        raise ApiError(
+            f'Неизвестные поля: {", ".join(unknown)}; '
+            f'доступны: {", ".join(API_FIELDS)}'
+        )
+    return fields
+
+
+def requested_limit(request, default=LIM_POST, maximum=API_MAX_LIMIT):
+    limit = request.GET.get('limit', str(default))
+    if not limit.isdigit() or not 1 <= int(limit) <= maximum:
+        raise ApiError(f'limit должен быть от 1 до {maximum}')
+    return int(limit)
+
+
+def post_rows(queryset, fields):
+    """queryset.values() под запрошенные поля плюс ключ курсора."""
+    lookups = {API_FIELDS[field] for field in fields + CURSOR_FIELDS}
+    return queryset.values(*sorted(lookups))
+
+
+def serialize(row, fields):
+    return {field: row[API_FIELDS[field]] for field in fields}
+
+
+def page_url(request, **cursor):
+    query = request.GET.copy()
+    query.pop('after', None)
+    query.pop('before', None)
+    query.update(cursor)
+    return f'{request.path}?{query.urlencode()}'
+
+
+def post_list_response(request, queryset):
+    fields = requested_fields(request)
+    page = CursorPaginator(
+        post_rows(queryset, fields), requested_limit(request)
+    ).page(request.GET.get('after'), request.GET.get('before'))
+    return JsonResponse({
+        'results': [serialize(row, fields) for row in page],
+        'next': page_url(request, after=page.next_cursor)
+        if page.has_next() else None,
+        'previous': page_url(request, before=page.previous_cursor)
+        if page.has_previous() else None,
+    })
+
+
+def object_id(queryset, **lookup):
+    pk = queryset.filter(**lookup).values_list('pk', flat=True).first()
+    if pk is None:
+        raise ApiError('Не найдено', status=404)
+    return pk
+
+
+@feed_condition(global_feed, public=True)
+@cache_feed_page(global_feed, public=True)
+@api_view
+def index(request):
+    """Общая лента."""
+    return post_list_response(request, Post.objects.all())
+
+
+@feed_condition(group_feed, public=True)
+@cache_feed_page(group_feed, public=True)
+@api_view
+def group_posts(request, slug):
+    """Лента группы."""
+    group_id = object_id(Group.objects, slug=slug)
+    return post_list_response(
+        request, Post.objects.filter(group_id=group_id)
+    )
+
+
+@feed_condition(author_feed, public=True)
+@cache_feed_page(author_feed, public=True)
+@api_view
+def profile(request, username):
+    """Лента автора."""
+    author_id = object_id(User.objects, username=username)
+    return post_list_response(
+        request, Post.objects.filter(author_id=author_id)
+    )
+
+
+@api_view
+def post_detail(request, post_id):
+    """Один пост."""
+    fields = requested_fields(request)
+    row = post_rows(Post.objects.filter(pk=post_id), fields).first()
+    if row is None:
+        raise ApiError('Не найдено', status=404)
+    return JsonResponse(serialize(row, fields))
+
+
+@api_view
+def trending(request):
+    """Самые активные группы и авторы за окно ?window= (hour, day, week)."""
+    window = request.GET.get('window', 'day')
+    if window not in WINDOWS:
+        raise ApiError(f'window должен быть одним из: {", ".join(WINDOWS)}')
+    limit = requested_limit(request, LIM_TRENDING, TRENDING_MAX)
+    return JsonResponse({
+        'window': window,
+        'groups': top_groups(window, limit),
+        'authors': top_authors(window, limit),
+    })
@@ -1,5 +1,21 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def reinstall_fts(sender, using, **kwargs):
+    """Восстанавливает триггеры FTS5, потерянные при пересоздании
+    таблицы постов в миграциях."""
+    from django.db import connections
+
+    from .search import FTS_TABLE, install_fts
+    connection = connections[using]
+    if FTS_TABLE in connection.introspection.table_names():
+        install_fts(connection)
 
 
 class PostsConfig(AppConfig):
     name = 'posts'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        post_migrate.connect(reinstall_fts, sender=self)
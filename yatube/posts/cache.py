@@ -0,0 +1,252 @@
+import hashlib
+import time
+import uuid
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from core.routers import replica_may_be_stale
+
+VERSION_KEY = 'posts:version:{kind}:{pk}'
+CARD_KEY = 'posts:card:{template}:{post}:{author}:{group}'
+CARD_STATS_KEY = 'posts:card-stats:{}'
+FEED_KEY = 'posts:feed:{}'
+PAGE_KEY = 'posts:page:{path}:{generations}'
+COUNT_KEY = 'posts:count:{}'
+
+SITE_FEED = 'site'
+GLOBAL_FEED = 'global'
+# Каталог групп: меняется с постами в группах и с самими группами.
+GROUP_DIRECTORY_FEED = 'groups'
+
+
+def _version_key(kind, pk):
+    return VERSION_KEY.format(kind=kind, pk=pk)
+
+
+def bump_version(kind, pk):
+    """Сбрасывает закэшированные фрагменты объекта: 'post', 'author'
+    или 'group'. Старые записи просто перестают запрашиваться."""
+    cache.set(_version_key(kind, pk), uuid.uuid4().hex, None)
+
+
+def get_versions(keys):
+    """Возвращает версии по ключам, заводя недостающие.
+
+    Версия, вытесненная из кэша, получает новое случайное значение,
+    а не начинается заново, поэтому старый фрагмент не воскреснет.
+    """
+    versions = cache.get_many(keys)
+    missing = {
+        key: uuid.uuid4().hex for key in keys if key not in versions
+    }
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return versions
+
+
+def _card_keys(posts, template_name):
+    version_keys = set()
+    for post in posts:
+        version_keys.add(_version_key('post', post.pk))
+        version_keys.add(_version_key('author', post.author_id))
+        if post.group_id is not None:
+            version_keys.add(_version_key('group', post.group_id))
+    versions = get_versions(list(version_keys))
+
+    def version(kind, pk):
+        if pk is None:
+            return '-'
+        return f'{pk}.{versions[_version_key(kind, pk)]}'
+
+    return [
+        CARD_KEY.format(
+            template=template_name,
+            post=version('post', post.pk),
+            author=version('author', post.author_id),
+            group=version('group', post.group_id),
+        )
+        for post in posts
+    ]
+
+
+def _count_card_lookups(hits, misses):
+    for name, value in (('hits', hits), ('misses', misses)):
+        if not value:
+            continue
+        key = CARD_STATS_KEY.format(name)
+        try:
+            cache.incr(key, value)
+        except ValueError:
+            if not cache.add(key, value, None):
+                cache.incr(key, value)
+
+
+def render_post_cards(posts, template_name):
+    """Возвращает HTML карточек постов, собирая их из кэша.
+
+    Все карточки страницы читаются одним ``get_many``; отрисовываются
+    и кладутся в кэш только отсутствующие.
+    """
+    posts = list(posts)
+    keys = _card_keys(posts, template_name)
+    cached = cache.get_many(keys)
+    rendered = {}
+    cards = []
+    for key, post in zip(keys, posts):
+        if key not in cached:
+            rendered[key] = render_to_string(template_name, {'post': post})
+        cards.append(mark_safe(cached.get(key) or rendered[key]))
+    if rendered:
+        cache.set_many(rendered, settings.POST_CARD_CACHE_TIMEOUT)
+    _count_card_lookups(len(posts) - len(rendered), len(rendered))
+    return cards
+
+
+def card_cache_stats():
+    """Счётчики попаданий в кэш карточек для мониторинга."""
+    names = ('hits', 'misses')
+    values = cache.get_many([CARD_STATS_KEY.format(name) for name in names])
+    stats = {
+        name: values.get(CARD_STATS_KEY.format(name), 0) for name in names
+    }
+    total = stats['hits'] + stats['misses']
+    stats['hit_ratio'] = stats['hits'] / total if total else 0.0
+    return stats
+
+
+def reset_card_cache_stats():
+    cache.delete_many(
+        [CARD_STATS_KEY.format(name) for name in ('hits', 'misses')]
+    )
+
+
+def global_feed():
+    return GLOBAL_FEED
+
+
+def group_directory_feed():
+    return GROUP_DIRECTORY_FEED
+
+
+def group_feed(slug):
+    return f'group:{slug}'
+
+
+def author_feed(username):
+    return f'author:{username}'
+
+
+def bump_feeds(*feeds):
+    """Отмечает изменение лент; их закэшированные страницы устаревают.
+
+    Поколение ленты — время последнего изменения в наносекундах.
+    """
+    generation = time.time_ns()
+    cache.set_many(
+        {FEED_KEY.format(feed): generation for feed in feeds},
+        settings.FEED_GENERATION_TIMEOUT,
+    )
+
+
+def get_feed_generations(*feeds):
+    """Возвращает поколения лент; потерянное поколение считается
+    изменённым только что."""
+    keys = [FEED_KEY.format(feed) for feed in feeds]
+    generations = cache.get_many(keys)
+    missing = {
+        key: time.time_ns() for key in keys if key not in generations
+    }
+    if missing:
+        cache.set_many(missing, settings.FEED_GENERATION_TIMEOUT)
+        generations.update(missing)
+    return [generations[key] for key in keys]
+
+
+def _is_cacheable_page(request):
+    if request.GET.get('after') or request.GET.get('before'):
+        return False
+    page = request.GET.get('page', '1')
+    return page.isdigit() and int(page) <= settings.FEED_PAGE_CACHE_MAX_PAGE
+
+
+def cache_feed_page(feed, public=False):
+    """Кэширует целиком страницы ленты для анонимных GET-запросов.
+
+    ``feed`` получает именованные аргументы view и возвращает имя
+    ленты. Запись кэша привязана к поколениям этой ленты и всего сайта,
+    поэтому устаревает сразу после изменения постов ленты.
+    С ``public=True`` (RSS/Atom) ответ одинаков для всех и кэшируется
+    для любого пользователя без обращения к сессии, то есть без
+    запросов к базе при попадании.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if (request.method not in ('GET', 'HEAD')
+                    or (not public and request.user.is_authenticated)
+                    or not _is_cacheable_page(request)):
+                return view_func(request, *args, **kwargs)
+            generations = get_feed_generations(SITE_FEED, feed(**kwargs))
+            # Адрес с хостом: ленты RSS/Atom содержат абсолютные ссылки.
+            path = hashlib.md5(
+                request.build_absolute_uri().encode()
+            ).hexdigest()
+            key = PAGE_KEY.format(
+                path=path,
+                generations='.'.join(map(str, generations)),
+            )
+            cached = cache.get(key)
+            if cached is not None:
+                content, content_type = cached
+                return HttpResponse(content, content_type=content_type)
+            response = view_func(request, *args, **kwargs)
+            if (response.status_code == 200 and not response.streaming
+                    # Реплика могла ещё не получить последнее изменение:
+                    # такую страницу не кэшируем под новым поколением.
+                    and not replica_may_be_stale(max(generations))):
+                cache.set(
+                    key,
+                    (response.content, response['Content-Type']),
+                    settings.FEED_PAGE_CACHE_TIMEOUT,
+                )
+            return response
+        return wrapper
+    return decorator
+
+
+def feed_count_key(group_id=None):
+    """Ключ кэша с числом постов общей ленты или ленты группы."""
+    if group_id is None:
+        return COUNT_KEY.format(GLOBAL_FEED)
+    return COUNT_KEY.format(f'group:{group_id}')
+
+
+def group_directory_count_key():
+    """Ключ кэша с числом групп в каталоге."""
+    return COUNT_KEY.format('groups')
+
+
+def adjust_feed_counts(keys, delta):
+    """Сдвигает закэшированные счётчики лент; отсутствующие
+    посчитает paginator при следующем чтении."""
+    for key in keys:
+        try:
+            cache.incr(key, delta)
+        except ValueError:
+            pass
+
+
+def reset_feeds(group_ids=()):
+    """Сбрасывает страницы и счётчики лент после массовой загрузки
+    постов, которая обходит сигналы."""
+    bump_feeds(SITE_FEED)
+    cache.delete_many(
+        [feed_count_key(), group_directory_count_key()]
+        + [feed_count_key(pk) for pk in group_ids]
+    )
@@ -0,0 +1,89 @@
+import hashlib
+from datetime import datetime, timezone
+
+from django.views.decorators.http import condition
+
+from .cache import (SITE_FEED, author_feed, get_feed_generations,
+                    group_feed)
+from .models import Post
+
+
+def _viewer(request):
+    """Шапка страницы зависит от пользователя, а значит и валидатор.
+
+    Для вошедшего пользователя в валидатор входит хэш ключа сессии и
+    секрета CSRF: после повторного входа или смены токена страница с
+    формами старого токена не подтверждается ответом 304.
+    """
+    if request.user.is_authenticated:
+        session = hashlib.md5(
+            f'{request.session.session_key}:'
+            f'{request.META.get("CSRF_COOKIE", "")}'.encode()
+        ).hexdigest()[:12]
+        return f'u{request.user.pk}.{session}'
+    return 'anon'
+
+
+def _from_generation(generation):
+    return datetime.fromtimestamp(generation / 10 ** 9, tz=timezone.utc)
+
+
+def feed_condition(feed, public=False):
+    """Conditional GET для ленты без запросов к базе.
+
+    Валидаторы строятся из поколений ленты и сайта: ETag — из самих
+    поколений, Last-Modified — из времени последнего изменения.
+    Для ``public``-ответов (RSS/Atom) ETag не зависит от пользователя.
+    """
+    def get_generations(request, **kwargs):
+        return get_feed_generations(SITE_FEED, feed(**kwargs))
+
+    def etag(request, **kwargs):
+        parts = get_generations(request, **kwargs)
+        if not public:
+            parts = parts + [_viewer(request)]
+        return '-'.join(map(str, parts))
+
+    def last_modified(request, **kwargs):
+        return _from_generation(max(get_generations(request, **kwargs)))
+
+    return condition(etag_func=etag, last_modified_func=last_modified)
+
+
+def _post_validator(request, post_id):
+    """Время правки поста и поколения связанных лент, один запрос."""
+    if not hasattr(request, '_post_validator'):
+        row = Post.objects.filter(pk=post_id).values_list(
+            'last_modified', 'author__username', 'group__slug'
+        ).first()
+        validator = None
+        if row is not None:
+            last_modified, username, slug = row
+            feeds = [SITE_FEED, author_feed(username)]
+            if slug is not None:
+                feeds.append(group_feed(slug))
+            validator = (last_modified, get_feed_generations(*feeds))
+        request._post_validator = validator
+    return request._post_validator
+
+
+def post_etag(request, post_id):
+    validator = _post_validator(request, post_id)
+    if validator is None:
+        return None
+    last_modified, generations = validator
+    parts = [last_modified.timestamp()] + generations + [_viewer(request)]
+    return '-'.join(map(str, parts))
+
+
+def post_last_modified(request, post_id):
+    validator = _post_validator(request, post_id)
+    if validator is None:
+        return None
+    last_modified, generations = validator
+    return max(last_modified, _from_generation(max(generations)))
+
+
+post_condition = condition(
+    etag_func=post_etag, last_modified_func=post_last_modified
+)
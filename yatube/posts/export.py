@@ -0,0 +1,75 @@
+import csv
+import json
+
+from django.db.models import Q
+
+from .models import Post
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+}
+EXPORT_COLUMNS = ('id', 'pub_date', 'author', 'group', 'text')
+EXPORT_CHUNK_SIZE = 2000
+
+
+def iter_export_rows(author=None, group=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """Посты автора, группы или всего сайта в хронологическом порядке.
+
+    Читает порциями по ключу (pub_date, id) через ``values()``: каждая
+    порция — короткий запрос по индексу ленты, в памяти одновременно
+    не больше ``chunk_size`` строк, и долгий курсор не держит
+    транзакцию чтения открытой весь экспорт.
+    """
+    queryset = Post.objects.values_list(
+        'id', 'pub_date', 'author__username', 'group__slug', 'text'
+    ).order_by('pub_date', 'id')
+    if author is not None:
+        queryset = queryset.filter(author=author)
+    if group is not None:
+        queryset = queryset.filter(group=group)
+    chunk = list(queryset[:chunk_size])
+    while chunk:
+        yield from chunk
+        if len(chunk) < chunk_size:
+            return
+        pk, pub_date = chunk[-1][:2]
+        chunk = list(queryset.filter(
+            Q(pub_date__gte=pub_date) & ~Q(pub_date=pub_date, id__lte=pk)
+        )[:chunk_size])
+
+
+class Echo:
+    """Буфер для csv.writer, который просто возвращает записанную строку."""
+
+    def write(self, value):
+        return value
+
+
+def ndjson_lines(rows):
+    for pk, pub_date, author, group, text in rows:
+        yield json.dumps({
+            'id': pk,
+            'pub_date': pub_date.isoformat(),
+            'author': author,
+            'group': group,
+            'text': text,
+        }, ensure_ascii=False) + '\n'
+
+
+def csv_lines(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_COLUMNS)
+    for pk, pub_date, author, group, text in rows:
+        yield writer.writerow(
+            (pk, pub_date.isoformat(), author, group or '', text)
+        )
+
+
+def export_lines(export_format, author=None, group=None,
+                 chunk_size=EXPORT_CHUNK_SIZE):
+    """Строки экспорта в формате 'ndjson' или 'csv' по мере чтения."""
+    rows = iter_export_rows(author, group, chunk_size)
+    if export_format == 'csv':
+        return csv_lines(rows)
+    return ndjson_lines(rows)
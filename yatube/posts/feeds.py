@@ -0,0 +1,105 @@
+from django.contrib.syndication.views import Feed
+from django.shortcuts import get_object_or_404
+from django.template.defaultfilters import truncatechars
+from django.urls import reverse, reverse_lazy
+from django.utils.feedgenerator import Atom1Feed
+
+from .cache import author_feed, cache_feed_page, global_feed, group_feed
+from .conditional import feed_condition
+from .models import Group, Post, User
+
+FEED_ITEMS = 20
+
+
+class LatestPostsFeed(Feed):
+    """RSS последних постов сайта."""
+    title = 'Yatube: последние посты'
+    link = reverse_lazy('posts:index')
+    description = 'Новые записи всех авторов Yatube.'
+
+    def items(self):
+        return Post.objects.select_related('author')[:FEED_ITEMS]
+
+    def item_title(self, item):
+        return truncatechars(item.text, 50)
+
+    def item_description(self, item):
+        return item.text
+
+    def item_link(self, item):
+        return reverse('posts:post_detail', args=[item.pk])
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_updateddate(self, item):
+        return item.last_modified
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username
+
+
+class GroupPostsFeed(LatestPostsFeed):
+    """RSS постов группы."""
+
+    def get_object(self, request, slug):
+        return get_object_or_404(Group, slug=slug)
+
+    def title(self, group):
+        return f'Yatube: {group.title}'
+
+    def link(self, group):
+        return reverse('posts:group_list', args=[group.slug])
+
+    def description(self, group):
+        return group.description
+
+    def items(self, group):
+        return group.posts.select_related('author')[:FEED_ITEMS]
+
+
+class AuthorPostsFeed(LatestPostsFeed):
+    """RSS постов автора."""
+
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def title(self, author):
+        return f'Yatube: {author.get_full_name() or author.username}'
+
+    def link(self, author):
+        return reverse('posts:profile', args=[author.username])
+
+    def description(self, author):
+        return f'Записи пользователя {author.username}.'
+
+    def items(self, author):
+        return author.posts.select_related('author')[:FEED_ITEMS]
+
+
+class AtomLatestPostsFeed(LatestPostsFeed):
+    feed_type = Atom1Feed
+
+
+class AtomGroupPostsFeed(GroupPostsFeed):
+    feed_type = Atom1Feed
+
+
+class AtomAuthorPostsFeed(AuthorPostsFeed):
+    feed_type = Atom1Feed
+
+
+def cached_feed(feed_view, feed):
+    """Кэширует ленту по поколениям её постов и отвечает на conditional
+    GET; повторный опрос не обращается к базе."""
+    return feed_condition(feed, public=True)(
+        cache_feed_page(feed, public=True)(feed_view)
+    )
+
+
+index_rss = cached_feed(LatestPostsFeed(), global_feed)
+index_atom = cached_feed(AtomLatestPostsFeed(), global_feed)
+group_rss = cached_feed(GroupPostsFeed(), group_feed)
+group_atom = cached_feed(AtomGroupPostsFeed(), group_feed)
+profile_rss = cached_feed(AuthorPostsFeed(), author_feed)
+profile_atom = cached_feed(AtomAuthorPostsFeed(), author_feed)
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from posts.cache import card_cache_stats, reset_card_cache_stats
+
+
+class Command(BaseCommand):
+    help = 'Показывает долю попаданий в кэш карточек постов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Обнулить счётчики после вывода.',
+        )
+
+    def handle(self, *args, **options):
+        stats = card_cache_stats()
+        self.stdout.write(
+            f'hits={stats["hits"]} misses={stats["misses"]} '
+            f'hit_ratio={stats["hit_ratio"]:.3f}'
+        )
+        if options['reset']:
+            reset_card_cache_stats()
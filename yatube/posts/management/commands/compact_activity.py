@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from posts.trending import compact_activity
+
+
+class Command(BaseCommand):
+    help = (
+        'Сворачивает часовые счётчики активности старше суток в суточные '
+        'и удаляет счётчики старше недели. Запускать периодически.'
+    )
+
+    def handle(self, *args, **options):
+        rolled, expired = compact_activity(timezone.now())
+        self.stdout.write(
+            f'Свёрнуто часовых корзин: {rolled}, удалено устаревших: '
+            f'{expired}'
+        )
@@ -0,0 +1,56 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.export import EXPORT_CHUNK_SIZE, EXPORT_FORMATS, export_lines
+from posts.models import Group
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает посты автора, группы или всего сайта в NDJSON или CSV '
+        'потоком, не загружая их в память целиком.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--author', help='Имя пользователя автора.')
+        parser.add_argument('--group', help='Слаг группы.')
+        parser.add_argument(
+            '--format', choices=tuple(EXPORT_FORMATS), default='ndjson'
+        )
+        parser.add_argument(
+            '--output', default='-',
+            help='Файл для выгрузки; "-" — стандартный вывод.',
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=EXPORT_CHUNK_SIZE,
+            help='Сколько постов читать из базы за один запрос.',
+        )
+
+    def handle(self, *args, **options):
+        author = group = None
+        if options['author']:
+            author = self.get_object(User, username=options['author'])
+        if options['group']:
+            group = self.get_object(Group, slug=options['group'])
+        lines = export_lines(
+            options['format'], author, group, options['chunk_size']
+        )
+        if options['output'] == '-':
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        count = 0
+        with open(options['output'], 'w', encoding='utf-8',
+                  newline='') as output:
+            for line in lines:
+                output.write(line)
+                count += 1
+        self.stderr.write(f'Выгружено строк: {count}')
+
+    def get_object(self, model, **lookup):
+        try:
+            return model.objects.get(**lookup)
+        except model.DoesNotExist:
+            raise CommandError(f'Не найдено: {lookup}')
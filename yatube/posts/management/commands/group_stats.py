@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.stats import find_stale_group_stats, rebuild_group_stats
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает или проверяет статистику групп для каталога.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только проверить счётчики, ничего не меняя.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Размер пакета для bulk_create/bulk_update.',
+        )
+
+    def handle(self, *args, **options):
+        if not options['check']:
+            fixed = rebuild_group_stats(batch_size=options['batch_size'])
+            self.stdout.write(f'Исправлено записей: {fixed}')
+            return
+        stale = find_stale_group_stats()
+        for group_id, (stored, expected) in sorted(stale.items()):
+            self.stdout.write(
+                f'group_id={group_id}: сохранено {stored}, '
+                f'фактически {expected}'
+            )
+        if stale:
+            raise CommandError(f'Расхождений в статистике: {len(stale)}')
+        self.stdout.write('Статистика групп в порядке')
@@ -0,0 +1,256 @@
+import csv
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from posts.cache import reset_feeds
+from posts.models import Group, Post, bulk_create_with_dates
+from posts.stats import add_group_post, add_post
+
+User = get_user_model()
+
+FORMATS = ('jsonl', 'csv')
+# Держим IN (...) ниже лимита переменных в запросе у старых SQLite.
+LOOKUP_CHUNK = 500
+
+
+class LookupMap:
+    """Словарь «естественный ключ → id» с догрузкой недостающих ключей.
+
+    Растёт с числом разных авторов и групп, а не с размером входа.
+    """
+
+    def __init__(self, queryset, field):
+        self.queryset = queryset
+        self.field = field
+        self.ids = {}
+
+    def load(self, keys):
+        missing = list({key for key in keys if key and key not in self.ids})
+        for start in range(0, len(missing), LOOKUP_CHUNK):
+            chunk = missing[start:start + LOOKUP_CHUNK]
+            found = dict(self.queryset.filter(
+                **{f'{self.field}__in': chunk}
+            ).values_list(self.field, 'pk'))
+            # Неизвестный ключ запоминается, чтобы не искать его снова.
+            self.ids.update({key: found.get(key) for key in chunk})
+
+    def get(self, key):
+        return self.ids.get(key)
+
+
+def read_jsonl(stream):
+    for line in stream:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as error:
+            yield error
+            continue
+        yield record if isinstance(record, dict) else ValueError(
+            'ожидался JSON-объект'
+        )
+
+
+def read_csv(stream):
+    yield from csv.DictReader(stream)
+
+
+class Command(BaseCommand):
+    help = (
+        'Импортирует посты из JSONL или CSV (поля text, author, group, '
+        'pub_date) пакетами через bulk_create; прерванный импорт '
+        'продолжается с контрольной точки.'
+    )
+    stealth_options = ('stdin',)
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'source', nargs='?', default='-',
+            help='Файл с постами; "-" — стандартный ввод.',
+        )
+        parser.add_argument(
+            '--format', choices=FORMATS,
+            help='Формат входа; по умолчанию по расширению файла, '
+                 'для стандартного ввода — jsonl.',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--checkpoint',
+            help='Файл контрольной точки; по умолчанию '
+                 '<source>.checkpoint, для стандартного ввода не ведётся.',
+        )
+
+    def handle(self, *args, **options):
+        self.stdin = options.get('stdin', sys.stdin)
+        source = options['source']
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть не меньше 1')
+        checkpoint = options['checkpoint']
+        if checkpoint is None and source != '-':
+            checkpoint = f'{source}.checkpoint'
+        done = self.read_checkpoint(checkpoint)
+        if done:
+            self.stdout.write(f'Продолжаем после записи {done}')
+        with self.open_source(source) as stream:
+            if self.get_format(source, options['format']) == 'csv':
+                records = read_csv(stream)
+            else:
+                records = read_jsonl(stream)
+            records = islice(enumerate(records, 1), done, None)
+            total = self.import_records(
+                records, done, options['batch_size'], checkpoint
+            )
+        if checkpoint is not None and os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        self.stdout.write(f'Готово: {total} записей')
+
+    def get_format(self, source, format_name):
+        if format_name:
+            return format_name
+        if source.lower().endswith('.csv'):
+            return 'csv'
+        return 'jsonl'
+
+    @contextmanager
+    def open_source(self, source):
+        if source == '-':
+            yield self.stdin
+            return
+        try:
+            stream = open(source, encoding='utf-8', newline='')
+        except OSError as error:
+            raise CommandError(f'Не удалось открыть {source}: {error}')
+        with stream:
+            yield stream
+
+    def read_checkpoint(self, checkpoint):
+        if checkpoint is None or not os.path.exists(checkpoint):
+            return 0
+        with open(checkpoint) as file:
+            try:
+                return int(file.read().strip())
+            except ValueError:
+                raise CommandError(
+                    f'Повреждена контрольная точка {checkpoint}'
+                )
+
+    def write_checkpoint(self, checkpoint, done):
+        if checkpoint is None:
+            return
+        temporary = f'{checkpoint}.tmp'
+        with open(temporary, 'w') as file:
+            file.write(str(done))
+        os.replace(temporary, checkpoint)
+
+    def import_records(self, records, done, batch_size, checkpoint):
+        """Импортирует записи пакетами, возвращает число обработанных.
+
+        Пакет и статистика его авторов фиксируются одной транзакцией,
+        контрольная точка записывается сразу после неё: после сбоя
+        импорт продолжается с первого незафиксированного пакета.
+        """
+        authors = LookupMap(User.objects.all(), 'username')
+        groups = LookupMap(Group.objects.all(), 'slug')
+        touched_groups = set()
+        started = time.perf_counter()
+        imported = 0
+        try:
+            while True:
+                batch = list(islice(records, batch_size))
+                if not batch:
+                    break
+                posts = self.build_posts(batch, authors, groups)
+                with transaction.atomic():
+                    bulk_create_with_dates(posts)
+                    self.update_stats(posts)
+                done = batch[-1][0]
+                self.write_checkpoint(checkpoint, done)
+                imported += len(posts)
+                touched_groups.update(
+                    post.group_id for post in posts if post.group_id
+                )
+                rate = imported / (time.perf_counter() - started)
+                self.stdout.write(
+                    f'Импортировано: {done} ({rate:.0f} записей/с)'
+                )
+        finally:
+            if imported:
+                reset_feeds(touched_groups)
+        return done
+
+    def build_posts(self, batch, authors, groups):
+        for number, record in batch:
+            if isinstance(record, Exception):
+                raise CommandError(f'Запись {number}: {record}')
+        authors.load(record.get('author') for _, record in batch)
+        groups.load(record.get('group') for _, record in batch)
+        return [
+            self.build_post(number, record, authors, groups)
+            for number, record in batch
+        ]
+
+    def build_post(self, number, record, authors, groups):
+        text = record.get('text')
+        if not text:
+            raise CommandError(f'Запись {number}: пустой текст')
+        author_id = authors.get(record.get('author'))
+        if author_id is None:
+            raise CommandError(
+                f'Запись {number}: нет пользователя '
+                f'"{record.get("author")}"'
+            )
+        group_id = None
+        if record.get('group'):
+            group_id = groups.get(record['group'])
+            if group_id is None:
+                raise CommandError(
+                    f'Запись {number}: нет группы "{record["group"]}"'
+                )
+        return Post(
+            text=text, author_id=author_id, group_id=group_id,
+            pub_date=self.parse_pub_date(number, record.get('pub_date')),
+        )
+
+    def parse_pub_date(self, number, value):
+        if not value:
+            return timezone.now()
+        try:
+            pub_date = parse_datetime(value)
+        except ValueError:
+            pub_date = None
+        if pub_date is None:
+            raise CommandError(f'Запись {number}: неверная дата "{value}"')
+        if timezone.is_naive(pub_date):
+            pub_date = timezone.make_aware(pub_date)
+        return pub_date
+
+    @staticmethod
+    def batch_stats(posts, owner_field):
+        """{владелец: (число постов, самая поздняя дата)} по пакету."""
+        stats = {}
+        for post in posts:
+            owner_id = getattr(post, owner_field)
+            if owner_id is None:
+                continue
+            count, last = stats.get(owner_id, (0, post.pub_date))
+            stats[owner_id] = (count + 1, max(last, post.pub_date))
+        return stats
+
+    def update_stats(self, posts):
+        for author_id, (count, last) in self.batch_stats(
+                posts, 'author_id').items():
+            add_post(author_id, last, count)
+        for group_id, (count, last) in self.batch_stats(
+                posts, 'group_id').items():
+            add_group_post(group_id, last, count)
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, router
+
+from posts.models import Post
+from posts.search import FTS_TABLE, install_fts, rebuild_fts, supports_fts
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает полнотекстовый индекс постов FTS5.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database',
+            help='Псевдоним базы; по умолчанию та, куда пишутся посты.',
+        )
+
+    def handle(self, *args, **options):
+        using = options['database'] or router.db_for_write(Post)
+        if using not in connections.databases:
+            raise CommandError(f'Нет базы "{using}"')
+        connection = connections[using]
+        if not supports_fts(connection):
+            raise CommandError('База данных не поддерживает SQLite FTS5')
+        if not install_fts(connection):
+            rebuild_fts(connection)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')"
+            )
+        self.stdout.write('Поисковый индекс перестроен')
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from posts.timeline import rebuild_timelines
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересобирает ленты подписок, например после import_posts '
+        'или seed_data, которые обходят сигналы.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Сколько подписок читать за один запрос.',
+        )
+
+    def handle(self, *args, **options):
+        done = rebuild_timelines(batch_size=options['batch_size'])
+        self.stdout.write(f'Лент подписок пересобрано: {done}')
@@ -0,0 +1,132 @@
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from posts.cache import reset_feeds
+from posts.models import Group, Post, bulk_create_with_dates
+from posts.stats import rebuild_author_stats, rebuild_group_stats
+
+User = get_user_model()
+
+WORDS = (
+    'жизнь работа город утро вечер книга дорога море лес друг идея '
+    'проект музыка кофе дождь солнце поезд письмо вопрос ответ память'
+).split()
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу воспроизводимым набором пользователей, групп '
+        'и постов для нагрузочного тестирования.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000)
+        parser.add_argument('--groups', type=int, default=500)
+        parser.add_argument('--posts', type=int, default=5000000)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Зерно генератора: одинаковое зерно — одинаковые данные.',
+        )
+        parser.add_argument(
+            '--prefix', default='seed',
+            help='Префикс имён пользователей и слагов групп.',
+        )
+        parser.add_argument(
+            '--days', type=int, default=365,
+            help='За сколько дней до 2024-01-01 распределить посты.',
+        )
+
+    def handle(self, *args, **options):
+        prefix = options['prefix']
+        if options['posts'] and not options['users']:
+            raise CommandError('Для постов нужен хотя бы один пользователь')
+        if User.objects.filter(username__startswith=prefix).exists():
+            raise CommandError(
+                f'Пользователи с префиксом "{prefix}" уже есть, '
+                'выберите другой --prefix'
+            )
+        rng = random.Random(options['seed'])
+        batch_size = options['batch_size']
+        started = time.perf_counter()
+        user_ids = self.create_users(prefix, options['users'], batch_size)
+        group_ids = self.create_groups(prefix, options['groups'], batch_size)
+        self.create_posts(
+            rng, user_ids, group_ids, options['posts'], batch_size,
+            options['days'],
+        )
+        rebuild_author_stats(batch_size=batch_size)
+        rebuild_group_stats(batch_size=batch_size)
+        reset_feeds(group_ids)
+        self.stdout.write(
+            f'Готово за {time.perf_counter() - started:.1f} с'
+        )
+
+    def create_users(self, prefix, count, batch_size):
+        password = make_password(None)
+        for start in range(0, count, batch_size):
+            User.objects.bulk_create(
+                User(username=f'{prefix}{number:07d}', password=password,
+                     first_name=f'Имя{number}', last_name=f'Фамилия{number}')
+                for number in range(start, min(start + batch_size, count))
+            )
+        self.stdout.write(f'Пользователей: {count}')
+        return list(
+            User.objects.filter(
+                username__startswith=prefix
+            ).order_by('username').values_list('pk', flat=True)
+        )
+
+    def create_groups(self, prefix, count, batch_size):
+        Group.objects.bulk_create(
+            (Group(title=f'Группа {number}', slug=f'{prefix}-{number}',
+                   description=f'Описание группы {number}')
+             for number in range(count)),
+            batch_size=batch_size,
+        )
+        self.stdout.write(f'Групп: {count}')
+        return list(
+            Group.objects.filter(
+                slug__startswith=f'{prefix}-'
+            ).order_by('pk').values_list('pk', flat=True)
+        )
+
+    def generate_posts(self, rng, user_ids, group_ids, count, days):
+        """Посты в хронологическом порядке: id растёт вместе с датой.
+
+        Авторы и группы выбираются по степенному закону, как на живом
+        сайте: немного очень активных и длинный хвост остальных.
+        """
+        end = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        step = timedelta(days=days) / max(count, 1)
+        pub_date = end - timedelta(days=days)
+        for _ in range(count):
+            pub_date += step * rng.uniform(0.5, 1.5)
+            author = user_ids[int(rng.paretovariate(1.2)) % len(user_ids)]
+            group = None
+            if group_ids and rng.random() < 0.7:
+                group = group_ids[
+                    int(rng.paretovariate(1.1)) % len(group_ids)
+                ]
+            text = ' '.join(rng.choices(WORDS, k=rng.randint(5, 60)))
+            yield Post(author_id=author, group_id=group, text=text,
+                       pub_date=pub_date)
+
+    def create_posts(self, rng, user_ids, group_ids, count, batch_size,
+                     days):
+        posts = self.generate_posts(rng, user_ids, group_ids, count, days)
+        started = time.perf_counter()
+        created = 0
+        while created < count:
+            batch = [post for _, post in zip(range(batch_size), posts)]
+            with transaction.atomic():
+                bulk_create_with_dates(batch)
+            created += len(batch)
+            rate = created / (time.perf_counter() - started)
+            self.stdout.write(f'Постов: {created}/{count} ({rate:.0f}/с)')
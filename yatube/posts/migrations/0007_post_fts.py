@@ -0,0 +1,23 @@
+from django.db import migrations
+
+
+def create_fts(apps, schema_editor):
+    from posts.search import install_fts
+    install_fts(schema_editor.connection)
+
+
+def delete_fts(apps, schema_editor):
+    from posts.search import drop_fts
+    if schema_editor.connection.vendor == 'sqlite':
+        drop_fts(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0006_post_last_modified'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts, delete_fts),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 2.2.28 on 2026-10-17 04:50
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_group_stats(apps, schema_editor):
+    Group = apps.get_model('posts', 'Group')
+    Post = apps.get_model('posts', 'Post')
+    GroupStats = apps.get_model('posts', 'GroupStats')
+    stats = {
+        group_id: GroupStats(group_id=group_id)
+        for group_id in Group.objects.values_list('pk', flat=True)
+    }
+    rows = Post.objects.filter(group__isnull=False).order_by().values(
+        'group_id'
+    ).annotate(count=models.Count('id'), last=models.Max('pub_date'))
+    for row in rows.iterator():
+        stats[row['group_id']].posts_count = row['count']
+        stats[row['group_id']].last_post_date = row['last']
+    GroupStats.objects.bulk_create(stats.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0008_follow_timeline'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupStats',
+            fields=[
+                ('group', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='post_stats', serialize=False, to='posts.Group')),
+                ('posts_count', models.PositiveIntegerField(default=0)),
+                ('last_post_date', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='groupstats',
+            index=models.Index(fields=['last_post_date', 'group'], name='groupstats_activity_idx'),
+        ),
+        migrations.RunPython(fill_group_stats, migrations.RunPython.noop),
+    ]
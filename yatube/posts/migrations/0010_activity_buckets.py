@@ -0,0 +1,52 @@
+# Generated by Django 2.2.28 on 2026-10-17 04:52
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0009_group_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupActivity',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start', models.DateTimeField()),
+                ('hours', models.PositiveSmallIntegerField(default=1)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('group', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='activity', to='posts.Group')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='AuthorActivity',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start', models.DateTimeField()),
+                ('hours', models.PositiveSmallIntegerField(default=1)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('author', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='activity', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='groupactivity',
+            index=models.Index(fields=['start', 'group'], name='group_activity_start_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='groupactivity',
+            constraint=models.UniqueConstraint(fields=('group', 'start', 'hours'), name='group_activity_bucket_unique'),
+        ),
+        migrations.AddIndex(
+            model_name='authoractivity',
+            index=models.Index(fields=['start', 'author'], name='author_activity_start_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='authoractivity',
+            constraint=models.UniqueConstraint(fields=('author', 'start', 'hours'), name='author_activity_bucket_unique'),
+        ),
+    ]
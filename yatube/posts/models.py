@@ -1,5 +1,7 @@
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import connections, models, router, transaction
+from django.db.models import F, Q
+from django.utils import timezone
 
 
 User = get_user_model()
@@ -17,21 +19,272 @@ class Group(models.Model):
 class Post(models.Model):
     text = models.TextField()
     pub_date = models.DateTimeField(auto_now_add=True)
+    last_modified = models.DateTimeField(auto_now=True)
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
-        related_name='posts'
+        related_name='posts',
+        db_index=False,
     )
     group = models.ForeignKey(
         Group,
         blank=True,
         null=True,
         on_delete=models.SET_NULL,
-        related_name='posts'
+        related_name='posts',
+        db_index=False,
     )
 
     class Meta:
-        ordering = ['-pub_date']
+        ordering = ['-pub_date', '-id']
+        # Составные индексы покрывают и поиск по author_id/group_id,
+        # поэтому отдельные индексы внешних ключей не создаются.
+        indexes = [
+            models.Index(
+                fields=['pub_date', 'id'], name='post_pub_date_id_idx'
+            ),
+            models.Index(
+                fields=['group', 'pub_date'], name='post_group_pub_date_idx'
+            ),
+            models.Index(
+                fields=['author', 'pub_date'], name='post_author_pub_date_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.text[:15]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Значения из базы нужны обработчикам сигналов, чтобы
+        # заметить смену автора или группы при сохранении.
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Обработчики post_save обновляют счётчики в той же транзакции.
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+        self._loaded_values = {
+            field.attname: getattr(self, field.attname)
+            for field in self._meta.concrete_fields
+        }
+
+
+def bulk_create_with_dates(posts, using=None):
+    """Вставляет посты как bulk_create, но с их собственными pub_date.
+
+    bulk_create заменил бы даты текущим временем из-за auto_now_add.
+    Вставка с raw=True, как у loaddata, берёт значения полей как есть и
+    не трогает поле модели, поэтому не влияет на Post.save в других
+    потоках; остальные поля, как last_modified, заполняются их pre_save.
+    Сигналы, как и у bulk_create, не отправляются.
+    """
+    using = using or router.db_for_write(Post)
+    fields = [
+        field for field in Post._meta.concrete_fields
+        if not isinstance(field, models.AutoField)
+    ]
+    for post in posts:
+        for field in fields:
+            if field.name != 'pub_date':
+                setattr(post, field.attname, field.pre_save(post, True))
+        if post.pub_date is None:
+            post.pub_date = timezone.now()
+    batch_size = max(connections[using].ops.bulk_batch_size(fields, posts), 1)
+    with transaction.atomic(using=using, savepoint=False):
+        for start in range(0, len(posts), batch_size):
+            Post.objects._insert(
+                posts[start:start + batch_size], fields=fields, raw=True,
+                using=using,
+            )
+    for post in posts:
+        post._state.adding = False
+        post._state.db = using
+
+
+class AuthorStats(models.Model):
+    """Денормализованная статистика автора вместо COUNT(*) по постам."""
+    author = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='post_stats'
+    )
+    posts_count = models.PositiveIntegerField(default=0)
+    last_post_date = models.DateTimeField(blank=True, null=True)
+    followers_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.author_id}: {self.posts_count}'
+
+
+class GroupStats(models.Model):
+    """Денормализованная статистика группы для каталога групп."""
+    group = models.OneToOneField(
+        Group,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='post_stats'
+    )
+    posts_count = models.PositiveIntegerField(default=0)
+    last_post_date = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        # Каталог упорядочен по последней активности; группы без
+        # постов (NULL) в SQLite при обратном порядке идут последними.
+        indexes = [
+            models.Index(
+                fields=['last_post_date', 'group'],
+                name='groupstats_activity_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.group_id}: {self.posts_count}'
+
+
+class Follow(models.Model):
+    """Подписка читателя ``user`` на автора ``author``."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='follower',
+        db_index=False,
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='following',
+        db_index=False,
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'author'], name='follow_user_author_unique'
+            ),
+            models.CheckConstraint(
+                check=~Q(user=F('author')), name='follow_not_self'
+            ),
+        ]
+        # Рассылка поста идёт по подписчикам автора.
+        indexes = [
+            models.Index(
+                fields=['author', 'user'], name='follow_author_user_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.user_id} -> {self.author_id}'
+
+
+class TimelineEntry(models.Model):
+    """Пост в материализованной ленте подписок читателя.
+
+    Строки раскладываются при публикации поста (см. posts.timeline),
+    страница ленты читается одним диапазоном индекса
+    (user, pub_date, post).
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+        db_index=False,
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+        db_index=False,
+    )
+    # Копии полей поста: по ним листается лента и снимается
+    # подписка. Записи автора удаляются каскадом вместе с его постами.
+    author = models.ForeignKey(
+        User,
+        on_delete=models.DO_NOTHING,
+        related_name='+',
+        db_index=False,
+    )
+    pub_date = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            # Покрывает и каскадное удаление по post_id.
+            models.UniqueConstraint(
+                fields=['post', 'user'], name='timeline_post_user_unique'
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', 'pub_date', 'post'],
+                name='timeline_user_pub_date_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.user_id}: {self.post_id}'
+
+
+class ActivityBucket(models.Model):
+    """Число новых постов за ``hours`` часов, начиная со ``start``.
+
+    Новые посты учитываются в часовых корзинах; compact_activity
+    сворачивает старые часовые корзины в суточные и удаляет корзины
+    старше самого длинного окна рейтинга.
+    """
+    start = models.DateTimeField()
+    hours = models.PositiveSmallIntegerField(default=1)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+    def __str__(self):
+        return f'{self.start:%Y-%m-%d %H:%M}+{self.hours}h: {self.count}'
+
+
+class GroupActivity(ActivityBucket):
+    group = models.ForeignKey(
+        Group,
+        on_delete=models.CASCADE,
+        related_name='activity',
+        db_index=False,
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['group', 'start', 'hours'],
+                name='group_activity_bucket_unique',
+            ),
+        ]
+        # Рейтинг читает корзины окна по диапазону start.
+        indexes = [
+            models.Index(
+                fields=['start', 'group'], name='group_activity_start_idx'
+            ),
+        ]
+
+
+class AuthorActivity(ActivityBucket):
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='activity',
+        db_index=False,
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['author', 'start', 'hours'],
+                name='author_activity_bucket_unique',
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['start', 'author'], name='author_activity_start_idx'
+            ),
+        ]
@@ -0,0 +1,273 @@
+import base64
+import binascii
+from collections.abc import Sequence
+
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+
+def pack_cursor(*values):
+    """Упаковывает значения ключа в непрозрачный токен."""
+    raw = '|'.join(map(str, values)).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def unpack_cursor(token):
+    """Распаковывает токен в список строк; для битого — None."""
+    if not token:
+        return None
+    try:
+        padding = '=' * (-len(token) % 4)
+        raw = base64.urlsafe_b64decode(token + padding).decode()
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+    return raw.split('|')
+
+
+def encode_cursor(pub_date, pk):
+    """Упаковывает ключ (pub_date, id) в непрозрачный токен."""
+    return pack_cursor(pub_date.isoformat(), pk)
+
+
+def decode_cursor(token):
+    """Распаковывает токен курсора; для битого токена возвращает None."""
+    values = unpack_cursor(token)
+    if values is None or len(values) != 2:
+        return None
+    try:
+        pub_date = parse_datetime(values[0])
+        pk = int(values[1])
+    except ValueError:
+        return None
+    if pub_date is None:
+        return None
+    return pub_date, pk
+
+
+def elided_page_range(number, num_pages, on_each_side=2, on_ends=1):
+    """Номера страниц для навигации с пропусками (None на месте «…»).
+
+    Отдаёт первые и последние ``on_ends`` страниц и ``on_each_side``
+    соседей текущей. Стоимость зависит от размера окна, а не от
+    числа страниц, в отличие от перебора ``page_range``.
+    """
+    if num_pages <= (on_each_side + on_ends) * 2 + 1:
+        yield from range(1, num_pages + 1)
+        return
+    window_start = max(number - on_each_side, 1)
+    window_end = min(number + on_each_side, num_pages)
+    if window_start > on_ends + 2:
+        yield from range(1, on_ends + 1)
+        yield None
+    else:
+        window_start = 1
+    if window_end < num_pages - on_ends - 1:
+        yield from range(window_start, window_end + 1)
+        yield None
+        yield from range(num_pages - on_ends + 1, num_pages + 1)
+    else:
+        yield from range(window_start, num_pages + 1)
+
+
+class CursorPage(Sequence):
+    """Страница курсорной пагинации.
+
+    В отличие от обычной ``Page`` не знает ни номера страницы,
+    ни общего числа записей — только курсоры соседних страниц.
+    """
+    is_cursor = True
+
+    def __init__(self, object_list, paginator, next_cursor=None,
+                 previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<CursorPage of {len(self.object_list)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Keyset-пагинация по ключу (pub_date, id) без COUNT и OFFSET.
+
+    Работает с любым queryset постов, в том числе с ``values()`` и
+    ``values_list()`` (строка — сам ключ): каждая страница — один
+    запрос по диапазону индекса. ``key`` задаёт поля ключа, если они
+    называются иначе, как в ленте подписок (pub_date, post_id).
+    """
+
+    def __init__(self, object_list, per_page, key=('pub_date', 'id')):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.key = key
+
+    def _key(self, item):
+        if isinstance(item, tuple):
+            return item
+        if isinstance(item, dict):
+            return tuple(item[field] for field in self.key)
+        return tuple(getattr(item, field) for field in self.key)
+
+    def _cursor(self, item):
+        return encode_cursor(*self._key(item))
+
+    def fetch(self, after=None, before=None):
+        """До ``per_page + 1`` записей за курсором: после ``after`` по
+        убыванию ключа, перед ``before`` — по возрастанию."""
+        date_field, id_field = self.key
+        queryset = self.object_list
+        if before is not None:
+            pub_date, pk = before
+            queryset = queryset.filter(
+                Q(**{f'{date_field}__gte': pub_date})
+                & ~Q(**{date_field: pub_date, f'{id_field}__lte': pk})
+            ).order_by(date_field, id_field)
+        else:
+            if after is not None:
+                pub_date, pk = after
+                queryset = queryset.filter(
+                    Q(**{f'{date_field}__lte': pub_date})
+                    & ~Q(**{date_field: pub_date, f'{id_field}__gte': pk})
+                )
+            queryset = queryset.order_by(f'-{date_field}', f'-{id_field}')
+        return list(queryset[:self.per_page + 1])
+
+    def page(self, after=None, before=None):
+        """Возвращает страницу после курсора ``after`` или перед ``before``.
+
+        Неразборчивый курсор трактуется как его отсутствие, то есть
+        отдаётся первая страница — так же снисходительно, как
+        ``Paginator.get_page`` обходится с неправильным номером.
+        """
+        after = decode_cursor(after)
+        before = decode_cursor(before) if after is None else None
+        items = self.fetch(after, before)
+        has_more = len(items) > self.per_page
+        items = items[:self.per_page]
+        if before is not None and not items:
+            return self.page()
+        if before is not None:
+            items.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, after is not None
+        next_cursor = previous_cursor = None
+        if items and has_next:
+            next_cursor = self._cursor(items[-1])
+        if items and has_previous:
+            previous_cursor = self._cursor(items[0])
+        return CursorPage(items, self, next_cursor, previous_cursor)
+
+
+class MergedCursorPaginator(CursorPaginator):
+    """Курсорная пагинация по объединению нескольких лент.
+
+    Каждый источник — ``CursorPaginator`` с общим смыслом ключа; с
+    каждого читается одна страница за курсором, результаты сливаются
+    по ключу без повторов. Элементы страницы — сами ключи
+    (pub_date, id).
+    """
+
+    def __init__(self, paginators, per_page):
+        super().__init__(None, per_page)
+        self.paginators = paginators
+
+    def fetch(self, after=None, before=None):
+        keys = {
+            paginator._key(item)
+            for paginator in self.paginators
+            for item in paginator.fetch(after, before)
+        }
+        return sorted(keys, reverse=before is None)[:self.per_page + 1]
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator, который не выполняет COUNT(*) на каждый запрос.
+
+    Число записей берётся из ``count`` (например, из поддерживаемого
+    счётчика автора) или из кэша по ``count_key``, где его
+    инкрементально поддерживают сигналы. Точный COUNT(*) выполняется,
+    только если значения нет нигде, а дешёвая проверка по самой
+    странице исправляет разошедшийся счётчик.
+    """
+
+    def __init__(self, object_list, per_page, count=None, count_key=None,
+                 count_timeout=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.known_count = count
+        self.count_key = count_key
+        self.count_timeout = count_timeout
+
+    @cached_property
+    def count(self):
+        if self.known_count is not None:
+            return self.known_count
+        if self.count_key is not None:
+            count = cache.get(self.count_key)
+            if count is not None:
+                return count
+        return self._recount()
+
+    def _recount(self, count=None):
+        if count is None:
+            count = self.object_list.count()
+        if self.count_key is not None:
+            cache.set(self.count_key, count, self.count_timeout)
+        self.__dict__['count'] = count
+        self.__dict__.pop('num_pages', None)
+        self.count_is_exact = True
+        return count
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            if getattr(self, 'count_is_exact', False):
+                raise
+            # Номер за пределами, возможно, из-за заниженного счётчика.
+            self._recount()
+            return super().validate_number(number)
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        object_list = list(self.object_list[bottom:bottom + self.per_page])
+        size = len(object_list)
+        if not getattr(self, 'count_is_exact', False):
+            if size == 0 and number > 1:
+                # Счётчик завышен: пересчитываем, и номер за пределами
+                # вызовет EmptyPage, как у обычного Paginator.
+                self._recount()
+                return self.page(number)
+            if size < self.per_page and bottom + size != self.count:
+                # Неполная страница — последняя, число постов известно.
+                self._recount(bottom + size)
+            elif bottom + size > self.count:
+                self._recount()
+        return self._get_page(object_list, number, self)
+
+    def get_page(self, number):
+        try:
+            return super().get_page(number)
+        except EmptyPage:
+            # Номер прошёл проверку по устаревшему счётчику.
+            return self.page(self.num_pages)
@@ -0,0 +1,166 @@
+import re
+
+from django.db import connections, router
+
+from .models import Post
+from .paginators import (CursorPage, CursorPaginator, pack_cursor,
+                         unpack_cursor)
+
+FTS_TABLE = 'posts_post_fts'
+
+# Внешний content-индекс FTS5 хранит только словарь, текст читается
+# из posts_post. Триггеры синхронизируют его при любой записи в таблицу,
+# включая bulk_create и queryset.update().
+FTS_SCHEMA = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        text,
+        content='posts_post',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert
+    AFTER INSERT ON posts_post BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete
+    AFTER DELETE ON posts_post BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text)
+        VALUES ('delete', old.id, old.text);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update
+    AFTER UPDATE OF text ON posts_post BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text)
+        VALUES ('delete', old.id, old.text);
+        INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text);
+    END""",
+]
+
+
+def supports_fts(db_connection):
+    if db_connection.vendor != 'sqlite':
+        return False
+    with db_connection.cursor() as cursor:
+        cursor.execute('PRAGMA compile_options')
+        options = {row[0] for row in cursor.fetchall()}
+    return 'ENABLE_FTS5' in options
+
+
+def install_fts(db_connection):
+    """Создаёт индекс и триггеры, если их ещё нет.
+
+    SQLite пересоздаёт таблицу при AlterField и теряет её триггеры,
+    поэтому установка повторяется после каждой миграции.
+    Возвращает True, если индекс был создан заново.
+    """
+    if not supports_fts(db_connection):
+        return False
+    _fts_ready.clear()
+    created = FTS_TABLE not in db_connection.introspection.table_names()
+    with db_connection.cursor() as cursor:
+        for statement in FTS_SCHEMA:
+            cursor.execute(statement)
+    if created:
+        rebuild_fts(db_connection)
+    return created
+
+
+def rebuild_fts(db_connection):
+    with db_connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+        )
+
+
+def drop_fts(db_connection):
+    _fts_ready.clear()
+    with db_connection.cursor() as cursor:
+        for suffix in ('insert', 'delete', 'update'):
+            cursor.execute(f'DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}')
+        cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+# Есть ли индекс, по псевдонимам баз. Отрицательный ответ тоже
+# запоминается, иначе без индекса каждый поиск читал бы список таблиц;
+# install_fts и drop_fts сбрасывают кэш.
+_fts_ready = {}
+
+
+def fts_enabled(using=None):
+    using = using or router.db_for_read(Post)
+    if using not in _fts_ready:
+        db_connection = connections[using]
+        _fts_ready[using] = (
+            db_connection.vendor == 'sqlite'
+            and FTS_TABLE in db_connection.introspection.table_names()
+        )
+    return _fts_ready[using]
+
+
+def build_match_query(text):
+    """Превращает ввод пользователя в безопасный запрос MATCH.
+
+    Каждое слово берётся в кавычки, последнее ищется по префиксу:
+    операторы FTS5 из ввода не интерпретируются.
+    """
+    words = re.findall(r'\w+', text)
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def search_post_ids(match, after=None, limit=10, using=None):
+    """Возвращает [(id, rank)] по релевантности bm25, затем по id."""
+    using = using or router.db_for_read(Post)
+    sql = f'SELECT rowid, rank FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s'
+    params = [match]
+    if after is not None:
+        rank, pk = after
+        sql += ' AND (rank > %s OR (rank = %s AND rowid > %s))'
+        params += [rank, rank, pk]
+    sql += ' ORDER BY rank, rowid LIMIT %s'
+    params.append(limit)
+    with connections[using].cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def _decode_rank_cursor(token):
+    values = unpack_cursor(token)
+    if values is None or len(values) != 2:
+        return None
+    try:
+        return float(values[0]), int(values[1])
+    except ValueError:
+        return None
+
+
+def search_posts(text, after=None, per_page=10):
+    """Страница результатов поиска по тексту постов.
+
+    Без FTS5 (другая СУБД) откатывается на ``icontains`` с курсорной
+    пагинацией по дате.
+    """
+    match = build_match_query(text)
+    if match is None:
+        return CursorPage([], None)
+    # Индекс и посты читаются из одной базы, выбранной роутером.
+    using = router.db_for_read(Post)
+    queryset = Post.objects.using(using).select_related('author', 'group')
+    if not fts_enabled(using):
+        return CursorPaginator(
+            queryset.filter(text__icontains=text), per_page
+        ).page(after)
+    rows = search_post_ids(
+        match, _decode_rank_cursor(after), limit=per_page + 1, using=using
+    )
+    has_next = len(rows) > per_page
+    rows = rows[:per_page]
+    posts = queryset.in_bulk([pk for pk, rank in rows])
+    next_cursor = None
+    if has_next:
+        next_cursor = pack_cursor(repr(rows[-1][1]), rows[-1][0])
+    return CursorPage(
+        [posts[pk] for pk, rank in rows if pk in posts], None, next_cursor
+    )
@@ -0,0 +1,245 @@
+from functools import partial
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import stats, timeline, trending
+from .cache import (GLOBAL_FEED, GROUP_DIRECTORY_FEED, SITE_FEED,
+                    adjust_feed_counts, author_feed, bump_feeds, bump_version,
+                    feed_count_key, group_directory_count_key, group_feed)
+from .models import Follow, Group, GroupStats, Post
+
+User = get_user_model()
+
+
+def _after_commit(using, func, *args):
+    """Откладывает сброс кэша до фиксации транзакции.
+
+    Запрос, пришедший между сбросом и фиксацией, ещё читает старую
+    строку и положил бы её в кэш под новой версией.
+    """
+    transaction.on_commit(partial(func, *args), using=using)
+
+
+def _bump_feeds(using, *feeds):
+    """Сбрасывает ленты сейчас и ещё раз после фиксации транзакции.
+
+    Страница, которую другое соединение отрисовало до фиксации по
+    старым строкам, попадает в кэш под промежуточным поколением и
+    перестаёт читаться после второго сброса. Первый сброс нужен чтению
+    в той же транзакции, которая может и не фиксироваться (TestCase).
+    """
+    bump_feeds(*feeds)
+    _after_commit(using, bump_feeds, *feeds)
+
+
+@receiver(post_save, sender=Post)
+def update_author_stats_on_save(sender, instance, created, raw, **kwargs):
+    """Обновляет статистику при создании поста и смене его автора."""
+    if raw:
+        return
+    if created:
+        stats.add_post(instance.author_id, instance.pub_date)
+        return
+    old_author_id = getattr(instance, '_loaded_values', {}).get('author_id')
+    if old_author_id is not None and old_author_id != instance.author_id:
+        stats.remove_post(old_author_id)
+        stats.add_post(instance.author_id, instance.pub_date)
+
+
+@receiver(post_delete, sender=Post)
+def update_author_stats_on_delete(sender, instance, **kwargs):
+    stats.remove_post(instance.author_id)
+
+
+@receiver(post_save, sender=Post)
+def update_group_stats_on_save(sender, instance, created, raw, **kwargs):
+    """Обновляет статистику групп при создании поста и смене группы."""
+    if raw:
+        return
+    old_group_id = None
+    if not created:
+        old_group_id = getattr(instance, '_loaded_values', {}).get(
+            'group_id', instance.group_id
+        )
+        if old_group_id == instance.group_id:
+            return
+    if old_group_id is not None:
+        stats.remove_group_post(old_group_id)
+    if instance.group_id is not None:
+        stats.add_group_post(instance.group_id, instance.pub_date)
+
+
+@receiver(post_save, sender=Post)
+def record_activity(sender, instance, created, raw, **kwargs):
+    """Учитывает новый пост в счётчиках активности группы и автора."""
+    if created and not raw:
+        trending.record_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def update_group_stats_on_delete(sender, instance, **kwargs):
+    # При удалении группы её посты получают group = NULL через UPDATE
+    # без сигналов, а статистика группы удаляется каскадом вместе с ней.
+    if instance.group_id is not None:
+        stats.remove_group_post(instance.group_id)
+
+
+@receiver(post_save, sender=Group)
+def create_group_stats(sender, instance, created, raw, using, **kwargs):
+    """Новая группа сразу попадает в каталог с нулём постов."""
+    if created and not raw:
+        GroupStats.objects.get_or_create(group=instance)
+        _after_commit(
+            using, adjust_feed_counts, [group_directory_count_key()], 1
+        )
+        _bump_feeds(using, GROUP_DIRECTORY_FEED)
+
+
+@receiver(post_delete, sender=Group)
+def update_group_directory_count(sender, using, **kwargs):
+    _after_commit(
+        using, adjust_feed_counts, [group_directory_count_key()], -1
+    )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_card(sender, instance, using, **kwargs):
+    _after_commit(using, bump_version, 'post', instance.pk)
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_cards(sender, instance, created, update_fields,
+                            using, **kwargs):
+    """Сбрасывает карточки и страницы с автором.
+
+    Обновление last_login при входе в систему их не затрагивает.
+    """
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    _after_commit(using, bump_version, 'author', instance.pk)
+    if not created:
+        _bump_feeds(using, SITE_FEED)
+
+
+@receiver(post_save, sender=Group)
+def invalidate_group_cards(sender, instance, created, using, **kwargs):
+    _after_commit(using, bump_version, 'group', instance.pk)
+    if not created:
+        _bump_feeds(using, SITE_FEED)
+
+
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=Group)
+def invalidate_site_pages(sender, using, **kwargs):
+    _bump_feeds(using, SITE_FEED)
+
+
+def _related_values(instance, field_name, attr):
+    """Значения ``attr`` текущего и прежнего связанного объекта поста.
+
+    Уже загруженный объект берётся из кэша экземпляра, к базе
+    обращаемся только за прежним, если связь поменялась.
+    """
+    field = Post._meta.get_field(field_name)
+    loaded = getattr(instance, '_loaded_values', {})
+    ids = {getattr(instance, field.attname), loaded.get(field.attname)}
+    ids.discard(None)
+    values = set()
+    if field.is_cached(instance):
+        related = getattr(instance, field_name)
+        if related is not None:
+            values.add(getattr(related, attr))
+            ids.discard(related.pk)
+    if ids:
+        values.update(
+            field.related_model.objects.filter(
+                pk__in=ids
+            ).values_list(attr, flat=True)
+        )
+    return values
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_feeds(sender, instance, using, raw=False, **kwargs):
+    """Сбрасывает страницы общей ленты, ленты группы и автора поста."""
+    if raw:
+        return
+    feeds = [GLOBAL_FEED]
+    slugs = _related_values(instance, 'group', 'slug')
+    if slugs:
+        feeds.append(GROUP_DIRECTORY_FEED)
+    feeds += map(group_feed, slugs)
+    feeds += map(
+        author_feed, _related_values(instance, 'author', 'username')
+    )
+    _bump_feeds(using, *feeds)
+
+
+@receiver(post_save, sender=Post)
+def update_feed_counts_on_save(sender, instance, created, raw, using,
+                               **kwargs):
+    """Сдвигает счётчики лент после фиксации: иначе параллельный
+    пересчёт до фиксации записал бы прежний COUNT(*) поверх сдвига."""
+    if raw:
+        return
+    if created:
+        _after_commit(using, adjust_feed_counts, [feed_count_key()], 1)
+    else:
+        old_group_id = getattr(instance, '_loaded_values', {}).get(
+            'group_id', instance.group_id
+        )
+        if old_group_id == instance.group_id:
+            return
+        if old_group_id is not None:
+            _after_commit(
+                using, adjust_feed_counts, [feed_count_key(old_group_id)], -1
+            )
+    if instance.group_id is not None:
+        _after_commit(
+            using, adjust_feed_counts, [feed_count_key(instance.group_id)], 1
+        )
+
+
+@receiver(post_delete, sender=Post)
+def update_feed_counts_on_delete(sender, instance, using, **kwargs):
+    keys = [feed_count_key()]
+    if instance.group_id is not None:
+        keys.append(feed_count_key(instance.group_id))
+    _after_commit(using, adjust_feed_counts, keys, -1)
+
+
+@receiver(post_save, sender=Post)
+def fan_out_post(sender, instance, created, raw, **kwargs):
+    """Раскладывает новый пост по лентам подписчиков автора."""
+    if raw:
+        return
+    if not created:
+        old_author_id = getattr(instance, '_loaded_values', {}).get(
+            'author_id', instance.author_id
+        )
+        if old_author_id == instance.author_id:
+            return
+        instance.timeline_entries.all().delete()
+    timeline.fan_out(instance)
+
+
+@receiver(post_save, sender=Follow)
+def add_follow(sender, instance, created, raw, using, **kwargs):
+    if raw or not created:
+        return
+    stats.add_follower(instance.author_id)
+    timeline.backfill(instance.user_id, instance.author_id)
+    # Кнопка подписки на странице автора сменилась.
+    _bump_feeds(using, author_feed(instance.author.username))
+
+
+@receiver(post_delete, sender=Follow)
+def remove_follow(sender, instance, using, **kwargs):
+    stats.remove_follower(instance.author_id)
+    timeline.drop_author(instance.user_id, instance.author_id)
+    _bump_feeds(using, author_feed(instance.author.username))
@@ -0,0 +1,197 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, F, Max, Q, Value, When
+
+from .models import AuthorStats, Follow, Group, GroupStats, Post
+
+AUTHOR_STATS_FIELDS = ('posts_count', 'last_post_date', 'followers_count')
+GROUP_STATS_FIELDS = ('posts_count', 'last_post_date')
+
+
+def get_posts_count(author):
+    """Число постов автора из статистики, без COUNT(*)."""
+    try:
+        return author.post_stats.posts_count
+    except AuthorStats.DoesNotExist:
+        return 0
+
+
+def _add_posts(model, owner_field, owner_id, pub_date, count):
+    """Учитывает ``count`` новых постов в статистике автора или группы;
+    ``pub_date`` — самый поздний из них."""
+    updated = model.objects.filter(**{owner_field: owner_id}).update(
+        posts_count=F('posts_count') + count,
+        last_post_date=Case(
+            When(
+                Q(last_post_date__lt=pub_date)
+                | Q(last_post_date__isnull=True),
+                then=Value(pub_date),
+            ),
+            default=F('last_post_date'),
+        ),
+    )
+    if updated:
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(
+                **{owner_field: owner_id}, posts_count=count,
+                last_post_date=pub_date,
+            )
+    except IntegrityError:
+        # Запись успел создать параллельный запрос.
+        _add_posts(model, owner_field, owner_id, pub_date, count)
+
+
+def _remove_post(model, owner_field, owner_id):
+    """Учитывает удаление поста (или его переход к другому владельцу);
+    дата последнего поста берётся из индекса (владелец, pub_date)."""
+    last_post_date = Post.objects.filter(
+        **{owner_field: owner_id}
+    ).aggregate(last=Max('pub_date'))['last']
+    model.objects.filter(
+        **{owner_field: owner_id}, posts_count__gt=0
+    ).update(
+        posts_count=F('posts_count') - 1,
+        last_post_date=last_post_date,
+    )
+
+
+def add_post(author_id, pub_date, count=1):
+    """Учитывает новые посты автора; ``pub_date`` — самый поздний из них."""
+    _add_posts(AuthorStats, 'author_id', author_id, pub_date, count)
+
+
+def remove_post(author_id):
+    """Учитывает удаление поста автора (или его переход к другому)."""
+    _remove_post(AuthorStats, 'author_id', author_id)
+
+
+def add_group_post(group_id, pub_date, count=1):
+    """Учитывает новые посты группы; ``pub_date`` — самый поздний из них."""
+    _add_posts(GroupStats, 'group_id', group_id, pub_date, count)
+
+
+def remove_group_post(group_id):
+    """Учитывает удаление поста группы (или его переход в другую)."""
+    _remove_post(GroupStats, 'group_id', group_id)
+
+
+def get_followers_count(author_id):
+    """Число подписчиков автора из статистики."""
+    return AuthorStats.objects.filter(author_id=author_id).values_list(
+        'followers_count', flat=True
+    ).first() or 0
+
+
+def add_follower(author_id):
+    updated = AuthorStats.objects.filter(author_id=author_id).update(
+        followers_count=F('followers_count') + 1
+    )
+    if updated:
+        return
+    try:
+        with transaction.atomic():
+            AuthorStats.objects.create(author_id=author_id, followers_count=1)
+    except IntegrityError:
+        add_follower(author_id)
+
+
+def remove_follower(author_id):
+    AuthorStats.objects.filter(
+        author_id=author_id, followers_count__gt=0
+    ).update(followers_count=F('followers_count') - 1)
+
+
+def collect_author_stats():
+    """Считает статистику всех авторов: по GROUP BY на посты и подписки.
+
+    Возвращает {author_id: (постов, дата последнего, подписчиков)}.
+    """
+    posts = Post.objects.order_by().values('author_id').annotate(
+        count=Count('id'), last=Max('pub_date')
+    )
+    stats = {
+        row['author_id']: (row['count'], row['last'], 0) for row in posts
+    }
+    followers = Follow.objects.order_by().values('author_id').annotate(
+        count=Count('id')
+    )
+    for row in followers:
+        count, last, _ = stats.get(row['author_id'], (0, None, 0))
+        stats[row['author_id']] = (count, last, row['count'])
+    return stats
+
+
+def collect_group_stats():
+    """Считает статистику всех групп одним GROUP BY по постам.
+
+    Возвращает {group_id: (постов, дата последнего)}, в том числе для
+    групп без постов.
+    """
+    stats = {
+        group_id: (0, None)
+        for group_id in Group.objects.values_list('pk', flat=True)
+    }
+    posts = Post.objects.filter(group__isnull=False).order_by().values(
+        'group_id'
+    ).annotate(count=Count('id'), last=Max('pub_date'))
+    for row in posts:
+        stats[row['group_id']] = (row['count'], row['last'])
+    return stats
+
+
+def _find_stale(model, fields, actual):
+    stale = {}
+    empty = tuple(model._meta.get_field(field).get_default()
+                  for field in fields)
+    for stats in model.objects.all().iterator():
+        expected = actual.pop(stats.pk, empty)
+        stored = tuple(getattr(stats, field) for field in fields)
+        if stored != expected:
+            stale[stats.pk] = (stored, expected)
+    for pk, expected in actual.items():
+        stale[pk] = (None, expected)
+    return stale
+
+
+def _rebuild(model, fields, stale, batch_size):
+    to_create = []
+    to_update = []
+    for pk, (stored, expected) in stale.items():
+        stats = model(pk=pk, **dict(zip(fields, expected)))
+        if stored is None:
+            to_create.append(stats)
+        else:
+            to_update.append(stats)
+    model.objects.bulk_create(to_create, batch_size=batch_size)
+    model.objects.bulk_update(to_update, fields, batch_size=batch_size)
+    return len(stale)
+
+
+def find_stale_author_stats():
+    """Возвращает {author_id: (сохранено, фактически)} для расхождений."""
+    return _find_stale(
+        AuthorStats, AUTHOR_STATS_FIELDS, collect_author_stats()
+    )
+
+
+def find_stale_group_stats():
+    """Возвращает {group_id: (сохранено, фактически)} для расхождений."""
+    return _find_stale(GroupStats, GROUP_STATS_FIELDS, collect_group_stats())
+
+
+@transaction.atomic
+def rebuild_author_stats(batch_size=1000):
+    """Пересчитывает статистику всех авторов, возвращает число исправлений."""
+    return _rebuild(
+        AuthorStats, AUTHOR_STATS_FIELDS, find_stale_author_stats(),
+        batch_size,
+    )
+
+
+@transaction.atomic
+def rebuild_group_stats(batch_size=1000):
+    """Пересчитывает статистику всех групп, возвращает число исправлений."""
+    return _rebuild(
+        GroupStats, GROUP_STATS_FIELDS, find_stale_group_stats(), batch_size
+    )
@@ -0,0 +1,13 @@
+from django import template
+
+from ..paginators import elided_page_range
+
+register = template.Library()
+
+
+@register.simple_tag
+def page_window(page_obj, on_each_side=2, on_ends=1):
+    """Окно номеров страниц вокруг текущей; None — пропуск «…»."""
+    return list(elided_page_range(
+        page_obj.number, page_obj.paginator.num_pages, on_each_side, on_ends
+    ))
@@ -0,0 +1,106 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import Group, Post
+from .utils import execute_on_commit
+
+User = get_user_model()
+
+
+class PostApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        cls.posts = [
+            Post.objects.create(
+                author=cls.author, group=cls.group if i % 2 else None,
+                text=f'Пост {i}',
+            )
+            for i in range(15)
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    def test_feed_walks_with_cursor(self):
+        """Страницы по курсору покрывают ленту без пропусков и повторов."""
+        url = reverse('posts:api_index')
+        ids = []
+        while url:
+            data = self.client.get(url).json()
+            ids += [item['id'] for item in data['results']]
+            url = data['next']
+        self.assertEqual(ids, [post.pk for post in reversed(self.posts)])
+
+    def test_previous_page(self):
+        first = self.client.get(reverse('posts:api_index')).json()
+        second = self.client.get(first['next']).json()
+        self.assertIsNone(first['previous'])
+        back = self.client.get(second['previous']).json()
+        self.assertEqual(back['results'], first['results'])
+
+    def test_sparse_fields(self):
+        response = self.client.get(
+            reverse('posts:api_group_posts', args=['group']),
+            {'fields': 'text,group_title', 'limit': 3},
+        )
+        results = response.json()['results']
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[0], {'text': 'Пост 13',
+                                      'group_title': 'Группа'})
+
+    def test_one_query_per_page(self):
+        """Связанные поля приходят одним JOIN, объекты не создаются."""
+        with self.assertNumQueries(1):
+            self.client.get(
+                reverse('posts:api_index'),
+                {'fields': 'id,author,group', 'after': ''},
+            )
+
+    def test_author_feed_and_detail(self):
+        data = self.client.get(
+            reverse('posts:api_profile', args=['author']), {'limit': 100}
+        ).json()
+        self.assertEqual(len(data['results']), 15)
+        self.assertIsNone(data['next'])
+        post = self.posts[0]
+        detail = self.client.get(
+            reverse('posts:api_post_detail', args=[post.pk])
+        ).json()
+        self.assertEqual(detail, {
+            'id': post.pk,
+            'text': 'Пост 0',
+            'pub_date': detail['pub_date'],
+            'author': 'author',
+            'group': None,
+        })
+
+    def test_errors_are_json(self):
+        cases = (
+            (reverse('posts:api_index'), {'fields': 'id,password'}, 400),
+            (reverse('posts:api_index'), {'limit': '1000'}, 400),
+            (reverse('posts:api_group_posts', args=['missing']), {}, 404),
+            (reverse('posts:api_post_detail', args=[0]), {}, 404),
+        )
+        for url, params, status in cases:
+            with self.subTest(url=url, params=params):
+                response = self.client.get(url, params)
+                self.assertEqual(response.status_code, status)
+                self.assertIn('detail', response.json())
+
+    def test_cached_first_page_is_invalidated(self):
+        url = reverse('posts:api_index')
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            self.client.get(url)
+        with execute_on_commit():
+            Post.objects.create(author=self.author, text='Новый')
+        self.assertEqual(
+            self.client.get(url).json()['results'][0]['text'], 'Новый'
+        )
@@ -0,0 +1,263 @@
+import threading
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.checks import registry
+from django.db import connection, transaction
+from django.test import (Client, SimpleTestCase, TestCase,
+                         TransactionTestCase, override_settings)
+from django.urls import reverse
+
+from core.checks import check_shared_cache
+
+from ..cache import (FEED_KEY, card_cache_stats, group_feed,
+                     render_post_cards)
+from ..models import Group, Post
+from .utils import execute_on_commit, file_database
+
+User = get_user_model()
+
+INDEX_CARD = 'posts/includes/index_card.html'
+
+
+class PostCardCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(
+            username='card_author', first_name='Лев', last_name='Толстой'
+        )
+        cls.group = Group.objects.create(
+            title='Группа',
+            slug='card-slug',
+            description='Описание',
+        )
+
+    def setUp(self):
+        cache.clear()
+        # Карточки проверяем без кэша целых страниц, он только для гостей.
+        self.reader = User.objects.create_user(username='reader')
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+        self.post = Post.objects.create(
+            author=self.author, group=self.group, text='Исходный текст'
+        )
+
+    def get_index(self):
+        return self.reader_client.get(reverse('posts:index'))
+
+    def test_cards_rendered_once(self):
+        """Повторный показ страницы берёт карточки из кэша."""
+        self.get_index()
+        with self.assertTemplateNotUsed(INDEX_CARD):
+            response = self.get_index()
+        self.assertContains(response, 'Исходный текст')
+        stats = card_cache_stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+        self.assertEqual(stats['hit_ratio'], 0.5)
+
+    def test_post_edit_invalidates_card(self):
+        """Правка поста обновляет его карточку."""
+        self.get_index()
+        with execute_on_commit():
+            self.post.text = 'Новый текст'
+            self.post.save()
+        self.assertContains(self.get_index(), 'Новый текст')
+
+    def test_author_and_group_change_invalidate_card(self):
+        """Смена имени автора и слага группы обновляет карточку."""
+        self.get_index()
+        with execute_on_commit():
+            self.author.first_name = 'Фёдор'
+            self.author.save()
+            self.group.slug = 'new-card-slug'
+            self.group.save()
+        response = self.get_index()
+        self.assertContains(response, 'Фёдор')
+        self.assertContains(response, '/group/new-card-slug/')
+
+    def test_login_keeps_cards(self):
+        """Обновление last_login при входе не сбрасывает карточки."""
+        self.get_index()
+        self.client.force_login(self.author)
+        with self.assertTemplateNotUsed(INDEX_CARD):
+            render_post_cards([self.post], INDEX_CARD)
+
+
+class SharedCacheCheckTests(SimpleTestCase):
+    def test_process_local_cache_rejected_on_deploy(self):
+        self.assertEqual(
+            [error.id for error in check_shared_cache(None)], ['core.E003']
+        )
+        self.assertIn(
+            check_shared_cache,
+            registry.registry.get_checks(include_deployment_checks=True),
+        )
+        self.assertNotIn(check_shared_cache, registry.registry.get_checks())
+
+    @override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+        'LOCATION': '127.0.0.1:11211',
+    }})
+    def test_shared_cache_passes(self):
+        self.assertEqual(check_shared_cache(None), [])
+
+
+class CommitRaceTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def render_card(self, pk):
+        posts = Post.objects.select_related('author', 'group').filter(pk=pk)
+        return render_post_cards(posts, INDEX_CARD)[0]
+
+    def test_edit_invalidates_card_after_commit(self):
+        """Список, прочитанный другим соединением до фиксации правки,
+        не остаётся в кэше под новой версией карточки."""
+        stale = []
+
+        def read_listing(pk):
+            stale.append(self.render_card(pk))
+            connection.close()
+
+        with file_database():
+            author = User.objects.create_user(username='race_author')
+            post = Post.objects.create(author=author, text='Старый текст')
+            with transaction.atomic():
+                post.text = 'Новый текст'
+                post.save()
+                reader = threading.Thread(
+                    target=read_listing, args=(post.pk,)
+                )
+                reader.start()
+                reader.join()
+            self.assertIn('Старый текст', stale[0])
+            self.assertIn('Новый текст', self.render_card(post.pk))
+
+    def test_new_post_invalidates_feed_after_commit(self):
+        """Страница ленты, отрисованная другим соединением до фиксации
+        нового поста, не кэшируется под новым поколением ленты."""
+        index = reverse('posts:index')
+        stale = []
+
+        def read_index():
+            stale.append(Client().get(index))
+            connection.close()
+
+        with file_database():
+            author = User.objects.create_user(username='race_author')
+            with transaction.atomic():
+                Post.objects.create(author=author, text='Новый пост')
+                reader = threading.Thread(target=read_index)
+                reader.start()
+                reader.join()
+            self.assertNotContains(stale[0], 'Новый пост')
+            self.assertContains(Client().get(index), 'Новый пост')
+
+
+class FeedPageCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='page_author')
+        cls.group = Group.objects.create(
+            title='Группа',
+            slug='page-slug',
+            description='Описание',
+        )
+        cls.other_group = Group.objects.create(
+            title='Другая группа',
+            slug='other-page-slug',
+            description='Описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.author, group=cls.group, text='Первый пост'
+        )
+        cls.feeds = [
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': cls.group.slug}),
+            reverse('posts:profile',
+                    kwargs={'username': cls.author.username}),
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_author = Client()
+        self.authorized_author.force_login(self.author)
+
+    def test_anonymous_pages_served_without_queries(self):
+        """Повторная страница ленты для гостя не обращается к базе."""
+        for address in self.feeds:
+            with self.subTest(address=address):
+                first = self.guest_client.get(address)
+                with self.assertNumQueries(0):
+                    second = self.guest_client.get(address)
+                self.assertEqual(first.content, second.content)
+
+    def test_authorized_pages_not_cached(self):
+        """Авторизованному пользователю страница рендерится заново."""
+        self.authorized_author.get(self.feeds[0])
+        response = self.authorized_author.get(self.feeds[0])
+        self.assertIn('page_obj', response.context)
+
+    def test_post_create_invalidates_feeds(self):
+        """Новый пост сразу появляется в общей ленте, группе и профиле."""
+        other_feed = reverse(
+            'posts:group_list', kwargs={'slug': self.other_group.slug}
+        )
+        for address in self.feeds + [other_feed]:
+            self.guest_client.get(address)
+        with execute_on_commit():
+            self.authorized_author.post(
+                reverse('posts:post_create'),
+                data={'text': 'Свежий пост', 'group': self.group.pk},
+            )
+        for address in self.feeds:
+            with self.subTest(address=address):
+                self.assertContains(
+                    self.guest_client.get(address), 'Свежий пост'
+                )
+        with self.assertNumQueries(0):
+            self.guest_client.get(other_feed)
+
+    def test_post_edit_invalidates_old_and_new_group(self):
+        """Перенос поста в другую группу обновляет страницы обеих групп."""
+        old_feed = self.feeds[1]
+        new_feed = reverse(
+            'posts:group_list', kwargs={'slug': self.other_group.slug}
+        )
+        self.guest_client.get(old_feed)
+        self.guest_client.get(new_feed)
+        with execute_on_commit():
+            self.authorized_author.post(
+                reverse('posts:post_edit', kwargs={'post_id': self.post.pk}),
+                data={
+                    'text': 'Перенесённый пост', 'group': self.other_group.pk,
+                },
+            )
+        self.assertNotContains(
+            self.guest_client.get(old_feed), 'Перенесённый пост'
+        )
+        self.assertContains(
+            self.guest_client.get(new_feed), 'Перенесённый пост'
+        )
+
+    def test_missing_group_generation_expires(self):
+        """Поколение ленты несуществующей группы хранится не вечно."""
+        key = FEED_KEY.format(group_feed('nope'))
+        address = reverse('posts:group_list', kwargs={'slug': 'nope'})
+        response = self.guest_client.get(address)
+        self.assertEqual(response.status_code, 404)
+        self.assertIsNotNone(cache.get(key))
+        cache.clear()
+        with override_settings(FEED_GENERATION_TIMEOUT=0):
+            self.guest_client.get(address)
+        self.assertIsNone(cache.get(key))
+
+    def test_deep_pages_not_cached(self):
+        """Дальние страницы и курсоры не занимают кэш."""
+        address = self.feeds[0] + '?page=10'
+        self.guest_client.get(address)
+        response = self.guest_client.get(address)
+        self.assertIn('page_obj', response.context)
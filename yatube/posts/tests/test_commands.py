@@ -0,0 +1,233 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from ..models import AuthorStats, Group, GroupStats, Post
+
+User = get_user_model()
+
+
+class AuthorStatsCommandTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        Post.objects.bulk_create(
+            Post(author=cls.author, text=f'Пост {i}') for i in range(3)
+        )
+
+    def test_check_reports_stale_counters(self):
+        """--check находит счётчики, разошедшиеся после bulk_create."""
+        with self.assertRaises(CommandError):
+            call_command('author_stats', '--check', stdout=StringIO())
+
+    def test_rebuild_fixes_counters(self):
+        """Пересчёт исправляет счётчики, повторная проверка проходит."""
+        call_command('author_stats', stdout=StringIO())
+        self.assertEqual(
+            AuthorStats.objects.get(author=self.author).posts_count, 3
+        )
+        out = StringIO()
+        call_command('author_stats', '--check', stdout=out)
+        self.assertIn('в порядке', out.getvalue())
+
+
+class GroupStatsCommandTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        author = User.objects.create_user(username='author')
+        Group.objects.bulk_create([
+            Group(title='Группа', slug='group'),
+            Group(title='Пустая', slug='empty'),
+        ])
+        cls.group = Group.objects.get(slug='group')
+        Post.objects.bulk_create(
+            Post(author=author, group=cls.group, text=f'Пост {i}')
+            for i in range(3)
+        )
+
+    def test_rebuild_fixes_counters(self):
+        """Группы и посты, созданные в обход сигналов, попадают в
+        статистику после пересчёта."""
+        with self.assertRaises(CommandError):
+            call_command('group_stats', '--check', stdout=StringIO())
+        call_command('group_stats', stdout=StringIO())
+        self.assertEqual(
+            GroupStats.objects.get(group=self.group).posts_count, 3
+        )
+        self.assertEqual(
+            GroupStats.objects.get(group__slug='empty').posts_count, 0
+        )
+        out = StringIO()
+        call_command('group_stats', '--check', stdout=out)
+        self.assertIn('в порядке', out.getvalue())
+
+
+class SeedDataCommandTests(TestCase):
+    def seed(self, prefix, seed=0):
+        call_command(
+            'seed_data', '--users=5', '--groups=3', '--posts=40',
+            '--batch-size=15', f'--seed={seed}', f'--prefix={prefix}',
+            stdout=StringIO(),
+        )
+        return list(
+            Post.objects.filter(
+                author__username__startswith=prefix
+            ).order_by('pub_date').values_list(
+                'author__username', 'group__slug', 'text', 'pub_date'
+            )
+        )
+
+    def test_same_seed_gives_same_data(self):
+        """Одно зерно даёт одинаковый набор с точностью до префикса."""
+        first = self.seed('a')
+        second = self.seed('b')
+        self.assertEqual(len(first), 40)
+        self.assertEqual(
+            [(user[1:], slug and slug[1:], text, date)
+             for user, slug, text, date in first],
+            [(user[1:], slug and slug[1:], text, date)
+             for user, slug, text, date in second],
+        )
+        self.assertNotEqual(first, self.seed('c', seed=1))
+
+    def test_counters_are_consistent(self):
+        """После заполнения счётчики авторов сходятся с данными."""
+        self.seed('seed')
+        call_command('author_stats', '--check', stdout=StringIO())
+
+    def test_existing_prefix_is_rejected(self):
+        self.seed('seed')
+        with self.assertRaises(CommandError):
+            self.seed('seed')
+
+
+class BenchmarkUrlsCommandTests(TestCase):
+    def test_report_covers_all_routes(self):
+        """Отчёт содержит перцентили и число запросов по каждому маршруту."""
+        call_command(
+            'seed_data', '--users=3', '--groups=2', '--posts=20',
+            stdout=StringIO(),
+        )
+        out = StringIO()
+        call_command(
+            'benchmark_urls', '--requests=2', '--warmup=0',
+            '--profile-templates', stdout=out,
+        )
+        report = json.loads(out.getvalue())
+        self.assertEqual(report['meta']['posts'], 20)
+        routes = {
+            (result['role'], result['route']) for result in report['results']
+        }
+        self.assertIn(('anonymous', 'posts:index'), routes)
+        self.assertIn(('author', 'posts:post_edit'), routes)
+        detail = next(
+            result for result in report['results']
+            if result['route'] == 'posts:post_detail'
+        )
+        self.assertEqual(detail['status'], 200)
+        self.assertLessEqual(detail['p50_ms'], detail['p99_ms'])
+        self.assertGreater(detail['queries']['max'], 0)
+        templates = {row['name'] for row in report['templates']}
+        self.assertIn('posts/post_detail.html', templates)
+
+
+class ImportPostsCommandTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.source = os.path.join(directory, 'posts.jsonl')
+
+    def write_jsonl(self, records):
+        with open(self.source, 'w', encoding='utf-8') as file:
+            for record in records:
+                file.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def test_import_jsonl_file(self):
+        self.write_jsonl([
+            {'text': f'Пост {i}', 'author': 'author',
+             'group': 'group' if i % 2 else None,
+             'pub_date': f'2020-01-0{i + 1}T10:00:00'}
+            for i in range(5)
+        ])
+        out = StringIO()
+        call_command('import_posts', self.source, '--batch-size=2',
+                     stdout=out)
+        self.assertIn('Готово: 5 записей', out.getvalue())
+        self.assertEqual(
+            sorted(date.day for date in
+                   Post.objects.values_list('pub_date', flat=True)),
+            [1, 2, 3, 4, 5],
+        )
+        # Даты сохранены без переключения auto_now_add у поля модели.
+        self.assertTrue(Post._meta.get_field('pub_date').auto_now_add)
+        self.assertEqual(self.group.posts.count(), 2)
+        stats = AuthorStats.objects.get(author=self.author)
+        self.assertEqual(stats.posts_count, 5)
+        self.assertEqual(stats.last_post_date.day, 5)
+        group_stats = GroupStats.objects.get(group=self.group)
+        self.assertEqual(group_stats.posts_count, 2)
+        self.assertEqual(group_stats.last_post_date.day, 4)
+        self.assertFalse(os.path.exists(f'{self.source}.checkpoint'))
+
+    def test_import_csv_from_stdin(self):
+        stdin = StringIO(
+            'text,author,group,pub_date\n'
+            'Первый,author,group,\n'
+            '"Второй, с запятой",author,,2021-05-01T00:00:00+03:00\n'
+        )
+        call_command('import_posts', '--format=csv', stdin=stdin,
+                     stdout=StringIO())
+        self.assertEqual(
+            sorted(Post.objects.values_list('text', 'group__slug')),
+            [('Второй, с запятой', None), ('Первый', 'group')],
+        )
+
+    def test_resume_from_checkpoint(self):
+        """После ошибки повторный запуск продолжает с контрольной точки
+        и не дублирует уже загруженные пакеты."""
+        self.write_jsonl(
+            [{'text': f'Пост {i}', 'author': 'author'} for i in range(4)]
+            + [{'text': 'Пост 4', 'author': 'newcomer'},
+               {'text': 'Пост 5', 'author': 'author'}]
+        )
+        with self.assertRaisesMessage(CommandError, 'Запись 5'):
+            call_command('import_posts', self.source, '--batch-size=2',
+                         stdout=StringIO())
+        self.assertEqual(Post.objects.count(), 4)
+        with open(f'{self.source}.checkpoint') as file:
+            self.assertEqual(file.read(), '4')
+
+        User.objects.create_user(username='newcomer')
+        out = StringIO()
+        call_command('import_posts', self.source, '--batch-size=2',
+                     stdout=out)
+        self.assertIn('Продолжаем после записи 4', out.getvalue())
+        self.assertEqual(
+            sorted(Post.objects.values_list('text', flat=True)),
+            [f'Пост {i}' for i in range(6)],
+        )
+        call_command('author_stats', '--check', stdout=StringIO())
+
+    def test_invalid_json_is_reported_with_record_number(self):
+        with open(self.source, 'w') as file:
+            file.write('{"text": "a", "author": "author"}\n{oops\n')
+        with self.assertRaisesMessage(CommandError, 'Запись 2'):
+            call_command('import_posts', self.source, '--batch-size=1',
+                         stdout=StringIO())
+        self.assertEqual(Post.objects.count(), 1)
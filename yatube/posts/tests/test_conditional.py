@@ -0,0 +1,114 @@
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Group, Post
+from .utils import execute_on_commit
+
+User = get_user_model()
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='etag_author')
+        cls.group = Group.objects.create(
+            title='Группа',
+            slug='etag-slug',
+            description='Описание',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.post = Post.objects.create(
+            author=self.author, group=self.group, text='Пост'
+        )
+        self.addresses = [
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile',
+                    kwargs={'username': self.author.username}),
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk}),
+        ]
+
+    def test_unchanged_page_answers_not_modified(self):
+        """Совпавший ETag даёт 304 без рендера шаблона."""
+        for address in self.addresses:
+            with self.subTest(address=address):
+                etag = self.guest_client.get(address)['ETag']
+                with self.assertTemplateNotUsed('base.html'):
+                    response = self.guest_client.get(
+                        address, HTTP_IF_NONE_MATCH=etag
+                    )
+                self.assertEqual(
+                    response.status_code, HTTPStatus.NOT_MODIFIED
+                )
+
+    def test_feed_validation_runs_no_queries(self):
+        """Проверка валидатора ленты не обращается к базе."""
+        address = self.addresses[0]
+        etag = self.guest_client.get(address)['ETag']
+        with self.assertNumQueries(0):
+            self.guest_client.get(address, HTTP_IF_NONE_MATCH=etag)
+
+    def test_if_modified_since(self):
+        """Страница не отдаётся заново до её изменения."""
+        for address in self.addresses:
+            with self.subTest(address=address):
+                last_modified = self.guest_client.get(
+                    address
+                )['Last-Modified']
+                response = self.guest_client.get(
+                    address, HTTP_IF_MODIFIED_SINCE=last_modified
+                )
+                self.assertEqual(
+                    response.status_code, HTTPStatus.NOT_MODIFIED
+                )
+
+    def test_post_edit_changes_validators(self):
+        """Правка поста меняет ETag ленты и страницы поста."""
+        etags = {
+            address: self.guest_client.get(address)['ETag']
+            for address in self.addresses
+        }
+        with execute_on_commit():
+            self.post.text = 'Исправленный пост'
+            self.post.save()
+        for address, etag in etags.items():
+            with self.subTest(address=address):
+                response = self.guest_client.get(
+                    address, HTTP_IF_NONE_MATCH=etag
+                )
+                self.assertContains(response, 'Исправленный пост')
+
+    def test_login_changes_etag(self):
+        """Гость и авторизованный пользователь получают разные ETag."""
+        address = self.addresses[0]
+        etag = self.guest_client.get(address)['ETag']
+        self.guest_client.force_login(self.author)
+        response = self.guest_client.get(address, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_relogin_changes_etag(self):
+        """Новая сессия того же пользователя получает другой ETag."""
+        address = self.addresses[0]
+        self.guest_client.force_login(self.author)
+        etag = self.guest_client.get(address)['ETag']
+        response = self.guest_client.get(address, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+        self.guest_client.logout()
+        self.guest_client.force_login(self.author)
+        response = self.guest_client.get(address, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_missing_post_not_found(self):
+        """Несуществующий пост по-прежнему отдаёт 404."""
+        response = self.guest_client.get(
+            reverse('posts:post_detail', kwargs={'post_id': 10 ** 6})
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
@@ -0,0 +1,93 @@
+import csv
+import json
+from datetime import datetime, timezone
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..export import iter_export_rows
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.other = User.objects.create_user(username='other')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        same_time = datetime(2020, 1, 1, tzinfo=timezone.utc)
+        Post.objects.bulk_create(
+            Post(author=cls.author, group=cls.group if i % 2 else None,
+                 text=f'Пост {i}')
+            for i in range(7)
+        )
+        # auto_now_add дал бы каждому посту своё время.
+        Post.objects.filter(author=cls.author).update(pub_date=same_time)
+        Post.objects.create(author=cls.other, text='Чужой, "с кавычками"')
+        cls.staff = User.objects.create_user(username='staff', is_staff=True)
+
+    def setUp(self):
+        self.staff_client = Client()
+        self.staff_client.force_login(self.staff)
+
+    def test_chunks_cover_every_post_once(self):
+        """Порции по ключу (pub_date, id) не теряют и не повторяют посты
+        с одинаковой датой."""
+        with self.assertNumQueries(3):
+            rows = list(iter_export_rows(author=self.author, chunk_size=3))
+        self.assertEqual(
+            [row[0] for row in rows],
+            sorted(self.author.posts.values_list('id', flat=True)),
+        )
+
+    def test_group_filter(self):
+        rows = list(iter_export_rows(group=self.group))
+        self.assertEqual({row[3] for row in rows}, {'group'})
+        self.assertEqual(len(rows), 3)
+
+    def test_command_writes_ndjson(self):
+        out = StringIO()
+        call_command('export_posts', '--chunk-size=2', stdout=out)
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(len(records), 8)
+        self.assertEqual(records[-1]['author'], 'other')
+        self.assertEqual(
+            set(records[0]), {'id', 'pub_date', 'author', 'group', 'text'}
+        )
+
+    def test_view_streams_csv(self):
+        response = self.staff_client.get(
+            reverse('posts:export'), {'author': 'other', 'format': 'csv'}
+        )
+        self.assertTrue(response.streaming)
+        self.assertIn('posts-other.csv', response['Content-Disposition'])
+        content = b''.join(response.streaming_content).decode()
+        rows = list(csv.reader(StringIO(content)))
+        self.assertEqual(rows[0], ['id', 'pub_date', 'author', 'group',
+                                   'text'])
+        self.assertEqual(rows[1][2:], ['other', '', 'Чужой, "с кавычками"'])
+
+    def test_view_is_staff_only(self):
+        reader = Client()
+        reader.force_login(self.author)
+        self.assertEqual(
+            reader.get(reverse('posts:export')).status_code, 302
+        )
+
+    def test_view_rejects_unknown_format_and_author(self):
+        url = reverse('posts:export')
+        self.assertEqual(
+            self.staff_client.get(url, {'format': 'xml'}).status_code, 400
+        )
+        self.assertEqual(
+            self.staff_client.get(url, {'author': 'nobody'}).status_code,
+            404,
+        )
@@ -0,0 +1,80 @@
+from io import StringIO
+
+from django.contrib import messages
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.core.cache import cache
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from core.middleware import AuthenticationMiddleware, MessageMiddleware
+
+User = get_user_model()
+
+
+def middleware_chain(view):
+    return SessionMiddleware(
+        AuthenticationMiddleware(MessageMiddleware(view))
+    )
+
+
+class AnonymousFastPathTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='user')
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('posts:index')
+
+    def test_cookieless_get_skips_session(self):
+        response = Client().get(self.url)
+        request = response.wsgi_request
+        self.assertIs(type(request.user), AnonymousUser)
+        self.assertFalse(request.session.accessed)
+        self.assertIn('Cookie', response['Vary'])
+        self.assertContains(response, 'Войти')
+        self.assertNotContains(response, 'Новая запись')
+
+    def test_session_cookie_takes_full_path(self):
+        client = Client()
+        client.force_login(self.user)
+        response = client.get(self.url)
+        self.assertTrue(response.wsgi_request.user.is_authenticated)
+        self.assertContains(response, 'Новая запись')
+
+    def test_post_takes_full_path(self):
+        request = RequestFactory().post('/')
+        middleware_chain(lambda request: HttpResponse())(request)
+        self.assertIsNot(type(request.user), AnonymousUser)
+
+    @override_settings(ANONYMOUS_FAST_PATH=False)
+    def test_disabled_by_setting(self):
+        response = Client().get(self.url)
+        self.assertIsNot(type(response.wsgi_request.user), AnonymousUser)
+        self.assertTrue(response.wsgi_request.session.accessed)
+
+    def test_message_storage_created_on_demand(self):
+        def view(request):
+            messages.info(request, 'Сообщение')
+            return HttpResponse()
+
+        untouched = middleware_chain(lambda request: HttpResponse())(
+            RequestFactory().get('/')
+        )
+        self.assertNotIn(CookieStorage.cookie_name, untouched.cookies)
+        response = middleware_chain(view)(RequestFactory().get('/'))
+        self.assertIn(CookieStorage.cookie_name, response.cookies)
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command(
+            'benchmark_anonymous', requests=2, rounds=1, warmup=0,
+            stdout=out,
+        )
+        self.assertIn('Экономия на запрос', out.getvalue())
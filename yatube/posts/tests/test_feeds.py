@@ -0,0 +1,99 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Group, Post
+from .utils import execute_on_commit
+
+User = get_user_model()
+
+
+class SyndicationFeedTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание группы'
+        )
+        cls.post = Post.objects.create(
+            author=cls.author, group=cls.group, text='Пост в группе'
+        )
+        Post.objects.create(author=cls.author, text='Пост без группы')
+
+    def setUp(self):
+        cache.clear()
+        self.reader = Client()
+        self.reader.force_login(User.objects.create_user(username='reader'))
+
+    def test_feeds_list_stream_posts(self):
+        cases = (
+            (reverse('posts:index_rss'), 'application/rss+xml', 2),
+            (reverse('posts:index_atom'), 'application/atom+xml', 2),
+            (reverse('posts:group_rss', args=['group']),
+             'application/rss+xml', 1),
+            (reverse('posts:profile_atom', args=['author']),
+             'application/atom+xml', 2),
+        )
+        for url, content_type, items in cases:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertTrue(
+                    response['Content-Type'].startswith(content_type)
+                )
+                content = response.content.decode()
+                tag = '<item>' if 'rss' in content_type else '<entry>'
+                self.assertEqual(content.count(tag), items)
+
+    def test_cached_feed_takes_no_queries(self):
+        """Повторный опрос ленты, в том числе авторизованным
+        пользователем, не обращается к базе."""
+        url = reverse('posts:group_rss', args=['group'])
+        self.reader.get(url)
+        with self.assertNumQueries(0):
+            response = self.reader.get(url)
+        self.assertContains(response, 'Пост в группе')
+
+    def test_feed_is_invalidated_by_new_and_edited_posts(self):
+        url = reverse('posts:group_atom', args=['group'])
+        self.client.get(url)
+        with execute_on_commit():
+            Post.objects.create(
+                author=self.author, group=self.group, text='Свежий пост'
+            )
+        self.assertContains(self.client.get(url), 'Свежий пост')
+        with execute_on_commit():
+            self.post.text = 'Исправленный пост'
+            self.post.save()
+        self.assertContains(self.client.get(url), 'Исправленный пост')
+
+    def test_conditional_get(self):
+        url = reverse('posts:profile_rss', args=['author'])
+        response = self.client.get(url)
+        with self.assertNumQueries(0):
+            not_modified = self.reader.get(
+                url, HTTP_IF_NONE_MATCH=response['ETag']
+            )
+        self.assertEqual(not_modified.status_code, 304)
+        with execute_on_commit():
+            Post.objects.create(author=self.author, text='Ещё пост')
+        self.assertEqual(
+            self.client.get(
+                url, HTTP_IF_NONE_MATCH=response['ETag']
+            ).status_code,
+            200,
+        )
+
+    def test_unknown_group_is_404(self):
+        response = self.client.get(
+            reverse('posts:group_rss', args=['missing'])
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_pages_advertise_feeds(self):
+        response = self.client.get(reverse('posts:group_list',
+                                           args=['group']))
+        self.assertContains(
+            response, reverse('posts:group_rss', args=['group'])
+        )
@@ -0,0 +1,87 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.metrics import Histogram, registry
+
+from ..models import Post
+
+User = get_user_model()
+
+
+class HistogramTest(TestCase):
+    def test_buckets_are_cumulative(self):
+        """Значение на границе попадает в её корзину (le — «не больше»)."""
+        histogram = Histogram((1, 5))
+        for value in (0.5, 1, 3, 7):
+            histogram.observe(value)
+        self.assertEqual(
+            list(histogram.cumulative()), [(1, 2), (5, 3), ('+Inf', 4)]
+        )
+        self.assertEqual(histogram.sum, 11.5)
+        self.assertEqual(histogram.count, 4)
+
+
+class MetricsMiddlewareTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.post = Post.objects.create(author=cls.author, text='Текст')
+        cls.staff = User.objects.create_user(username='staff', is_staff=True)
+
+    def setUp(self):
+        cache.clear()
+        registry.reset()
+        self.staff_client = Client()
+        self.staff_client.force_login(self.staff)
+
+    def test_request_is_recorded_by_view_name(self):
+        """Запрос попадает в гистограммы под именем маршрута."""
+        url = reverse('posts:post_detail', args=[self.post.pk])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        view = 'posts:post_detail'
+        self.assertEqual(registry.duration.histograms[view].count, 1)
+        queries_histogram = registry.queries.histograms[view]
+        self.assertEqual(queries_histogram.sum, len(queries))
+        self.assertEqual(
+            registry.response_size.histograms[view].sum,
+            len(response.content),
+        )
+        self.assertGreater(registry.db_duration.histograms[view].sum, 0)
+
+    def test_unknown_url_has_single_label(self):
+        self.client.get('/no/such/page/')
+        self.client.get('/another/missing/page/')
+        self.assertEqual(
+            registry.duration.histograms['<unresolved>'].count, 2
+        )
+
+    def test_endpoint_is_staff_only(self):
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 302)
+        reader = Client()
+        reader.force_login(self.author)
+        self.assertEqual(reader.get(reverse('metrics')).status_code, 302)
+
+    def test_endpoint_exposes_prometheus_text(self):
+        self.client.get(reverse('posts:index'))
+        response = self.staff_client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        body = response.content.decode()
+        self.assertIn(
+            '# TYPE yatube_request_duration_seconds histogram', body
+        )
+        self.assertIn(
+            'yatube_request_duration_seconds_count{view="posts:index"} 1',
+            body,
+        )
+        self.assertIn(
+            'yatube_request_queries_bucket{view="posts:index",le="+Inf"} 1',
+            body,
+        )
@@ -1,8 +1,9 @@
 from django.test import TestCase
 from django.contrib.auth import get_user_model
+from django.db.models import Max
 from django.test import TestCase
 
-from ..models import Group, Post
+from ..models import AuthorStats, Group, GroupStats, Post
 
 User = get_user_model()
 
@@ -34,3 +35,114 @@ class PostModelTest(TestCase):
             with self.subTest(model=model):
                 self.assertEqual(str(model), value,
                                  f'_str_ не та в {model}')
+
+
+class AuthorStatsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='stats_author')
+        cls.other = User.objects.create_user(username='other_author')
+
+    def assert_stats(self, author):
+        author_posts = Post.objects.filter(author=author)
+        stats = AuthorStats.objects.get(author=author)
+        self.assertEqual(stats.posts_count, author_posts.count())
+        self.assertEqual(
+            stats.last_post_date,
+            author_posts.aggregate(last=Max('pub_date'))['last'],
+        )
+
+    def test_stats_follow_post_create_and_delete(self):
+        """Счётчик постов автора меняется при создании и удалении."""
+        first = Post.objects.create(author=self.user, text='Первый')
+        second = Post.objects.create(author=self.user, text='Второй')
+        self.assert_stats(self.user)
+        second.delete()
+        self.assert_stats(self.user)
+        first.delete()
+        self.assert_stats(self.user)
+
+    def test_stats_follow_author_change(self):
+        """Смена автора переносит пост между счётчиками."""
+        Post.objects.create(author=self.other, text='Чужой')
+        post = Post.objects.create(author=self.user, text='Пост')
+        post = Post.objects.get(pk=post.pk)
+        post.author = self.other
+        post.save()
+        self.assert_stats(self.user)
+        self.assert_stats(self.other)
+        post.text = 'Правка без смены автора'
+        post.save()
+        self.assert_stats(self.other)
+
+
+class GroupStatsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='group_stats_author')
+        cls.group = Group.objects.create(title='Первая', slug='first')
+        cls.other = Group.objects.create(title='Вторая', slug='second')
+
+    def assert_stats(self, group):
+        group_posts = Post.objects.filter(group=group)
+        stats = GroupStats.objects.get(group=group)
+        self.assertEqual(stats.posts_count, group_posts.count())
+        self.assertEqual(
+            stats.last_post_date,
+            group_posts.aggregate(last=Max('pub_date'))['last'],
+        )
+
+    def test_new_group_has_empty_stats(self):
+        stats = GroupStats.objects.get(group=self.group)
+        self.assertEqual(stats.posts_count, 0)
+        self.assertIsNone(stats.last_post_date)
+
+    def test_stats_follow_post_create_and_delete(self):
+        """Счётчик постов группы меняется при создании и удалении."""
+        first = Post.objects.create(
+            author=self.user, group=self.group, text='Первый'
+        )
+        second = Post.objects.create(
+            author=self.user, group=self.group, text='Второй'
+        )
+        Post.objects.create(author=self.user, text='Без группы')
+        self.assert_stats(self.group)
+        second.delete()
+        self.assert_stats(self.group)
+        first.delete()
+        self.assert_stats(self.group)
+
+    def test_stats_follow_group_change(self):
+        """Смена группы переносит пост между счётчиками, в том числе
+        в пост без группы и обратно."""
+        post = Post.objects.create(
+            author=self.user, group=self.group, text='Пост'
+        )
+        post = Post.objects.get(pk=post.pk)
+        post.group = self.other
+        post.save()
+        self.assert_stats(self.group)
+        self.assert_stats(self.other)
+        post.group = None
+        post.save()
+        self.assert_stats(self.other)
+        post.group = self.group
+        post.save()
+        self.assert_stats(self.group)
+
+    def test_group_delete_drops_stats(self):
+        """После удаления группы её посты остаются без группы, а
+        статистика уходит вместе с ней."""
+        group = Group.objects.create(title='Временная', slug='temporary')
+        post = Post.objects.create(author=self.user, group=group, text='Пост')
+        group.delete()
+        self.assertFalse(GroupStats.objects.filter(pk=group.pk).exists())
+        post.refresh_from_db()
+        self.assertIsNone(post.group_id)
+        self.assertFalse(
+            GroupStats.objects.exclude(posts_count=0).exclude(
+                group__posts__isnull=False
+            ).exists()
+        )
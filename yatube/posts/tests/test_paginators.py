@@ -0,0 +1,184 @@
+import threading
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connection, transaction
+from django.template.loader import render_to_string
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+
+from ..cache import feed_count_key
+from ..models import Group, Post
+from ..paginators import CachedCountPaginator, elided_page_range
+from .utils import execute_on_commit, file_database
+
+User = get_user_model()
+
+
+class CachedCountPaginatorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='count_author')
+        cls.group = Group.objects.create(
+            title='Группа',
+            slug='count-slug',
+            description='Описание',
+        )
+        Post.objects.bulk_create(
+            Post(author=cls.author, group=cls.group, text=f'Пост {i}')
+            for i in range(25)
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.key = feed_count_key()
+        self.post_list = Post.objects.all()
+
+    def get_paginator(self, **kwargs):
+        return CachedCountPaginator(
+            self.post_list, 10, count_key=self.key, **kwargs
+        )
+
+    def test_count_cached_after_first_page(self):
+        """Второй запрос числа постов не выполняет COUNT(*)."""
+        self.get_paginator().get_page(1)
+        self.assertEqual(cache.get(self.key), 25)
+        paginator = self.get_paginator()
+        with self.assertNumQueries(1):
+            page = paginator.get_page(2)
+            self.assertEqual(paginator.num_pages, 3)
+        self.assertEqual(len(page), 10)
+
+    def test_overstated_count_falls_back_to_last_page(self):
+        """Завышенный счётчик не даёт пустую страницу."""
+        cache.set(self.key, 100)
+        paginator = self.get_paginator()
+        page = paginator.get_page(8)
+        self.assertEqual(page.number, 3)
+        self.assertEqual(len(page), 5)
+        self.assertEqual(cache.get(self.key), 25)
+
+    def test_understated_count_keeps_all_pages(self):
+        """Заниженный счётчик не прячет существующие страницы."""
+        paginator = self.get_paginator(count=0)
+        self.assertEqual(len(paginator.get_page(1)), 10)
+        page = self.get_paginator(count=12).get_page(3)
+        self.assertEqual(page.number, 3)
+        self.assertEqual(len(page), 5)
+
+    def test_invalid_page_number(self):
+        """Неправильный номер страницы по-прежнему даёт первую."""
+        page = self.get_paginator().get_page('abc')
+        self.assertEqual(page.number, 1)
+
+    def test_signals_maintain_cached_counts(self):
+        """Создание, перенос и удаление поста сдвигают счётчики лент."""
+        group_key = feed_count_key(self.group.pk)
+        cache.set_many({self.key: 25, group_key: 25})
+        with execute_on_commit():
+            post = Post.objects.create(
+                author=self.author, group=self.group, text='Новый'
+            )
+            # До фиксации счётчики не трогаются.
+            self.assertEqual(cache.get(self.key), 25)
+        self.assertEqual(cache.get_many([self.key, group_key]),
+                         {self.key: 26, group_key: 26})
+        post = Post.objects.get(pk=post.pk)
+        post.group = None
+        with execute_on_commit():
+            post.save()
+        self.assertEqual(cache.get(group_key), 25)
+        with execute_on_commit():
+            post.delete()
+        self.assertEqual(cache.get(self.key), 25)
+
+
+class CachedCountCommitTests(TransactionTestCase):
+    def test_recount_before_commit_keeps_increment(self):
+        """Пересчёт в другом соединении до фиксации нового поста не
+        затирает сдвиг счётчика."""
+        key = feed_count_key()
+
+        def recount():
+            CachedCountPaginator(
+                Post.objects.all(), 10, count_key=key
+            )._recount()
+            connection.close()
+
+        with file_database():
+            cache.clear()
+            author = User.objects.create_user(username='count_author')
+            Post.objects.create(author=author, text='Первый')
+            cache.set(key, 1)
+            with transaction.atomic():
+                Post.objects.create(author=author, text='Второй')
+                reader = threading.Thread(target=recount)
+                reader.start()
+                reader.join()
+            self.assertEqual(cache.get(key), 2)
+
+
+class ElidedPageRangeTests(TestCase):
+    def test_window_with_ellipses(self):
+        self.assertEqual(
+            list(elided_page_range(50, 100)),
+            [1, None, 48, 49, 50, 51, 52, None, 100],
+        )
+
+    def test_window_near_ends(self):
+        self.assertEqual(
+            list(elided_page_range(2, 100)), [1, 2, 3, 4, None, 100]
+        )
+        self.assertEqual(
+            list(elided_page_range(99, 100)), [1, None, 97, 98, 99, 100]
+        )
+
+    def test_single_hidden_page_is_shown(self):
+        """Пропуск на месте одной страницы не нужен — она показывается."""
+        self.assertEqual(
+            list(elided_page_range(5, 100)),
+            [1, 2, 3, 4, 5, 6, 7, None, 100],
+        )
+
+    def test_few_pages_without_ellipses(self):
+        self.assertEqual(list(elided_page_range(3, 7)), list(range(1, 8)))
+
+    def test_size_does_not_depend_on_page_count(self):
+        for num_pages in (10 ** 3, 10 ** 9):
+            with self.subTest(num_pages=num_pages):
+                self.assertEqual(
+                    len(list(elided_page_range(num_pages // 2, num_pages))),
+                    9,
+                )
+
+
+class PaginatorNavigationSizeTests(TestCase):
+    def render_navigation(self, count, number):
+        page_obj = Paginator(range(count), 10).page(number)
+        return render_to_string(
+            'posts/includes/paginator.html', {'page_obj': page_obj}
+        )
+
+    def test_navigation_size_is_bounded(self):
+        """Навигация по 50 тыс. страниц не больше, чем по сотне."""
+        small = self.render_navigation(1000, 50)
+        large = self.render_navigation(500000, 25000)
+        self.assertLess(len(large), 3000)
+        self.assertLess(len(large) - len(small), 100)
+        self.assertIn('?page=50000', large)
+        self.assertNotIn('?page=2"', large)
+
+    def test_feed_navigation_is_windowed(self):
+        author = User.objects.create_user(username='many_posts')
+        Post.objects.bulk_create(
+            Post(author=author, text=f'Пост {i}') for i in range(1000)
+        )
+        cache.clear()
+        response = self.client.get(reverse('posts:index'), {'page': 50})
+        content = response.content.decode()
+        # Первая, Предыдущая, 1 … 48–52 … 100, Следующая, Последняя.
+        self.assertEqual(content.count('page-item'), 13)
+        self.assertIn('?page=100', content)
+        self.assertNotIn('?page=47"', content)
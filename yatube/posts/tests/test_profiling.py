@@ -0,0 +1,75 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.template import Context, Template
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.profiling import profile_templates
+
+User = get_user_model()
+
+
+class TemplateProfilerTest(TestCase):
+    def test_templates_includes_and_filters_are_attributed(self):
+        template = Template(
+            '{% include "includes/footer.html" %}{{ text|upper|lower }}'
+        )
+        with profile_templates() as profile:
+            template.render(Context({'text': 'Текст', 'year': 2024}))
+            template.render(Context({'text': 'Текст', 'year': 2024}))
+        calls = {
+            (row['kind'], row['name']): row['calls']
+            for row in profile.report()
+        }
+        self.assertEqual(calls[('include', 'includes/footer.html')], 2)
+        self.assertEqual(calls[('template', 'includes/footer.html')], 2)
+        self.assertEqual(calls[('filter', 'upper')], 2)
+        self.assertEqual(calls[('filter', 'lower')], 2)
+
+    def test_self_time_excludes_children(self):
+        template = Template('{% include "includes/footer.html" %}')
+        with profile_templates() as profile:
+            template.render(Context({'year': 2024}))
+        rows = {(row['kind'], row['name']): row for row in profile.report()}
+        outer = rows[('template', '<string>')]
+        self.assertLess(outer['self_ms'], outer['total_ms'])
+        self.assertEqual(
+            profile.report(), sorted(
+                profile.report(), key=lambda row: -row['self_ms']
+            )
+        )
+
+    def test_nothing_is_recorded_outside_profiler(self):
+        with profile_templates() as profile:
+            pass
+        Template('{{ text|upper }}').render(Context({'text': 'a'}))
+        self.assertEqual(profile.report(), [])
+
+
+@override_settings(TEMPLATE_PROFILER=True)
+class TemplateProfilerMiddlewareTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.staff = User.objects.create_user(username='staff', is_staff=True)
+
+    def setUp(self):
+        cache.clear()
+        self.staff_client = Client()
+        self.staff_client.force_login(self.staff)
+
+    def test_staff_gets_report(self):
+        response = self.staff_client.get(
+            reverse('posts:post_create'), {'profile_templates': ''}
+        )
+        self.assertEqual(response['Content-Type'],
+                         'text/plain; charset=utf-8')
+        body = response.content.decode()
+        self.assertIn('template posts/create_post.html', body)
+        self.assertIn('filter addclass', body)
+
+    def test_anonymous_gets_page(self):
+        response = self.client.get(
+            reverse('posts:index'), {'profile_templates': ''}
+        )
+        self.assertTemplateUsed(response, 'posts/index.html')
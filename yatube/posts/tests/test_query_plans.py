@@ -0,0 +1,82 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Group, Post
+from ..views import LIM_POST
+
+User = get_user_model()
+
+
+@skipUnlessDBFeature('supports_explaining_query_execution')
+class FeedQueryPlanTests(TestCase):
+    """Запросы лент не должны сканировать таблицу постов целиком
+    и сортировать результат во временном B-дереве."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        if connection.vendor != 'sqlite':
+            return
+        cls.author = User.objects.create_user(username='plan_author')
+        cls.group = Group.objects.create(
+            title='Группа',
+            slug='plan-slug',
+            description='Описание',
+        )
+        for _ in range(LIM_POST + 1):
+            Post.objects.create(
+                author=cls.author, group=cls.group, text='Текст'
+            )
+
+    def setUp(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('EXPLAIN QUERY PLAN поддерживается только SQLite')
+        cache.clear()
+        self.guest_client = Client()
+
+    def get_post_queries(self, address):
+        with CaptureQueriesContext(connection) as context:
+            response = self.guest_client.get(address)
+        self.assertEqual(response.status_code, 200)
+        return [
+            query['sql'] for query in context.captured_queries
+            if 'FROM "posts_post"' in query['sql']
+        ]
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return [row[-1] for row in cursor.fetchall()]
+
+    def assert_indexed_plan(self, sql):
+        for step in self.explain(sql):
+            self.assertNotIn('TEMP B-TREE', step, f'{step}\n{sql}')
+            if step.startswith('SCAN') and 'posts_post' in step:
+                self.assertIn('INDEX', step, f'{step}\n{sql}')
+
+    def test_feed_queries_use_indexes(self):
+        """Ленты читаются по индексу, в том числе вторые страницы."""
+        feeds = [
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile',
+                    kwargs={'username': self.author.username}),
+        ]
+        pages = ['', '?page=2', '?after=']
+        for feed in feeds:
+            first_obj = self.guest_client.get(
+                feed + '?after='
+            ).context['page_obj']
+            cursor_pages = pages + [
+                f'?after={first_obj.next_cursor}',
+                f'?before={first_obj.next_cursor}',
+            ]
+            for page in cursor_pages:
+                address = feed + page
+                for sql in self.get_post_queries(address):
+                    with self.subTest(address=address, sql=sql):
+                        self.assert_indexed_plan(sql)
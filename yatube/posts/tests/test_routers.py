@@ -0,0 +1,107 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections
+from django.test import Client, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from core.routers import PIN_COOKIE
+
+from ..models import Post
+from ..search import FTS_TABLE, fts_enabled
+
+User = get_user_model()
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRoutingTests(TransactionTestCase):
+    """Основная база и реплика — две разные SQLite-базы: реплика видит
+    только то, что в неё скопировано командой sync_replica."""
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author')
+        self.post = Post.objects.create(author=self.author, text='Старый')
+        call_command('sync_replica', stdout=StringIO())
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+
+    def test_read_only_views_use_replica(self):
+        fresh = Post.objects.create(author=self.author, text='Свежий')
+        self.assertEqual(
+            self.client.get(
+                reverse('posts:post_detail', args=[self.post.pk])
+            ).status_code,
+            200,
+        )
+        self.assertEqual(
+            self.client.get(
+                reverse('posts:post_detail', args=[fresh.pk])
+            ).status_code,
+            404,
+        )
+        call_command('sync_replica', stdout=StringIO())
+        self.assertEqual(
+            self.client.get(
+                reverse('posts:post_detail', args=[fresh.pk])
+            ).status_code,
+            200,
+        )
+
+    def test_search_reads_index_from_replica(self):
+        """Поиск берёт индекс и посты из той же реплики."""
+        if not fts_enabled('replica'):
+            self.skipTest('SQLite собран без FTS5')
+        link = reverse('posts:post_detail', args=[self.post.pk])
+        self.post.delete()
+        url = reverse('posts:search')
+        self.assertContains(self.client.get(url, {'q': 'Старый'}), link)
+        call_command('sync_replica', stdout=StringIO())
+        self.assertNotContains(self.client.get(url, {'q': 'Старый'}), link)
+
+    def test_rebuild_search_index_on_chosen_database(self):
+        """rebuild_search_index --database перестраивает индекс реплики."""
+        if not fts_enabled('replica'):
+            self.skipTest('SQLite собран без FTS5')
+        with connections['replica'].cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('delete-all')"
+            )
+        url = reverse('posts:search')
+        link = reverse('posts:post_detail', args=[self.post.pk])
+        self.assertNotContains(self.client.get(url, {'q': 'Старый'}), link)
+        call_command(
+            'rebuild_search_index', database='replica', stdout=StringIO()
+        )
+        self.assertContains(self.client.get(url, {'q': 'Старый'}), link)
+
+    def test_writes_go_to_primary_and_pin_reads(self):
+        """Автор сразу видит свой пост, остальные — после репликации."""
+        response = self.author_client.post(
+            reverse('posts:post_create'), {'text': 'Новый пост'}
+        )
+        self.assertIn(PIN_COOKIE, response.cookies)
+        self.assertTrue(Post.objects.filter(text='Новый пост').exists())
+        url = reverse('posts:profile', args=['author'])
+        self.assertContains(self.author_client.get(url), 'Новый пост')
+        self.assertNotContains(self.client.get(url), 'Новый пост')
+
+    def test_writing_views_read_primary(self):
+        fresh = Post.objects.create(author=self.author, text='Свежий')
+        response = self.author_client.get(
+            reverse('posts:post_edit', args=[fresh.pk])
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_expired_pin_reads_replica(self):
+        fresh = Post.objects.create(author=self.author, text='Свежий')
+        self.client.cookies[PIN_COOKIE] = '0'
+        self.assertEqual(
+            self.client.get(
+                reverse('posts:post_detail', args=[fresh.pk])
+            ).status_code,
+            404,
+        )
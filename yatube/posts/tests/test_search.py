@@ -0,0 +1,113 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Post
+from ..search import (FTS_TABLE, drop_fts, fts_enabled, install_fts,
+                      search_posts)
+
+User = get_user_model()
+
+
+class PostSearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='search_author')
+
+    def setUp(self):
+        if not fts_enabled():
+            self.skipTest('SQLite собран без FTS5')
+        self.guest_client = Client()
+        self.post = Post.objects.create(
+            author=self.author, text='Сегодня пекли пироги с капустой'
+        )
+        Post.objects.create(author=self.author, text='Вчера варили борщ')
+
+    def search(self, query, after=None):
+        return [post.text for post in search_posts(query, after)]
+
+    def test_search_finds_words_and_prefixes(self):
+        """Поиск находит пост по слову и по началу слова."""
+        self.assertEqual(self.search('пироги'), [self.post.text])
+        self.assertEqual(self.search('капус'), [self.post.text])
+        self.assertEqual(self.search('ПИРОГИ'), [self.post.text])
+        self.assertEqual(self.search('пельмени'), [])
+
+    def test_query_syntax_is_escaped(self):
+        """Операторы FTS5 во вводе не ломают запрос."""
+        self.assertEqual(self.search('пироги" OR (борщ'), [])
+        self.assertEqual(self.search('***'), [])
+
+    def test_index_follows_edit_delete_and_bulk_create(self):
+        """Индекс обновляется при правке, удалении и bulk_create."""
+        self.post.text = 'Сегодня жарили блины'
+        self.post.save()
+        self.assertEqual(self.search('пироги'), [])
+        self.assertEqual(self.search('блины'), [self.post.text])
+        self.post.delete()
+        self.assertEqual(self.search('блины'), [])
+        Post.objects.bulk_create([Post(author=self.author, text='Оладьи')])
+        self.assertEqual(self.search('оладьи'), ['Оладьи'])
+
+    def test_results_ranked_and_paginated(self):
+        """Результаты упорядочены по релевантности и листаются курсором."""
+        Post.objects.bulk_create([
+            Post(author=self.author, text='чай ' * 5),
+            Post(author=self.author, text='чай и кофе'),
+            Post(author=self.author, text='чай, кофе и какао с молоком'),
+        ])
+        first_page = search_posts('чай', per_page=2)
+        self.assertEqual(first_page[0].text, 'чай ' * 5)
+        second_page = search_posts('чай', first_page.next_cursor, 2)
+        self.assertEqual(len(second_page), 1)
+        self.assertFalse(second_page.has_next())
+        texts = {post.text for post in first_page}
+        self.assertNotIn(second_page[0].text, texts)
+
+    def test_search_view(self):
+        """Страница поиска показывает найденный пост."""
+        response = self.guest_client.get(
+            reverse('posts:search'), {'q': 'борщ'}
+        )
+        self.assertContains(response, 'Вчера варили борщ')
+        self.assertNotContains(response, 'пироги')
+
+    def test_admin_search_uses_index(self):
+        """Поиск в админке идёт через FTS5, а не LIKE."""
+        admin = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'password'
+        )
+        self.guest_client.force_login(admin)
+        response = self.guest_client.get(
+            reverse('admin:posts_post_changelist'), {'q': 'пирог'}
+        )
+        self.assertEqual(
+            list(response.context['cl'].queryset), [self.post]
+        )
+
+    def test_rebuild_command_restores_index(self):
+        """Команда перестраивает индекс с нуля."""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('delete-all')"
+            )
+        self.assertEqual(self.search('борщ'), [])
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(self.search('борщ'), ['Вчера варили борщ'])
+
+    def test_missing_index_is_cached_until_install(self):
+        """Отсутствие индекса запоминается до install_fts."""
+        drop_fts(connection)
+        self.addCleanup(install_fts, connection)
+        self.assertFalse(fts_enabled())
+        with self.assertNumQueries(0):
+            self.assertFalse(fts_enabled())
+        self.assertEqual(self.search('борщ'), ['Вчера варили борщ'])
+        install_fts(connection)
+        self.assertTrue(fts_enabled())
+        self.assertEqual(self.search('борщ'), ['Вчера варили борщ'])
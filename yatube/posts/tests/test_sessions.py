@@ -0,0 +1,128 @@
+import json
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import (SimpleTestCase, TestCase, TransactionTestCase,
+                         override_settings)
+from django.utils import timezone
+
+from core.checks import check_session_cache
+from core.management.commands.benchmark_sessions import TABLE
+from core.sessions import db
+from core.sessions.cached_db import SessionStore
+
+
+class CachedSessionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.session = SessionStore()
+        self.session['user'] = '1'
+        self.session.save()
+        self.key = self.session.session_key
+
+    def stored(self):
+        return SessionStore().decode(
+            Session.objects.get(pk=self.key).session_data
+        )
+
+    def test_load_reads_cache(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(SessionStore(self.key)['user'], '1')
+
+    def test_unchanged_save_skips_database(self):
+        session = SessionStore(self.key)
+        session['user'] = '1'
+        with self.assertNumQueries(0):
+            session.save()
+
+    def test_changed_save_writes_through(self):
+        session = SessionStore(self.key)
+        session['user'] = '2'
+        session.save()
+        self.assertEqual(self.stored(), {'user': '2'})
+        cache.clear()
+        self.assertEqual(SessionStore(self.key)['user'], '2')
+
+    @override_settings(SESSION_DB_WRITE_INTERVAL=0)
+    def test_expiry_written_after_interval(self):
+        before = Session.objects.get(pk=self.key).expire_date
+        session = SessionStore(self.key)
+        session.get('user')
+        session.save()
+        self.assertGreater(
+            Session.objects.get(pk=self.key).expire_date, before
+        )
+
+    def test_cache_miss_falls_back_to_database(self):
+        cache.clear()
+        with self.assertNumQueries(1):
+            self.assertEqual(SessionStore(self.key)['user'], '1')
+        with self.assertNumQueries(0):
+            SessionStore(self.key)['user']
+
+    def test_delete_clears_cache_and_database(self):
+        SessionStore(self.key).delete()
+        self.assertFalse(Session.objects.filter(pk=self.key).exists())
+        self.assertEqual(SessionStore(self.key).load(), {})
+
+    @override_settings(SESSION_CLEANUP_BATCH_SIZE=2)
+    def test_clear_expired_in_batches(self):
+        expired = timezone.now() - timedelta(days=1)
+        Session.objects.bulk_create(
+            Session(session_key=f'expired{i}', session_data='',
+                    expire_date=expired)
+            for i in range(5)
+        )
+        # Три пачки: по SELECT ключей и DELETE на каждую.
+        with self.assertNumQueries(6):
+            self.assertEqual(SessionStore.clear_expired(), 5)
+        self.assertEqual(
+            list(Session.objects.values_list('pk', flat=True)), [self.key]
+        )
+        self.assertEqual(db.SessionStore.clear_expired(), 0)
+
+
+class SessionCacheCheckTests(SimpleTestCase):
+    def test_default_engine_passes(self):
+        self.assertEqual(check_session_cache(None), [])
+
+    @override_settings(SESSION_ENGINE='core.sessions.cached_db')
+    def test_process_local_cache_rejected(self):
+        self.assertEqual(
+            [error.id for error in check_session_cache(None)], ['core.E002']
+        )
+
+    @override_settings(
+        SESSION_ENGINE='core.sessions.cached_db',
+        CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+            'LOCATION': '127.0.0.1:11211',
+        }},
+    )
+    def test_shared_cache_passes(self):
+        self.assertEqual(check_session_cache(None), [])
+
+
+class BenchmarkSessionsCommandTest(TransactionTestCase):
+    def test_reports_both_engines(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        output = os.path.join(directory, 'report.json')
+        call_command(
+            'benchmark_sessions', users=2, viewers=1, writers=1,
+            seconds=0.2, output=output, stdout=StringIO(),
+        )
+        with open(output) as report:
+            results = json.load(report)
+        self.assertEqual(set(results), {'db', 'cache'})
+        self.assertGreater(results['db']['session_queries'], 0)
+        self.assertEqual(results['cache']['session_queries'], 0)
+        self.assertFalse(Session.objects.exists())
+        self.assertNotIn(TABLE, connection.introspection.table_names())
@@ -0,0 +1,123 @@
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import connections, transaction
+from django.test import SimpleTestCase
+
+ALIAS = 'sqlite_backend_test'
+# Тесты открывают собственные соединения к временным файлам. Непустой
+# databases нужен pytest-django: без него он запрещает любые
+# соединения, а временный псевдоним нельзя указать заранее.
+DATABASES = {'default'}
+
+
+class TunedSQLiteBackendTest(SimpleTestCase):
+    databases = DATABASES
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, 'test.sqlite3')
+
+    def connect(self, **options):
+        connections.databases[ALIAS] = {
+            'ENGINE': 'core.db.backends.sqlite3',
+            'NAME': self.path,
+            'OPTIONS': options,
+        }
+        self.addCleanup(connections.databases.pop, ALIAS)
+        self.addCleanup(connections.__delitem__, ALIAS)
+        self.addCleanup(connections[ALIAS].close)
+        return connections[ALIAS]
+
+    def write_lock_is_free(self):
+        """Может ли другое соединение сразу взять блокировку записи."""
+        other = sqlite3.connect(self.path, timeout=0, isolation_level=None)
+        try:
+            other.execute('BEGIN IMMEDIATE')
+        except sqlite3.OperationalError:
+            return False
+        else:
+            other.execute('ROLLBACK')
+            return True
+        finally:
+            other.close()
+
+    def read_in_atomic(self, connection):
+        """Читает таблицу в atomic и проверяет блокировку записи, пока
+        транзакция открыта."""
+        with connection.cursor() as cursor:
+            cursor.execute('CREATE TABLE item (id INTEGER PRIMARY KEY)')
+        with transaction.atomic(using=ALIAS):
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT COUNT(*) FROM item')
+            return self.write_lock_is_free()
+
+    def pragma(self, connection, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_default_options_are_tuned(self):
+        """Основная база по умолчанию работает в WAL с busy_timeout."""
+        options = settings.DATABASES['default']['OPTIONS']
+        self.assertEqual(settings.DATABASES['default']['ENGINE'],
+                         'core.db.backends.sqlite3')
+        self.assertEqual(options['pragmas']['journal_mode'], 'wal')
+        self.assertEqual(options['transaction_mode'], 'IMMEDIATE')
+
+    def test_pragmas_applied_to_new_connection(self):
+        connection = self.connect(pragmas={
+            'journal_mode': 'wal',
+            'synchronous': 'normal',
+            'busy_timeout': 1234,
+        })
+        self.assertEqual(self.pragma(connection, 'journal_mode'), 'wal')
+        self.assertEqual(self.pragma(connection, 'synchronous'), 1)
+        self.assertEqual(self.pragma(connection, 'busy_timeout'), 1234)
+
+    def test_invalid_pragma_rejected(self):
+        connection = self.connect(pragmas={'journal_mode': 'wal; DROP'})
+        with self.assertRaises(ImproperlyConfigured):
+            connection.ensure_connection()
+
+    def test_invalid_transaction_mode_rejected(self):
+        connection = self.connect(transaction_mode='LAZY')
+        with self.assertRaises(ImproperlyConfigured):
+            connection.ensure_connection()
+
+    def test_atomic_takes_write_lock_immediately(self):
+        """BEGIN IMMEDIATE блокирует запись ещё до первого INSERT."""
+        connection = self.connect(transaction_mode='immediate')
+        self.assertFalse(self.read_in_atomic(connection))
+        self.assertTrue(self.write_lock_is_free())
+
+    def test_deferred_atomic_leaves_write_lock_free(self):
+        """Без transaction_mode чтение в atomic запись не блокирует."""
+        connection = self.connect()
+        self.assertTrue(self.read_in_atomic(connection))
+
+
+class BenchmarkSQLiteCommandTest(SimpleTestCase):
+    databases = DATABASES
+
+    def test_reports_both_profiles(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        output = os.path.join(directory, 'report.json')
+        call_command(
+            'benchmark_sqlite', writers=1, readers=1, seconds=0.2,
+            output=output, stdout=StringIO(),
+        )
+        with open(output) as report:
+            results = json.load(report)
+        self.assertEqual(set(results), {'stock', 'tuned'})
+        self.assertGreater(results['tuned']['writes_per_s'], 0)
+        self.assertGreater(results['tuned']['reads_per_s'], 0)
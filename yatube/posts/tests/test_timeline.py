@@ -0,0 +1,214 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import AuthorStats, Follow, Post, TimelineEntry
+from ..timeline import fan_out, timeline_page
+from ..views import LIM_POST
+
+User = get_user_model()
+
+
+class FollowViewsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='reader')
+        cls.author = User.objects.create_user(username='author')
+        cls.posts = [
+            Post.objects.create(author=cls.author, text=f'Пост {i}')
+            for i in range(3)
+        ]
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def follow(self, author):
+        return self.client.post(
+            reverse('posts:profile_follow', args=[author.username])
+        )
+
+    def followers_count(self):
+        return AuthorStats.objects.get(author=self.author).followers_count
+
+    def test_follow_backfills_recent_posts(self):
+        """Подписка добавляет в ленту уже опубликованные посты автора."""
+        response = self.follow(self.author)
+        self.assertRedirects(
+            response, reverse('posts:profile', args=[self.author.username])
+        )
+        self.assertTrue(
+            Follow.objects.filter(user=self.reader, author=self.author)
+            .exists()
+        )
+        self.assertEqual(self.followers_count(), 1)
+        self.assertEqual(
+            set(TimelineEntry.objects.filter(user=self.reader)
+                .values_list('post_id', flat=True)),
+            {post.pk for post in self.posts},
+        )
+
+    def test_follow_twice_and_self_follow_ignored(self):
+        self.follow(self.author)
+        self.follow(self.author)
+        self.follow(self.reader)
+        self.assertEqual(Follow.objects.count(), 1)
+        self.assertEqual(self.followers_count(), 1)
+
+    def test_follow_requires_post(self):
+        response = self.client.get(
+            reverse('posts:profile_follow', args=[self.author.username])
+        )
+        self.assertEqual(response.status_code, 405)
+        self.assertFalse(Follow.objects.exists())
+
+    def test_unfollow_clears_timeline(self):
+        self.follow(self.author)
+        self.client.post(
+            reverse('posts:profile_unfollow', args=[self.author.username])
+        )
+        self.assertFalse(Follow.objects.exists())
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.assertEqual(self.followers_count(), 0)
+
+    def test_profile_shows_follow_state(self):
+        url = reverse('posts:profile', args=[self.author.username])
+        self.assertEqual(self.client.get(url).context['following'], False)
+        self.follow(self.author)
+        self.assertEqual(self.client.get(url).context['following'], True)
+
+    def test_new_post_appears_in_follow_index(self):
+        self.follow(self.author)
+        post = Post.objects.create(author=self.author, text='Новый пост')
+        response = self.client.get(reverse('posts:follow_index'))
+        self.assertEqual(response.context['page_obj'][0], post)
+
+    def test_follow_index_excludes_unfollowed_authors(self):
+        other = User.objects.create_user(username='other')
+        Post.objects.create(author=other, text='Чужой пост')
+        self.follow(self.author)
+        response = self.client.get(reverse('posts:follow_index'))
+        self.assertEqual(
+            [post.author for post in response.context['page_obj']],
+            [self.author] * len(self.posts),
+        )
+
+
+class FanOutTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.readers = [
+            User.objects.create_user(username=f'reader{i}')
+            for i in range(5)
+        ]
+        for reader in cls.readers:
+            Follow.objects.create(user=reader, author=cls.author)
+
+    @override_settings(TIMELINE_FANOUT_BATCH_SIZE=2)
+    def test_fan_out_writes_in_batches(self):
+        """Пять подписчиков пачками по два: три INSERT."""
+        post = Post.objects.create(author=self.author, text='Пост')
+        TimelineEntry.objects.all().delete()
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(fan_out(post), len(self.readers))
+        inserts = [
+            query for query in context.captured_queries
+            if query['sql'].startswith('INSERT')
+        ]
+        self.assertEqual(len(inserts), 3)
+        self.assertEqual(
+            TimelineEntry.objects.filter(post=post).count(),
+            len(self.readers),
+        )
+
+    def test_rebuild_timelines_after_bulk_import(self):
+        """Посты, загруженные bulk_create, попадают в ленты после
+        rebuild_timelines."""
+        Post.objects.bulk_create(
+            Post(author=self.author, text=f'Пост {i}') for i in range(3)
+        )
+        self.assertFalse(TimelineEntry.objects.exists())
+        call_command(
+            'rebuild_timelines', '--batch-size=2', stdout=StringIO()
+        )
+        self.assertEqual(
+            TimelineEntry.objects.count(), 3 * len(self.readers)
+        )
+
+    def test_post_delete_removes_entries(self):
+        post = Post.objects.create(author=self.author, text='Пост')
+        post.delete()
+        self.assertFalse(TimelineEntry.objects.exists())
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=5)
+    def test_popular_author_is_pulled_on_read(self):
+        """Посты автора с множеством подписчиков не раскладываются,
+        но попадают в ленту при чтении вместе с разложенными."""
+        regular = User.objects.create_user(username='regular')
+        reader = self.readers[0]
+        Follow.objects.create(user=reader, author=regular)
+        posts = []
+        for i in range(LIM_POST + 2):
+            author = self.author if i % 2 else regular
+            posts.append(Post.objects.create(author=author, text=f'{i}'))
+        self.assertFalse(
+            TimelineEntry.objects.filter(author=self.author).exists()
+        )
+        first = timeline_page(reader, per_page=LIM_POST)
+        second = timeline_page(
+            reader, after=first.next_cursor, per_page=LIM_POST
+        )
+        self.assertEqual(
+            list(first) + list(second), list(reversed(posts))
+        )
+        self.assertFalse(second.has_next())
+        back = timeline_page(
+            reader, before=second.previous_cursor, per_page=LIM_POST
+        )
+        self.assertEqual(list(back), list(first))
+
+    def test_pulled_posts_not_repeated(self):
+        """Пост, разложенный до перехода автора через порог, не
+        повторяется в ленте."""
+        post = Post.objects.create(author=self.author, text='Пост')
+        with self.settings(TIMELINE_FANOUT_LIMIT=5):
+            page = timeline_page(self.readers[0], per_page=LIM_POST)
+        self.assertEqual(list(page), [post])
+
+
+class TimelineQueryTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='reader')
+        for i in range(3):
+            author = User.objects.create_user(username=f'author{i}')
+            Follow.objects.create(user=cls.reader, author=author)
+            for _ in range(LIM_POST):
+                Post.objects.create(author=author, text='Текст')
+
+    def test_page_reads_single_index_range(self):
+        """Страница ленты — один диапазон индекса без сортировки."""
+        with CaptureQueriesContext(connection) as context:
+            page = timeline_page(self.reader, per_page=LIM_POST)
+        self.assertEqual(len(page), LIM_POST)
+        sql = next(
+            query['sql'] for query in context.captured_queries
+            if 'FROM "posts_timelineentry"' in query['sql']
+        )
+        if connection.vendor != 'sqlite':
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            plan = [row[-1] for row in cursor.fetchall()]
+        self.assertEqual(len(plan), 1, plan)
+        self.assertIn('timeline_user_pub_date_idx', plan[0])
+        self.assertNotIn('TEMP B-TREE', plan[0])
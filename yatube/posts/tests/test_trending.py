@@ -0,0 +1,158 @@
+from datetime import datetime, timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import AuthorActivity, Group, GroupActivity, Post
+from ..trending import (compact_activity, floor_hour, rank, top_authors,
+                        top_groups)
+
+User = get_user_model()
+
+NOW = datetime(2024, 3, 10, 12, 30, tzinfo=timezone.utc)
+
+
+class TrendingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.hot = Group.objects.create(title='Горячая', slug='hot')
+        cls.steady = Group.objects.create(title='Ровная', slug='steady')
+        cls.old = Group.objects.create(title='Старая', slug='old')
+
+    def setUp(self):
+        cache.clear()
+
+    def bucket(self, group, ago, count, hours=1):
+        start = floor_hour(NOW - ago)
+        if hours == 24:
+            start = start.replace(hour=0)
+        GroupActivity.objects.create(
+            group=group, start=start, hours=hours, count=count
+        )
+
+    def ranking(self, window):
+        return [
+            (row['slug'], row['posts'])
+            for row in rank('groups', window, NOW)
+        ]
+
+    def fill(self):
+        self.bucket(self.hot, timedelta(minutes=10), 5)
+        self.bucket(self.steady, timedelta(hours=5), 3)
+        self.bucket(self.steady, timedelta(hours=30), 3)
+        self.bucket(self.old, timedelta(days=3), 20)
+        self.bucket(self.old, timedelta(days=10), 50)
+
+    def test_new_post_increments_hourly_buckets(self):
+        for _ in range(2):
+            Post.objects.create(author=self.author, group=self.hot, text='1')
+        Post.objects.create(author=self.author, text='Без группы')
+        bucket = GroupActivity.objects.get(group=self.hot)
+        self.assertEqual((bucket.hours, bucket.count), (1, 2))
+        self.assertEqual(
+            AuthorActivity.objects.get(author=self.author).count, 3
+        )
+        self.assertEqual(
+            top_groups('hour'),
+            [{'slug': 'hot', 'title': 'Горячая', 'posts': 2}],
+        )
+        self.assertEqual(
+            top_authors('hour'), [{'username': 'author', 'posts': 3}]
+        )
+
+    def test_windows_rank_different_activity(self):
+        self.fill()
+        self.assertEqual(self.ranking('hour'), [('hot', 5)])
+        self.assertEqual(self.ranking('day'), [('hot', 5), ('steady', 3)])
+        self.assertEqual(
+            self.ranking('week'), [('old', 20), ('steady', 6), ('hot', 5)]
+        )
+
+    def test_compaction_keeps_rankings(self):
+        """Свёртка в суточные корзины не меняет рейтинг, а корзины
+        старше недели удаляются."""
+        self.fill()
+        before = {window: self.ranking(window)
+                  for window in ('hour', 'day', 'week')}
+        # Корзина 30-часовой давности ещё входит в окно суток.
+        rolled, expired = compact_activity(NOW)
+        self.assertEqual((rolled, expired), (2, 1))
+        self.assertEqual(
+            {window: self.ranking(window)
+             for window in ('hour', 'day', 'week')},
+            before,
+        )
+        self.assertFalse(
+            GroupActivity.objects.filter(
+                hours=1, start__lt=NOW - timedelta(days=2)
+            ).exists()
+        )
+        self.assertEqual(compact_activity(NOW), (0, 0))
+
+    def test_compaction_merges_into_existing_day_bucket(self):
+        self.bucket(self.old, timedelta(days=3), 4, hours=24)
+        self.bucket(self.old, timedelta(days=3), 6)
+        compact_activity(NOW)
+        bucket = GroupActivity.objects.get(group=self.old)
+        self.assertEqual((bucket.hours, bucket.count), (24, 10))
+
+    def test_ranking_is_cached_and_bounded(self):
+        for group in (self.hot, self.steady, self.old):
+            Post.objects.create(author=self.author, group=group, text='1')
+        top_groups('week', 2)
+        with self.assertNumQueries(0):
+            self.assertEqual(len(top_groups('week', 2)), 2)
+        with self.assertRaises(ValueError):
+            top_groups('year')
+
+    def test_compact_activity_command(self):
+        out = StringIO()
+        call_command('compact_activity', stdout=out)
+        self.assertIn('Свёрнуто часовых корзин: 0', out.getvalue())
+
+
+class TrendingViewsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(title='Группа', slug='group')
+        Post.objects.create(author=cls.author, group=cls.group, text='1')
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_index_shows_trending(self):
+        response = self.guest_client.get(reverse('posts:index'))
+        self.assertEqual(
+            response.context['trending_groups'][0]['slug'], 'group'
+        )
+        self.assertEqual(
+            response.context['trending_authors'][0]['username'], 'author'
+        )
+        self.assertContains(response, 'Горячие группы за сутки')
+
+    def test_trending_api(self):
+        response = self.guest_client.get(
+            reverse('posts:api_trending'), {'window': 'week', 'limit': 1}
+        )
+        self.assertEqual(response.json(), {
+            'window': 'week',
+            'groups': [{'slug': 'group', 'title': 'Группа', 'posts': 1}],
+            'authors': [{'username': 'author', 'posts': 1}],
+        })
+
+    def test_trending_api_validates_params(self):
+        url = reverse('posts:api_trending')
+        for params in ({'window': 'year'}, {'limit': 1000}):
+            with self.subTest(params=params):
+                response = self.guest_client.get(url, params)
+                self.assertEqual(response.status_code, 400)
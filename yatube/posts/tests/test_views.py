@@ -1,10 +1,16 @@
 from django import forms
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
 from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from posts.models import Group, Post
 from posts.forms import PostForm
+from posts.urls import urlpatterns as posts_urls
+from posts.views import LIM_POST
+from .utils import execute_on_commit, query_budget
 
 User = get_user_model()
 
@@ -37,6 +43,7 @@ class PostViewTests(TestCase):
         ]
 
     def setUp(self):
+        cache.clear()
         self.guest_client = Client()
         self.user = User.objects.create_user(username='HasNoName')
         self.authorized_client = Client()
@@ -193,6 +200,7 @@ class PaginatorViewsTest(TestCase):
         Post.objects.bulk_create(cls.posts)
 
     def setUp(self):
+        cache.clear()
         self.guest_client = Client()
         self.user = User.objects.create_user(username='noname')
         self.authorized_client = Client()
@@ -226,3 +234,205 @@ class PaginatorViewsTest(TestCase):
             with self.subTest(expected=expected):
                 response = self.client.get(expected)
                 self.assertEqual(len(response.context['page_obj']), 3)
+
+    def test_cursor_pages_split_feed(self):
+        """Проверка: курсорная пагинация отдаёт 10 и 3 поста без повторов."""
+        test_cases = [
+            reverse('posts:profile',
+                    kwargs={'username': PaginatorViewsTest.author.username}),
+            reverse('posts:group_list',
+                    kwargs={'slug': PaginatorViewsTest.group.slug}),
+            reverse('posts:index'),
+        ]
+        for address in test_cases:
+            with self.subTest(address=address):
+                first_page = self.client.get(address + '?after=')
+                page_obj = first_page.context['page_obj']
+                self.assertEqual(len(page_obj), 10)
+                self.assertFalse(page_obj.has_previous())
+                second_page = self.client.get(
+                    address + f'?after={page_obj.next_cursor}'
+                )
+                second_obj = second_page.context['page_obj']
+                self.assertEqual(len(second_obj), 3)
+                self.assertFalse(second_obj.has_next())
+                seen = {post.pk for post in page_obj}
+                seen |= {post.pk for post in second_obj}
+                self.assertEqual(len(seen), 13)
+                back_page = self.client.get(
+                    address + f'?before={second_obj.previous_cursor}'
+                )
+                self.assertEqual(
+                    [post.pk for post in back_page.context['page_obj']],
+                    [post.pk for post in page_obj],
+                )
+
+    def test_cursor_pages_stable_on_equal_pub_date(self):
+        """Проверка: посты с одинаковой датой не теряются между страницами."""
+        Post.objects.update(pub_date=PaginatorViewsTest.posts[0].pub_date)
+        address = reverse('posts:index')
+        first_obj = self.client.get(address + '?after=').context['page_obj']
+        second_obj = self.client.get(
+            address + f'?after={first_obj.next_cursor}'
+        ).context['page_obj']
+        pks = [post.pk for post in first_obj]
+        pks += [post.pk for post in second_obj]
+        self.assertEqual(pks, sorted(pks, reverse=True))
+        self.assertEqual(len(set(pks)), 13)
+
+    def test_cursor_broken_token_returns_first_page(self):
+        """Проверка: битый курсор открывает первую страницу."""
+        response = self.client.get(reverse('posts:index') + '?after=%%%')
+        page_obj = response.context['page_obj']
+        self.assertEqual(len(page_obj), 10)
+        self.assertFalse(page_obj.has_previous())
+
+
+class QueryBudgetTests(TestCase):
+    """Каждый URL приложения posts обязан уложиться в свой бюджет запросов.
+
+    Бюджет считается для авторизованного автора: сессия и пользователь
+    стоят два запроса, остальное — работа самой страницы.
+    """
+    QUERY_BUDGETS = {
+        # Рейтинг групп и авторов: два запроса, пока он не в кэше.
+        'posts:index': 6,
+        'posts:group_index': 4,
+        'posts:group_list': 5,
+        'posts:profile': 4,
+        'posts:post_detail': 4,
+        'posts:search': 4,
+        'posts:follow_index': 5,
+        'posts:profile_follow': 2,
+        'posts:profile_unfollow': 2,
+        'posts:post_create': 3,
+        'posts:post_edit': 4,
+        'posts:export': 2,
+        'posts:index_rss': 1,
+        'posts:index_atom': 1,
+        'posts:group_rss': 2,
+        'posts:group_atom': 2,
+        'posts:profile_rss': 2,
+        'posts:profile_atom': 2,
+        'posts:api_index': 1,
+        'posts:api_group_posts': 2,
+        'posts:api_profile': 2,
+        'posts:api_post_detail': 1,
+        'posts:api_trending': 2,
+    }
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='budget_author')
+        cls.group = Group.objects.create(
+            title='Бюджетная группа',
+            slug='budget-slug',
+            description='Описание',
+        )
+        authors = [
+            User.objects.create_user(username=f'reader{i}')
+            for i in range(LIM_POST)
+        ]
+        groups = [
+            Group.objects.create(title=f'Группа {i}', slug=f'slug-{i}')
+            for i in range(LIM_POST)
+        ]
+        for author, group in zip(authors, groups):
+            Post.objects.create(author=author, group=group, text='Текст')
+        for _ in range(LIM_POST):
+            cls.post = Post.objects.create(
+                author=cls.author, group=cls.group, text='Текст автора'
+            )
+
+    def setUp(self):
+        self.authorized_author = Client()
+        self.authorized_author.force_login(self.author)
+
+    def get_url_kwargs(self):
+        return {
+            'slug': self.group.slug,
+            'username': self.author.username,
+            'post_id': self.post.pk,
+        }
+
+    def test_every_posts_url_has_budget(self):
+        """У каждого маршрута posts объявлен бюджет запросов."""
+        names = {f'posts:{pattern.name}' for pattern in posts_urls}
+        self.assertEqual(names, set(self.QUERY_BUDGETS))
+
+    def test_posts_urls_fit_query_budget(self):
+        """Страницы posts не превышают объявленный бюджет запросов."""
+        url_kwargs = self.get_url_kwargs()
+        for pattern in posts_urls:
+            name = f'posts:{pattern.name}'
+            kwargs = {
+                key: url_kwargs[key] for key in pattern.pattern.converters
+            }
+            with self.subTest(name=name):
+                with query_budget(self.QUERY_BUDGETS[name], label=name):
+                    self.authorized_author.get(reverse(name, kwargs=kwargs))
+
+
+class GroupIndexViewTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='directory_author')
+        cls.quiet = Group.objects.create(title='Тихая', slug='quiet')
+        cls.busy = Group.objects.create(title='Активная', slug='busy')
+        cls.empty = Group.objects.create(title='Пустая', slug='empty')
+        Post.objects.create(author=cls.author, group=cls.quiet, text='1')
+        for _ in range(2):
+            Post.objects.create(author=cls.author, group=cls.busy, text='2')
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def get_directory(self):
+        response = self.guest_client.get(reverse('posts:group_index'))
+        return [
+            (stats.group.slug, stats.posts_count)
+            for stats in response.context['page_obj']
+        ]
+
+    def test_directory_ordered_by_activity(self):
+        """Каталог начинается с группы с самым свежим постом, группы
+        без постов — в конце."""
+        self.assertEqual(
+            self.get_directory(), [('busy', 2), ('quiet', 1), ('empty', 0)]
+        )
+
+    def test_cached_directory_follows_new_posts(self):
+        self.get_directory()
+        with execute_on_commit():
+            Post.objects.create(
+                author=self.author, group=self.empty, text='3'
+            )
+        self.assertEqual(self.get_directory()[0], ('empty', 1))
+        with execute_on_commit():
+            Group.objects.create(title='Новая', slug='new')
+        self.assertIn(('new', 0), self.get_directory())
+
+    def test_directory_reads_one_indexed_range(self):
+        """Страница каталога — один запрос по индексу активности."""
+        client = Client()
+        client.force_login(self.author)
+        url = reverse('posts:group_index')
+        # Первый запрос кладёт в кэш число групп.
+        client.get(url)
+        with CaptureQueriesContext(connection) as context:
+            client.get(url)
+        queries = [
+            query['sql'] for query in context.captured_queries
+            if 'posts_groupstats' in query['sql']
+        ]
+        self.assertEqual(len(queries), 1, queries)
+        if connection.vendor != 'sqlite':
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {queries[0]}')
+            plan = ' '.join(row[-1] for row in cursor.fetchall())
+        self.assertIn('groupstats_activity_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
@@ -0,0 +1,66 @@
+import os
+import shutil
+import tempfile
+
+from django.template import TemplateSyntaxError, engines
+from django.test import SimpleTestCase, override_settings
+
+from core.checks import check_template_syntax
+from core.warmup import compile_templates, warm_up_templates
+
+
+def cached_templates(directory):
+    return [{
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [directory],
+        'OPTIONS': {
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                ]),
+            ],
+        },
+    }]
+
+
+class TemplateWarmUpTest(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        os.makedirs(os.path.join(self.directory, 'posts'))
+        self.write('base.html', '{% block content %}{% endblock %}')
+        self.write(
+            'posts/index.html',
+            '{% extends "base.html" %}{% block content %}1{% endblock %}',
+        )
+        self.write('posts/style.css', '{% not a template')
+
+    def write(self, name, content):
+        with open(os.path.join(self.directory, name), 'w') as file:
+            file.write(content)
+
+    def test_templates_are_compiled_into_cache(self):
+        with override_settings(TEMPLATES=cached_templates(self.directory)):
+            self.assertEqual(warm_up_templates(), 2)
+            loader = engines['django'].engine.template_loaders[0]
+            self.assertEqual(
+                set(loader.get_template_cache),
+                {'base.html', 'posts/index.html'},
+            )
+
+    def test_syntax_error_fails_fast(self):
+        self.write('posts/broken.html', '{% if %}')
+        with override_settings(TEMPLATES=cached_templates(self.directory)):
+            with self.assertRaisesMessage(TemplateSyntaxError,
+                                          'posts/broken.html'):
+                warm_up_templates()
+            count, errors = compile_templates()
+            self.assertEqual(count, 3)
+            self.assertEqual([name for name, _ in errors],
+                             ['posts/broken.html'])
+            messages = check_template_syntax(None)
+            self.assertEqual([message.id for message in messages],
+                             ['core.E001'])
+
+    def test_project_templates_are_valid(self):
+        self.assertEqual(check_template_syntax(None), [])
@@ -0,0 +1,97 @@
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from functools import wraps
+
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class query_budget(CaptureQueriesContext):
+    """Проверяет, что блок кода уложился в заданное число SQL-запросов.
+
+    В отличие от ``assertNumQueries`` допускает меньшее число запросов
+    и в сообщении об ошибке перечисляет все выполненные запросы.
+    Работает и как контекстный менеджер, и как декоратор::
+
+        with query_budget(3, label='posts:index'):
+            self.client.get(reverse('posts:index'))
+    """
+
+    def __init__(self, budget, label='', using=DEFAULT_DB_ALIAS):
+        super().__init__(connections[using])
+        self.budget = budget
+        self.label = label
+
+    def __call__(self, func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with query_budget(self.budget, self.label, self.connection.alias):
+                return func(*args, **kwargs)
+        return wrapper
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        super().__exit__(exc_type, exc_value, traceback)
+        if exc_type is not None or len(self) <= self.budget:
+            return
+        queries = '\n'.join(
+            f'{number}. {query["sql"]}'
+            for number, query in enumerate(self.captured_queries, start=1)
+        )
+        raise QueryBudgetExceeded(
+            f'{self.label or "Блок"} выполнил {len(self)} запросов '
+            f'при бюджете {self.budget}:\n{queries}'
+        )
+
+
+@contextmanager
+def execute_on_commit(using=DEFAULT_DB_ALIAS):
+    """Выполняет колбэки ``transaction.on_commit`` из блока при выходе.
+
+    TestCase оборачивает тест в транзакцию, которая не фиксируется,
+    поэтому отложенные до фиксации сбросы кэша иначе не выполнились бы.
+    """
+    connection = connections[using]
+    start = len(connection.run_on_commit)
+    yield
+    # Колбэки могут регистрировать новые.
+    while len(connection.run_on_commit) > start:
+        callbacks = connection.run_on_commit[start:]
+        del connection.run_on_commit[start:]
+        for _, callback in callbacks:
+            callback()
+
+
+@contextmanager
+def file_database(using=DEFAULT_DB_ALIAS):
+    """Временно переносит базу ``using`` в файл с WAL и миграциями.
+
+    Тестовая SQLite живёт в памяти с общим кэшем, где чтение таблицы с
+    незафиксированной записью падает с «table is locked». В файле второе
+    соединение, как и в рабочей базе, читает последние зафиксированные
+    строки. Для TransactionTestCase: транзакция TestCase осталась бы в
+    прежней базе.
+    """
+    directory = tempfile.mkdtemp()
+    original_settings = connections.databases[using]
+    original_connection = connections[using]
+    settings_dict = dict(
+        original_settings, NAME=os.path.join(directory, 'db.sqlite3')
+    )
+    connections.databases[using] = settings_dict
+    connection = original_connection.__class__(settings_dict, using)
+    connections[using] = connection
+    try:
+        call_command('migrate', database=using, verbosity=0)
+        yield
+    finally:
+        connection.close()
+        connections[using] = original_connection
+        connections.databases[using] = original_settings
+        shutil.rmtree(directory)
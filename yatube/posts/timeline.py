@@ -0,0 +1,139 @@
+"""Лента подписок: раскладка постов при записи с гибридным чтением.
+
+Новый пост автора сразу раскладывается в ``TimelineEntry`` каждого
+подписчика пачками по ``TIMELINE_FANOUT_BATCH_SIZE``, и страница ленты
+читается одним диапазоном индекса (user, pub_date, post). Для авторов,
+у которых подписчиков не меньше ``TIMELINE_FANOUT_LIMIT``, раскладка
+стоила бы слишком много строк на пост: их посты не раскладываются, а
+подмешиваются при чтении из индекса (author, pub_date) постов.
+"""
+from django.conf import settings
+from django.db import transaction
+
+from .models import Follow, Post, TimelineEntry
+from .paginators import CursorPaginator, MergedCursorPaginator
+from .stats import get_followers_count
+
+
+def is_pulled(author_id):
+    """True, если посты автора читаются при показе, а не раскладываются."""
+    return get_followers_count(author_id) >= settings.TIMELINE_FANOUT_LIMIT
+
+
+def _entries(user_ids, post_id, author_id, pub_date):
+    return [
+        TimelineEntry(user_id=user_id, post_id=post_id,
+                      author_id=author_id, pub_date=pub_date)
+        for user_id in user_ids
+    ]
+
+
+def fan_out(post):
+    """Раскладывает пост по лентам подписчиков автора.
+
+    Подписчики читаются пачками по ключу user_id, каждая пачка
+    записывается одним INSERT. Возвращает число записанных строк.
+    """
+    if is_pulled(post.author_id):
+        return 0
+    batch_size = settings.TIMELINE_FANOUT_BATCH_SIZE
+    followers = Follow.objects.filter(
+        author_id=post.author_id
+    ).order_by('user_id').values_list('user_id', flat=True)
+    written = 0
+    last = 0
+    while True:
+        user_ids = list(followers.filter(user_id__gt=last)[:batch_size])
+        TimelineEntry.objects.bulk_create(
+            _entries(user_ids, post.pk, post.author_id, post.pub_date),
+            ignore_conflicts=True,
+        )
+        written += len(user_ids)
+        if len(user_ids) < batch_size:
+            return written
+        last = user_ids[-1]
+
+
+def backfill(user_id, author_id):
+    """Добавляет в ленту нового подписчика последние посты автора."""
+    if is_pulled(author_id):
+        return
+    posts = Post.objects.filter(author_id=author_id).order_by(
+        '-pub_date', '-id'
+    ).values_list('id', 'pub_date')[:settings.TIMELINE_BACKFILL]
+    TimelineEntry.objects.bulk_create(
+        [
+            TimelineEntry(user_id=user_id, post_id=post_id,
+                          author_id=author_id, pub_date=pub_date)
+            for post_id, pub_date in posts
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def drop_author(user_id, author_id):
+    """Убирает из ленты читателя посты автора, от которого он отписался."""
+    TimelineEntry.objects.filter(
+        user_id=user_id, author_id=author_id
+    ).delete()
+
+
+@transaction.atomic
+def rebuild_timelines(batch_size=1000):
+    """Собирает ленты заново по подпискам, например после импорта
+    постов в обход сигналов. Возвращает число обработанных подписок."""
+    TimelineEntry.objects.all().delete()
+    follows = Follow.objects.order_by('pk').values_list(
+        'pk', 'user_id', 'author_id'
+    )
+    done = 0
+    last = 0
+    while True:
+        batch = list(follows.filter(pk__gt=last)[:batch_size])
+        for _, user_id, author_id in batch:
+            backfill(user_id, author_id)
+        done += len(batch)
+        if len(batch) < batch_size:
+            return done
+        last = batch[-1][0]
+
+
+def timeline_page(user, after=None, before=None, per_page=10):
+    """Страница ленты подписок ``user`` с постами и их автором и группой.
+
+    Разложенные записи и посты авторов, читаемых при показе, листаются
+    общим курсором (pub_date, id поста). Пост, разложенный до того,
+    как автор перешёл порог, не повторяется.
+    """
+    entries = CursorPaginator(
+        TimelineEntry.objects.filter(user=user).values_list(
+            'pub_date', 'post_id'
+        ),
+        per_page,
+        key=('pub_date', 'post_id'),
+    )
+    pulled = list(
+        Follow.objects.filter(
+            user=user,
+            author__post_stats__followers_count__gte=(
+                settings.TIMELINE_FANOUT_LIMIT
+            ),
+        ).values_list('author_id', flat=True)
+    )
+    paginator = entries
+    if pulled:
+        paginator = MergedCursorPaginator([
+            entries,
+            CursorPaginator(
+                Post.objects.filter(author_id__in=pulled).values_list(
+                    'pub_date', 'id'
+                ),
+                per_page,
+            ),
+        ], per_page)
+    page = paginator.page(after, before)
+    posts = Post.objects.select_related('author', 'group').in_bulk(
+        [pk for _, pk in page]
+    )
+    page.object_list = [posts[pk] for _, pk in page if pk in posts]
+    return page
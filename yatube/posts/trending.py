@@ -0,0 +1,164 @@
+"""Рейтинг активных групп и авторов по счётчикам в корзинах времени.
+
+Каждый новый пост увеличивает счётчик часовой корзины своей группы и
+автора одним UPDATE. Рейтинг за окно — сумма корзин, попавших в окно,
+по индексу (start, владелец): после compact_activity на владельца
+приходится не больше суток часовых и недели суточных корзин, поэтому
+время запроса не зависит от числа постов. Результат хранится в кэше и
+ограничен ``TRENDING_MAX`` строками.
+
+Окно измеряется с точностью до корзины: в него попадает и корзина,
+внутри которой окно начинается.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q, Sum
+from django.db.models.functions import TruncDay
+from django.utils import timezone
+
+from .models import AuthorActivity, GroupActivity
+
+HOUR = 1
+DAY = 24
+WINDOWS = {
+    'hour': timedelta(hours=1),
+    'day': timedelta(days=1),
+    'week': timedelta(weeks=1),
+}
+TRENDING_MAX = 20
+TRENDING_KEY = 'posts:trending:{kind}:{window}'
+
+# Вид рейтинга -> (модель, поле владельца, поля строки рейтинга).
+SOURCES = {
+    'groups': (GroupActivity, 'group_id', {
+        'slug': F('group__slug'), 'title': F('group__title'),
+    }),
+    'authors': (AuthorActivity, 'author_id', {
+        'username': F('author__username'),
+    }),
+}
+
+
+def floor_hour(moment):
+    return moment.astimezone(timezone.utc).replace(
+        minute=0, second=0, microsecond=0
+    )
+
+
+def floor_day(moment):
+    return floor_hour(moment).replace(hour=0)
+
+
+def _increment(model, owner_field, owner_id, start, hours=HOUR, count=1):
+    bucket = {owner_field: owner_id, 'start': start, 'hours': hours}
+    if model.objects.filter(**bucket).update(count=F('count') + count):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**bucket, count=count)
+    except IntegrityError:
+        # Корзину успел создать параллельный запрос.
+        _increment(model, owner_field, owner_id, start, hours, count)
+
+
+def record_post(post):
+    """Учитывает новый пост в часовых корзинах автора и группы."""
+    start = floor_hour(post.pub_date)
+    _increment(AuthorActivity, 'author_id', post.author_id, start)
+    if post.group_id is not None:
+        _increment(GroupActivity, 'group_id', post.group_id, start)
+
+
+def rank(kind, window, now):
+    """Первые ``TRENDING_MAX`` владельцев по числу постов за окно."""
+    model, owner_field, fields = SOURCES[kind]
+    since = now - WINDOWS[window]
+    rows = model.objects.filter(
+        start__gte=floor_day(since)
+    ).filter(
+        Q(hours=DAY) | Q(start__gte=floor_hour(since))
+    ).values(
+        owner_field, **fields
+    ).annotate(
+        posts=Sum('count')
+    ).order_by('-posts', owner_field)[:TRENDING_MAX]
+    ranking = []
+    for row in rows:
+        del row[owner_field]
+        ranking.append(row)
+    return ranking
+
+
+def _top(kind, window, limit):
+    if window not in WINDOWS:
+        raise ValueError(f'Неизвестное окно рейтинга: {window}')
+    key = TRENDING_KEY.format(kind=kind, window=window)
+    ranking = cache.get(key)
+    if ranking is None:
+        ranking = rank(kind, window, timezone.now())
+        cache.set(key, ranking, settings.TRENDING_CACHE_TIMEOUT)
+    return ranking[:limit]
+
+
+def top_groups(window='day', limit=5):
+    """Самые активные группы за окно: [{'slug', 'title', 'posts'}]."""
+    return _top('groups', window, limit)
+
+
+def top_authors(window='day', limit=5):
+    """Самые активные авторы за окно: [{'username', 'posts'}]."""
+    return _top('authors', window, limit)
+
+
+def _roll_up(model, owner_field, hourly):
+    """Переносит часовые корзины ``hourly`` в суточные."""
+    days = list(
+        hourly.annotate(
+            day=TruncDay('start', tzinfo=timezone.utc)
+        ).values(owner_field, 'day').annotate(
+            total=Sum('count')
+        ).order_by()
+    )
+    existing = {
+        (getattr(bucket, owner_field), bucket.start): bucket
+        for bucket in model.objects.filter(
+            hours=DAY, start__in={row['day'] for row in days}
+        )
+    }
+    to_create = []
+    for row in days:
+        bucket = existing.get((row[owner_field], row['day']))
+        if bucket is None:
+            to_create.append(model(
+                **{owner_field: row[owner_field]}, start=row['day'],
+                hours=DAY, count=row['total'],
+            ))
+        else:
+            bucket.count += row['total']
+    model.objects.bulk_create(to_create, batch_size=1000)
+    model.objects.bulk_update(existing.values(), ['count'], batch_size=1000)
+    return hourly.delete()[0]
+
+
+@transaction.atomic
+def compact_activity(now):
+    """Сворачивает часовые корзины старше суток в суточные и удаляет
+    корзины старше самого длинного окна.
+
+    Возвращает (свёрнуто часовых корзин, удалено устаревших).
+    """
+    day_cutoff = floor_day(now - WINDOWS['day'])
+    expire_before = floor_day(now - max(WINDOWS.values()))
+    rolled = expired = 0
+    for model, owner_field, _ in SOURCES.values():
+        rolled += _roll_up(
+            model, owner_field,
+            model.objects.filter(hours=HOUR, start__lt=day_cutoff),
+        )
+        expired += model.objects.filter(
+            start__lt=expire_before
+        ).delete()[0]
+    return rolled, expired
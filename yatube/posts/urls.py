@@ -1,6 +1,6 @@
 from django.urls import path
 
-from . import views
+from . import api, feeds, views
 
 
 app_name = 'posts'
@@ -8,9 +8,34 @@ app_name = 'posts'
 
 urlpatterns = [
     path('', views.index, name='index'),
+    path('group/', views.group_index, name='group_index'),
     path('group/<slug:slug>/', views.group_posts, name='group_list'),
     path('profile/<str:username>/', views.profile, name='profile'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
+    path('search/', views.search, name='search'),
+    path('follow/', views.follow_index, name='follow_index'),
+    path('profile/<str:username>/follow/', views.profile_follow,
+         name='profile_follow'),
+    path('profile/<str:username>/unfollow/', views.profile_unfollow,
+         name='profile_unfollow'),
     path('create/', views.post_create, name='post_create'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
+    path('export/', views.export_posts, name='export'),
+    path('feed/', feeds.index_rss, name='index_rss'),
+    path('feed/atom/', feeds.index_atom, name='index_atom'),
+    path('group/<slug:slug>/feed/', feeds.group_rss, name='group_rss'),
+    path('group/<slug:slug>/feed/atom/', feeds.group_atom,
+         name='group_atom'),
+    path('profile/<str:username>/feed/', feeds.profile_rss,
+         name='profile_rss'),
+    path('profile/<str:username>/feed/atom/', feeds.profile_atom,
+         name='profile_atom'),
+    path('api/posts/', api.index, name='api_index'),
+    path('api/groups/<slug:slug>/posts/', api.group_posts,
+         name='api_group_posts'),
+    path('api/profiles/<str:username>/posts/', api.profile,
+         name='api_profile'),
+    path('api/posts/<int:post_id>/', api.post_detail,
+         name='api_post_detail'),
+    path('api/trending/', api.trending, name='api_trending'),
 ]
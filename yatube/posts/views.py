@@ -1,59 +1,144 @@
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
 from django.shortcuts import render, get_object_or_404, redirect
-from django.core.paginator import Paginator
 from django.contrib.auth.decorators import login_required
+from django.views.decorators.http import require_POST
 
-from .models import Post, Group, User
+from .models import Follow, GroupStats, Post, Group, User
+from .cache import (author_feed, cache_feed_page, feed_count_key,
+                    global_feed, group_directory_count_key,
+                    group_directory_feed, group_feed, render_post_cards)
+from .conditional import feed_condition, post_condition
+from .export import EXPORT_FORMATS, export_lines
 from .forms import PostForm
+from .paginators import CachedCountPaginator, CursorPaginator
+from .search import search_posts
+from .stats import get_posts_count
+from .timeline import timeline_page
+from .trending import top_authors, top_groups
 
 
 LIM_POST: int = 10
+LIM_GROUP: int = 20
+LIM_TRENDING: int = 5
 
 
-def index(request):
-    post_list = Post.objects.all()
-    paginator = Paginator(post_list, LIM_POST)
+def get_page_obj(request, post_list, count=None, count_key=None):
+    """Возвращает страницу ленты.
+
+    Курсорный режим включается параметрами ``?after=``/``?before=``
+    или настройкой ``POSTS_CURSOR_PAGINATION``; иначе используется
+    нумерованная пагинация по ``?page=`` с готовым числом постов
+    ``count`` или закэшированным по ``count_key``.
+    """
+    cursor_mode = 'after' in request.GET or 'before' in request.GET
+    if cursor_mode or settings.POSTS_CURSOR_PAGINATION:
+        return CursorPaginator(post_list, LIM_POST).page(
+            request.GET.get('after'), request.GET.get('before')
+        )
+    paginator = CachedCountPaginator(
+        post_list,
+        LIM_POST,
+        count=count,
+        count_key=count_key,
+        count_timeout=settings.FEED_COUNT_CACHE_TIMEOUT,
+    )
     page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    return paginator.get_page(page_number)
+
+
+@feed_condition(global_feed)
+@cache_feed_page(global_feed)
+def index(request):
+    post_list = Post.objects.select_related('author', 'group')
+    page_obj = get_page_obj(
+        request, post_list, count_key=feed_count_key()
+    )
     context = {
         'page_obj': page_obj,
+        'post_cards': render_post_cards(
+            page_obj, 'posts/includes/index_card.html'
+        ),
+        'trending_groups': top_groups('day', LIM_TRENDING),
+        'trending_authors': top_authors('day', LIM_TRENDING),
     }
     return render(request, 'posts/index.html', context)
 
 
+@feed_condition(group_directory_feed)
+@cache_feed_page(group_directory_feed)
+def group_index(request):
+    """Каталог групп с числом постов и датой последнего, начиная с
+    самых активных; читается из поддерживаемой статистики групп."""
+    paginator = CachedCountPaginator(
+        GroupStats.objects.select_related('group').order_by(
+            '-last_post_date', '-group_id'
+        ),
+        LIM_GROUP,
+        count_key=group_directory_count_key(),
+        count_timeout=settings.FEED_COUNT_CACHE_TIMEOUT,
+    )
+    page_obj = paginator.get_page(request.GET.get('page'))
+    return render(request, 'posts/group_index.html', {'page_obj': page_obj})
+
+
+@feed_condition(group_feed)
+@cache_feed_page(group_feed)
 def group_posts(request, slug):
     """Function sorts the data and sends it to the template."""
     group = get_object_or_404(Group, slug=slug)
-    post_list = group.posts.all()
-    paginator = Paginator(post_list, LIM_POST)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    post_list = group.posts.select_related('author')
+    page_obj = get_page_obj(
+        request, post_list, count_key=feed_count_key(group.pk)
+    )
     title = group.title
     description = group.description
     context = {
         'group': group,
         'page_obj': page_obj,
+        'post_cards': render_post_cards(
+            page_obj, 'posts/includes/group_card.html'
+        ),
         'title': title,
         'description': description,
     }
     return render(request, 'posts/group_list.html', context)
 
 
+@feed_condition(author_feed)
+@cache_feed_page(author_feed)
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    post_list = author.posts.all()
-    paginator = Paginator(post_list, LIM_POST)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    author = get_object_or_404(
+        User.objects.select_related('post_stats'), username=username
+    )
+    post_list = author.posts.select_related('group')
+    posts_count = get_posts_count(author)
+    page_obj = get_page_obj(request, post_list, count=posts_count)
+    following = None
+    if request.user.is_authenticated and request.user != author:
+        following = Follow.objects.filter(
+            user=request.user, author=author
+        ).exists()
     context = {'post_list': post_list,
                'page_obj': page_obj,
+               'post_cards': render_post_cards(
+                   page_obj, 'posts/includes/profile_card.html'
+               ),
                'author': author,
+               'posts_count': posts_count,
+               'following': following,
                }
     return render(request, 'posts/profile.html', context)
 
 
+@post_condition
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
-    posts_count = post.author.posts.count()
+    post = get_object_or_404(
+        Post.objects.select_related('author__post_stats', 'group'),
+        id=post_id,
+    )
+    posts_count = get_posts_count(post.author)
     author = post.author
     text = post.text
     title = text[:30]
@@ -67,6 +152,55 @@ def post_detail(request, post_id):
     return render(request, 'posts/post_detail.html', context)
 
 
+def search(request):
+    """Полнотекстовый поиск по постам, результаты по релевантности."""
+    query = request.GET.get('q', '').strip()
+    page_obj = search_posts(query, request.GET.get('after'), LIM_POST)
+    context = {
+        'query': query,
+        'page_obj': page_obj,
+        'post_cards': render_post_cards(
+            page_obj, 'posts/includes/index_card.html'
+        ),
+    }
+    return render(request, 'posts/search.html', context)
+
+
+@login_required
+def follow_index(request):
+    """Лента постов авторов, на которых подписан пользователь."""
+    page_obj = timeline_page(
+        request.user,
+        request.GET.get('after'),
+        request.GET.get('before'),
+        LIM_POST,
+    )
+    context = {
+        'page_obj': page_obj,
+        'post_cards': render_post_cards(
+            page_obj, 'posts/includes/index_card.html'
+        ),
+    }
+    return render(request, 'posts/follow.html', context)
+
+
+@login_required
+@require_POST
+def profile_follow(request, username):
+    author = get_object_or_404(User, username=username)
+    if author != request.user:
+        Follow.objects.get_or_create(user=request.user, author=author)
+    return redirect('posts:profile', username=username)
+
+
+@login_required
+@require_POST
+def profile_unfollow(request, username):
+    author = get_object_or_404(User, username=username)
+    Follow.objects.filter(user=request.user, author=author).delete()
+    return redirect('posts:profile', username=username)
+
+
 @login_required
 def post_create(request):
     """Страница создания нового поста"""
@@ -81,7 +215,9 @@ def post_create(request):
 
 @login_required
 def post_edit(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
+    post = get_object_or_404(
+        Post.objects.select_related('author'), id=post_id
+    )
     if post_id and request.user != post.author:
         return redirect('posts:post_detail', post_id=post_id)
     form = PostForm(request.POST or None, instance=post)
@@ -94,3 +230,28 @@ def post_edit(request, post_id):
         'post': post
     }
     return render(request, 'posts/create_post.html', context)
+
+
+@staff_member_required
+def export_posts(request):
+    """Выгрузка постов автора (?author=), группы (?group=) или всего
+    сайта в NDJSON или CSV (?format=), отдаваемая по мере чтения."""
+    export_format = request.GET.get('format', 'ndjson')
+    if export_format not in EXPORT_FORMATS:
+        return HttpResponseBadRequest('Неизвестный формат выгрузки')
+    author = group = None
+    name = 'posts'
+    if request.GET.get('author'):
+        author = get_object_or_404(User, username=request.GET['author'])
+        name = f'posts-{author.username}'
+    if request.GET.get('group'):
+        group = get_object_or_404(Group, slug=request.GET['group'])
+        name = f'{name}-{group.slug}'
+    response = StreamingHttpResponse(
+        export_lines(export_format, author, group),
+        content_type=EXPORT_FORMATS[export_format],
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{name}.{export_format}"'
+    )
+    return response
@@ -37,13 +37,16 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
+    'core.routers.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
+    'core.middleware.AuthenticationMiddleware',
+    'core.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.TemplateProfilerMiddleware',
 ]
 
 ROOT_URLCONF = 'yatube.urls'
@@ -71,13 +74,118 @@ WSGI_APPLICATION = 'yatube.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/2.2/ref/settings/#databases
 
+# Настройки соединения SQLite для нескольких воркеров: WAL позволяет
+# читать во время записи, BEGIN IMMEDIATE с busy_timeout ждёт блокировку
+# записи вместо ошибки «database is locked», а CONN_MAX_AGE
+# переиспользует соединение между запросами.
+SQLITE_OPTIONS = {
+    'pragmas': {
+        'journal_mode': 'wal',
+        'synchronous': 'normal',
+        'busy_timeout': 5000,
+        'cache_size': -16384,
+        'mmap_size': 134217728,
+        'temp_store': 'memory',
+    },
+    'transaction_mode': 'IMMEDIATE',
+}
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'core.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'OPTIONS': SQLITE_OPTIONS,
+        'CONN_MAX_AGE': 60,
+    },
+    # Реплика для локальной проверки маршрутизации; заполняется
+    # командой sync_replica. Используется, только если указана
+    # в DATABASE_REPLICAS.
+    'replica': {
+        'ENGINE': 'core.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'db_replica.sqlite3'),
+        'OPTIONS': SQLITE_OPTIONS,
+        'CONN_MAX_AGE': 60,
+    },
+}
+
+DATABASE_ROUTERS = ['core.routers.PrimaryReplicaRouter']
+
+# Псевдонимы баз для чтения, через запятую в YATUBE_DB_REPLICAS;
+# пустой список — всё читается с основной базы.
+DATABASE_REPLICAS = [
+    alias for alias in os.environ.get('YATUBE_DB_REPLICAS', '').split(',')
+    if alias
+]
+
+# Сколько секунд после записи клиент читает с основной базы.
+READ_YOUR_WRITES_WINDOW = 5
+
+# View, которые только читают и могут обслуживаться репликой.
+REPLICA_VIEWS = (
+    'posts:index',
+    'posts:group_index',
+    'posts:group_list',
+    'posts:profile',
+    'posts:post_detail',
+    'posts:search',
+    'posts:follow_index',
+    'posts:index_rss',
+    'posts:index_atom',
+    'posts:group_rss',
+    'posts:group_atom',
+    'posts:profile_rss',
+    'posts:profile_atom',
+    'posts:api_index',
+    'posts:api_group_posts',
+    'posts:api_profile',
+    'posts:api_post_detail',
+    'posts:api_trending',
+    'about:author',
+    'about:tech',
+)
+
+
+# Cache
+# Для нескольких воркеров нужен общий кэш (Memcached, Redis):
+# версии фрагментов должны быть одинаковыми во всех процессах.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
     }
 }
 
+POST_CARD_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Страницы лент для анонимов сбрасываются при изменении постов,
+# таймаут лишь ограничивает память под редко читаемые страницы.
+FEED_PAGE_CACHE_TIMEOUT = 60 * 5
+
+FEED_PAGE_CACHE_MAX_PAGE = 3
+
+# Поколения лент заводятся и для несуществующих групп и авторов (до
+# 404), поэтому не хранятся вечно. Потерянное поколение считается
+# изменённым только что: страницы и ETag лент просто обновятся.
+FEED_GENERATION_TIMEOUT = 60 * 60 * 24
+
+# Счётчики постов лент поддерживаются сигналами, таймаут ограничивает
+# расхождение после массовых операций в обход сигналов.
+FEED_COUNT_CACHE_TIMEOUT = 60 * 60
+
+# Сессии в базе по умолчанию. С общим для воркеров кэшем (Memcached,
+# Redis) YATUBE_SESSION_ENGINE=core.sessions.cached_db читает их из
+# кэша, а в django_session пишет только изменения данных и продление
+# срока не чаще раза в SESSION_DB_WRITE_INTERVAL секунд; с кэшем в
+# памяти процесса проверка core.E002 не даст запуститься. clearsessions
+# удаляет истёкшие сессии пачками, чтобы не держать блокировку записи
+# SQLite.
+SESSION_ENGINE = os.environ.get('YATUBE_SESSION_ENGINE', 'core.sessions.db')
+SESSION_DB_WRITE_INTERVAL = 60 * 5
+SESSION_CLEANUP_BATCH_SIZE = 1000
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -128,3 +236,33 @@ LOGIN_REDIRECT_URL = 'posts:index'
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+
+# Лента по умолчанию листается курсором (?after=/?before=) вместо
+# номеров страниц: без COUNT(*) и OFFSET на больших таблицах.
+POSTS_CURSOR_PAGINATION = False
+
+# Лента подписок: новый пост раскладывается по лентам подписчиков
+# пачками по TIMELINE_FANOUT_BATCH_SIZE строк. Посты авторов, у которых
+# подписчиков не меньше TIMELINE_FANOUT_LIMIT, не раскладываются, а
+# подмешиваются при чтении ленты.
+TIMELINE_FANOUT_LIMIT = 10000
+TIMELINE_FANOUT_BATCH_SIZE = 1000
+# Сколько последних постов автора попадает в ленту при подписке.
+TIMELINE_BACKFILL = 100
+
+# Рейтинг активных групп и авторов пересчитывается из счётчиков не
+# чаще раза в TRENDING_CACHE_TIMEOUT секунд; старые корзины счётчиков
+# сворачивает команда compact_activity, её стоит запускать раз в час.
+TRENDING_CACHE_TIMEOUT = 60
+
+# Профилировщик шаблонов: при True сотрудник получает отчёт о времени
+# отрисовки шаблонов, include и фильтров по ?profile_templates.
+TEMPLATE_PROFILER = False
+
+# Компилировать все шаблоны при старте воркера (см. yatube/wsgi.py).
+TEMPLATE_WARMUP = False
+
+# GET/HEAD без cookie сессии и сообщений обслуживаются как запросы
+# гостя: без обращения к сессии и без хранилища сообщений
+# (core.middleware.AuthenticationMiddleware и MessageMiddleware).
+ANONYMOUS_FAST_PATH = True
@@ -0,0 +1,49 @@
+"""Настройки для боевого окружения.
+
+Запуск: DJANGO_SETTINGS_MODULE=yatube.settings_production,
+секретный ключ и разрешённые хосты берутся из переменных окружения.
+"""
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import TEMPLATES
+
+DEBUG = False
+
+# CACHES из yatube.settings — кэш в памяти процесса. С несколькими
+# воркерами здесь нужен общий кэш (Memcached, Redis), иначе сбросы
+# карточек и лент не дойдут до других воркеров: manage.py check
+# --deploy сообщит об этом ошибкой core.E003.
+
+SECRET_KEY = os.environ['DJANGO_SECRET_KEY']
+
+ALLOWED_HOSTS = [
+    host.strip()
+    for host in os.environ.get('DJANGO_ALLOWED_HOSTS', '').split(',')
+    if host.strip()
+]
+
+# Кэширующий загрузчик разбирает каждый шаблон один раз на процесс.
+# С явным списком loaders APP_DIRS должен быть выключен.
+TEMPLATES = [
+    {
+        **TEMPLATES[0],
+        'APP_DIRS': False,
+        'OPTIONS': {
+            **TEMPLATES[0]['OPTIONS'],
+            'debug': False,
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
+        },
+    },
+]
+
+# Шаблоны компилируются при импорте yatube.wsgi, то есть при старте
+# каждого воркера; синтаксическая ошибка не даст воркеру подняться.
+TEMPLATE_WARMUP = True
+
+TEMPLATE_PROFILER = False